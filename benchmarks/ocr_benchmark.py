@@ -0,0 +1,425 @@
+"""
+OCR Benchmark
+OCR準確率與吞吐量基準測試：以標註好的區域圖像語料庫逐一執行 OCREngine 的各條處理路徑，
+輸出各類別準確率、每秒處理的區域數與延遲百分位數（JSON）
+
+用法:
+    python benchmarks/ocr_benchmark.py [--corpus 目錄] [--backend easyocr|onnx] [--output 結果.json]
+    python benchmarks/ocr_benchmark.py --save-corpus 目錄      # 輸出合成語料庫
+    python benchmarks/ocr_benchmark.py --init-manifest 目錄    # 為既有的PNG建立待標註的 labels.json
+
+語料庫目錄包含區域PNG與 labels.json:
+    {"samples": [{"file": "HP_0000.png", "class": "HP", "text": "1234/5678"}, ...]}
+類別為分頁名稱（HP、MP、EXP、楓幣、藥水）。未指定 --corpus 時使用合成的區域圖像。
+除錯時保存的 tmp/*.png 或錄製檔重播時裁切的區域都可以標註後作為語料庫。
+
+所有路徑都不使用網路；未安裝OCR後端時只執行字形模板路徑。
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+import cv2
+from PIL import Image
+
+# 添加專案根目錄到Python路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr.ocr_engine import OCREngine
+from ocr.backend import create_backend, is_backend_available, BACKEND_EASYOCR
+from ocr.projection import to_gray
+
+MANIFEST_FILE = "labels.json"
+POTION_CLASS = "藥水"
+# 每一幀最多的藥水格數（與監控分頁相同）
+POTION_SLOTS = 8
+# 視為未辨識的輸出
+FAILED_RESULTS = ("", "無法識別", "OCR錯誤", "OCR未初始化")
+
+# 預設執行的路徑與選項
+DEFAULT_RUNS = [
+    ("glyph", {}),
+    ("single", {}),
+    ("merged", {}),
+    ("direct", {}),
+    ("engine", {"detection_free": True, "glyph": True, "trim": True}),
+    ("engine", {"detection_free": False, "glyph": False, "trim": True}),
+    ("engine", {"detection_free": False, "glyph": False, "trim": False}),
+]
+
+
+def render_text(text: str, background: Tuple[int, int, int], height: int = 18, padding: int = 6,
+                noise: float = 0.0, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """以固定字型逐字繪製帶黑邊的白色文字（固定字距、不使用反鋸齒，與遊戲的點陣字型相近）"""
+    font, scale, thickness, spacing = cv2.FONT_HERSHEY_SIMPLEX, 0.45, 1, 2
+    sizes = [cv2.getTextSize(char, font, scale, thickness)[0] for char in text]
+    text_h = max(h for _, h in sizes)
+    width = sum(w for w, _ in sizes) + spacing * (len(text) - 1) + padding * 2
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[:] = background
+    if noise and rng is not None:
+        image = np.clip(image + rng.normal(0, noise, image.shape), 0, 255).astype(np.uint8)
+    baseline = (height + text_h) // 2
+    for color, weight in (((0, 0, 0), thickness + 2), ((255, 255, 255), thickness)):
+        x = padding
+        for char, (char_w, _) in zip(text, sizes):
+            cv2.putText(image, char, (x, baseline), font, scale, color, weight, cv2.LINE_8)
+            x += char_w + spacing
+    return image
+
+
+def render_potion(text: str, rng: np.random.Generator) -> np.ndarray:
+    """合成藥水格：暗色背景、右上角的彩色藥水圖示與帶黑邊的白色數字"""
+    slot = rng.integers(40, 60, size=(18, 37, 3), dtype=np.uint8)
+    color = tuple(int(c) for c in rng.integers(0, 256, size=3))
+    cv2.circle(slot, (31, 3), 3, color, -1)
+    # 逐字繪製並保留字距，數字不接觸邊緣（預處理會移除與邊緣相連的元件）
+    font, scale = cv2.FONT_HERSHEY_PLAIN, 0.7
+    for offsets, color in ([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)], (0, 0, 0)), ([(0, 0)], (255, 255, 255)):
+        x = 2
+        for char in text:
+            for dx, dy in offsets:
+                cv2.putText(slot, char, (x + dx, 14 + dy), font, scale, color, 1)
+            x += cv2.getTextSize(char, font, scale, 1)[0][0] + 1
+    return slot
+
+
+def make_synthetic_corpus(count: int = 40, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    合成語料庫：每個類別 count 張
+
+    Returns:
+        list: [{'file', 'class', 'text', 'image'}, ...]
+    """
+    rng = np.random.default_rng(seed)
+    samples = []
+    for index in range(count):
+        maximum = int(rng.integers(100, 99999))
+        hp = f"{int(rng.integers(0, maximum + 1))}/{maximum}"
+        maximum = int(rng.integers(100, 99999))
+        mp = f"{int(rng.integers(0, maximum + 1))}/{maximum}"
+        exp = f"{int(rng.integers(0, 9999999))}[{rng.uniform(0, 99.99):.2f}%]"
+        coin = str(int(rng.integers(0, 99999999)))
+        potion = str(int(rng.integers(1, 9999)))
+        noise = 6.0 if index % 2 else 0.0
+        for class_name, text, image in (
+                ("HP", hp, render_text(hp, (40, 40, 170), noise=noise, rng=rng)),
+                ("MP", mp, render_text(mp, (170, 90, 30), noise=noise, rng=rng)),
+                ("EXP", exp, render_text(exp, (40, 150, 170), noise=noise, rng=rng)),
+                ("楓幣", coin, render_text(coin, (35, 35, 35), noise=noise, rng=rng)),
+                (POTION_CLASS, potion, render_potion(potion, rng))):
+            samples.append({'file': f"{class_name}_{index:04d}.png", 'class': class_name,
+                            'text': text, 'image': image})
+    return samples
+
+
+def load_corpus(directory: str) -> List[Dict[str, Any]]:
+    """載入語料庫目錄（略過未標註的樣本）"""
+    with open(os.path.join(directory, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    samples = []
+    for entry in manifest.get("samples", []):
+        if not entry.get("text"):
+            continue
+        image = np.asarray(Image.open(os.path.join(directory, entry["file"])).convert("RGB"))
+        samples.append({'file': entry["file"], 'class': entry["class"], 'text': entry["text"], 'image': image})
+    return samples
+
+
+def save_corpus(samples: List[Dict[str, Any]], directory: str) -> None:
+    """輸出語料庫（PNG與 labels.json）"""
+    os.makedirs(directory, exist_ok=True)
+    for sample in samples:
+        Image.fromarray(sample['image']).save(os.path.join(directory, sample['file']))
+    manifest = {"samples": [{key: sample[key] for key in ("file", "class", "text")} for sample in samples]}
+    with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def init_manifest(directory: str) -> int:
+    """為目錄中的PNG建立待標註的 labels.json（類別取自檔名，例如 藥水1.png -> 藥水），返回樣本數"""
+    entries = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.png"))):
+        name = os.path.basename(path)
+        class_name = POTION_CLASS if POTION_CLASS in name else name.split("_")[0].split(".")[0]
+        entries.append({"file": name, "class": class_name, "text": ""})
+    with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump({"samples": entries}, f, ensure_ascii=False, indent=2)
+    return len(entries)
+
+
+def build_frames(samples: List[Dict[str, Any]]) -> List[Dict[str, Dict[str, Any]]]:
+    """
+    將樣本組成與實際監控相同的幀：每幀每個狀態類別一張、藥水最多 POTION_SLOTS 張
+
+    Returns:
+        list: [{tab_name: sample}, ...]
+    """
+    by_class: Dict[str, List[Dict[str, Any]]] = {}
+    for sample in samples:
+        by_class.setdefault(sample['class'], []).append(sample)
+    potions = by_class.pop(POTION_CLASS, [])
+    frame_count = max([len(items) for items in by_class.values()] + [1])
+    # 藥水平均分配到各幀（每幀最多 POTION_SLOTS 格）
+    per_frame = min(POTION_SLOTS, -(-len(potions) // frame_count)) if potions else 0
+    potion_chunks = [potions[i:i + per_frame] for i in range(0, len(potions), per_frame)] if per_frame else []
+    frame_count = max(frame_count, len(potion_chunks))
+
+    frames = []
+    for index in range(frame_count):
+        frame = {}
+        for class_name, items in by_class.items():
+            if index < len(items):
+                frame[class_name] = items[index]
+        if index < len(potion_chunks):
+            for slot, sample in enumerate(potion_chunks[index], 1):
+                frame[f"{POTION_CLASS}{slot}"] = sample
+        frames.append(frame)
+    return frames
+
+
+def normalize_text(text: str) -> str:
+    return "".join(str(text).split())
+
+
+def create_engine(reader, allow_list: str, options: Dict[str, Any], use_cache: bool) -> OCREngine:
+    """建立共用同一個已載入後端的引擎（各次執行的快取、圖集與計時互不影響）"""
+    engine = OCREngine(None, allow_list)
+    engine.ocr_reader = reader
+    engine.is_initialized = True
+    engine.ocr_interval = 0
+    engine.detection_free = options.get("detection_free", True)
+    engine.result_cache.enabled = use_cache
+    engine.glyph_recognizer.enabled = options.get("glyph", False)
+    engine.potion_glyph_recognizer.enabled = options.get("glyph", False)
+    engine.region_trimmer.enabled = options.get("trim", True)
+    return engine
+
+
+def run_frame(engine: OCREngine, path: str, images: Dict[str, np.ndarray]) -> Dict[str, str]:
+    """以指定路徑處理一幀，返回 {tab_name: 結果}"""
+    status = {name: image for name, image in images.items() if POTION_CLASS not in name}
+    potions = {name: image for name, image in images.items() if POTION_CLASS in name}
+    results: Dict[str, str] = {}
+
+    if path == "engine":
+        engine.result_callback = lambda tab_name, result, frame_info=None: results.__setitem__(tab_name, result)
+        engine.last_ocr_time = 0
+        engine.process_images(images)
+        return results
+
+    if path == "single":
+        for name, image in status.items():
+            results[name] = engine._process_single_image(image)
+        for name, image in potions.items():
+            results[name] = engine._process_potion_image(image, name)
+        return results
+
+    if status:
+        if path == "merged":
+            engine.tabs_order = list(status)
+            merged_image, tab_positions = engine._merge_images(status)
+            results.update(engine._process_merged_image(merged_image, tab_positions))
+        elif path == "direct":
+            results.update(engine._recognize_regions(status))
+        else:
+            raise ValueError(f"不支援的路徑: {path}")
+    if potions:
+        results.update(engine._process_potion_images(potions))
+    return results
+
+
+def run_glyph(frames: List[Dict[str, Dict[str, Any]]], allow_list: str) -> Tuple[List[Tuple[Dict, Dict]], List[float]]:
+    """
+    字形模板路徑：前半的幀以標註建立圖集，後半的幀評估（不需要OCR後端）
+
+    Returns:
+        tuple: ([(幀, 結果), ...], 各幀延遲列表)
+    """
+    engine = OCREngine(None, allow_list)
+    split = max(1, len(frames) // 2)
+    for frame in frames[:split]:
+        for name, sample in frame.items():
+            if POTION_CLASS in name:
+                processed = to_gray(engine._potions_preprocess_image(sample['image']))
+                engine.potion_glyph_recognizer.learn(processed, sample['text'], 1.0)
+            else:
+                engine.glyph_recognizer.learn(sample['image'], sample['text'], 1.0)
+
+    outcomes = []
+    latencies = []
+    for frame in frames[split:]:
+        results = {}
+        start = time.perf_counter()
+        for name, sample in frame.items():
+            if POTION_CLASS in name:
+                processed = to_gray(engine._potions_preprocess_image(sample['image']))
+                result = engine.potion_glyph_recognizer.recognize(processed)
+            else:
+                result = engine.glyph_recognizer.recognize(sample['image'])
+            results[name] = result[0] if result is not None else ""
+        latencies.append(time.perf_counter() - start)
+        outcomes.append((frame, results))
+    return outcomes, latencies
+
+
+def summarize(outcomes: List[Tuple[Dict, Dict]], latencies: List[float],
+              max_failures: int = 20) -> Dict[str, Any]:
+    """彙整準確率、吞吐量與延遲"""
+    classes: Dict[str, Dict[str, int]] = {}
+    failures = []
+    for frame, results in outcomes:
+        for name, sample in frame.items():
+            counts = classes.setdefault(sample['class'], {'total': 0, 'recognized': 0, 'correct': 0})
+            got = results.get(name, "")
+            counts['total'] += 1
+            if got not in FAILED_RESULTS:
+                counts['recognized'] += 1
+            if normalize_text(got) == normalize_text(sample['text']):
+                counts['correct'] += 1
+            elif len(failures) < max_failures:
+                failures.append({'file': sample['file'], 'class': sample['class'],
+                                 'expected': sample['text'], 'got': got})
+
+    def rates(counts: Dict[str, int]) -> Dict[str, Any]:
+        total = counts['total']
+        return dict(counts,
+                    accuracy=counts['correct'] / total if total else 0.0,
+                    coverage=counts['recognized'] / total if total else 0.0,
+                    precision=counts['correct'] / counts['recognized'] if counts['recognized'] else 0.0)
+
+    overall = {key: sum(counts[key] for counts in classes.values()) for key in ('total', 'recognized', 'correct')}
+    elapsed = sum(latencies)
+    latencies_ms = np.array(latencies) * 1000.0
+    return {
+        'classes': {name: rates(counts) for name, counts in classes.items()},
+        'overall': rates(overall),
+        'frames': len(latencies),
+        'throughput_crops_per_s': overall['total'] / elapsed if elapsed else 0.0,
+        'frame_latency_ms': {
+            'mean': float(latencies_ms.mean()) if latencies else 0.0,
+            'p50': float(np.percentile(latencies_ms, 50)) if latencies else 0.0,
+            'p95': float(np.percentile(latencies_ms, 95)) if latencies else 0.0,
+            'p99': float(np.percentile(latencies_ms, 99)) if latencies else 0.0,
+        },
+        'failures': failures
+    }
+
+
+def run_benchmark(samples: List[Dict[str, Any]], backend: Optional[str], backend_options: Dict[str, Any],
+                  allow_list: str, runs: List[Tuple[str, Dict[str, Any]]], repeat: int = 1,
+                  use_cache: bool = False) -> Dict[str, Any]:
+    """執行所有路徑，返回可序列化為JSON的報告"""
+    frames = build_frames(samples)
+    report: Dict[str, Any] = {
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'backend': backend,
+        'allow_list': allow_list,
+        'samples': len(samples),
+        'classes': sorted({sample['class'] for sample in samples}),
+        'repeat': repeat,
+        'cache': use_cache,
+        'runs': []
+    }
+
+    reader = None
+    if backend is not None and any(path != "glyph" for path, _ in runs):
+        if is_backend_available(backend):
+            start = time.perf_counter()
+            reader = create_backend(backend, ['en'], gpu=False, options=backend_options)
+            reader.load()
+            report['backend_load_s'] = time.perf_counter() - start
+        else:
+            report['backend_error'] = f"未安裝OCR後端: {backend}"
+
+    for path, options in runs:
+        entry: Dict[str, Any] = {'path': path, 'options': options}
+        if path == "glyph":
+            outcomes, latencies = run_glyph(frames, allow_list)
+            entry.update(summarize(outcomes, latencies))
+        elif reader is None:
+            entry['skipped'] = report.get('backend_error', "未指定OCR後端")
+        else:
+            engine = create_engine(reader, allow_list, options, use_cache)
+            outcomes = []
+            latencies = []
+            for _ in range(repeat):
+                for frame in frames:
+                    images = {name: sample['image'] for name, sample in frame.items()}
+                    start = time.perf_counter()
+                    results = run_frame(engine, path, images)
+                    latencies.append(time.perf_counter() - start)
+                    outcomes.append((frame, results))
+                # 下一輪重新辨識（區域變化偵測會略過相同的像素）
+                engine.change_tracker.reset()
+            entry.update(summarize(outcomes, latencies))
+            entry['stages'] = engine.get_timing_stats()['stages']
+        report['runs'].append(entry)
+    return report
+
+
+def parse_runs(text: Optional[str]) -> List[Tuple[str, Dict[str, Any]]]:
+    """解析 --paths（例如 "single,direct,engine"，engine 使用預設選項）"""
+    if not text:
+        return DEFAULT_RUNS
+    runs = []
+    for path in text.split(","):
+        path = path.strip()
+        matching = [run for run in DEFAULT_RUNS if run[0] == path]
+        if not matching:
+            raise ValueError(f"不支援的路徑: {path}")
+        runs.extend(matching)
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR準確率與吞吐量基準測試")
+    parser.add_argument("--corpus", help="語料庫目錄（含 labels.json）")
+    parser.add_argument("--synthetic-count", type=int, default=40, help="合成語料庫每個類別的數量")
+    parser.add_argument("--save-corpus", metavar="DIR", help="輸出合成語料庫後結束")
+    parser.add_argument("--init-manifest", metavar="DIR", help="為目錄中的PNG建立待標註的 labels.json 後結束")
+    parser.add_argument("--backend", default=BACKEND_EASYOCR, help="OCR後端（easyocr、onnx 或 none）")
+    parser.add_argument("--model-dir", default="", help="ONNX模型目錄")
+    parser.add_argument("--quantized", action="store_true", help="使用int8量化的ONNX模型")
+    parser.add_argument("--allow-list", default="0123456789.[]/%", help="OCR允許字符")
+    parser.add_argument("--paths", help="要執行的路徑（逗號分隔）: glyph,single,merged,direct,engine")
+    parser.add_argument("--repeat", type=int, default=1, help="每條路徑重複處理語料庫的次數")
+    parser.add_argument("--cache", action="store_true", help="啟用OCR結果快取（預設停用以量測實際推論）")
+    parser.add_argument("--output", help="JSON報告輸出檔案（預設輸出到標準輸出）")
+    args = parser.parse_args()
+
+    if args.init_manifest:
+        count = init_manifest(args.init_manifest)
+        print(f"已建立 {os.path.join(args.init_manifest, MANIFEST_FILE)}（{count} 張，請填寫 text 欄位）")
+        return
+    samples = load_corpus(args.corpus) if args.corpus else make_synthetic_corpus(args.synthetic_count)
+    if args.save_corpus:
+        save_corpus(samples, args.save_corpus)
+        print(f"已輸出 {len(samples)} 張至 {args.save_corpus}")
+        return
+    if not samples:
+        print("語料庫沒有已標註的樣本")
+        sys.exit(1)
+
+    backend = None if args.backend == "none" else args.backend
+    options = {"model_dir": args.model_dir, "quantized": args.quantized} if backend == "onnx" else {}
+    report = run_benchmark(samples, backend, options, args.allow_list, parse_runs(args.paths),
+                           max(1, args.repeat), args.cache)
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
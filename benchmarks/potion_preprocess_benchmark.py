@@ -0,0 +1,126 @@
+"""
+Potion Preprocess Benchmark
+藥水預處理效能比較：原本逐像素 floodFill / 逐標籤清除的版本與向量化版本的每格延遲
+
+用法:
+    python benchmarks/potion_preprocess_benchmark.py [--images 目錄] [--repeat 次數]
+
+未指定 --images 時使用合成的藥水格圖像（37x18，與預設區域大小相同）。
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+import cv2
+from PIL import Image
+
+# 添加專案根目錄到Python路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr.ocr_engine import OCREngine
+
+
+def legacy_preprocess(image):
+    """向量化之前的實作（作為比較基準與輸出一致性檢查）"""
+    img = np.asarray(image)
+    scale = max(min(80 / img.shape[0], 1), 3)
+    img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+    output = img.copy()
+    output[hsv[:, :, 1] > 80] = [0, 0, 0]
+    output = cv2.cvtColor(output, cv2.COLOR_BGR2GRAY)
+    output = cv2.adaptiveThreshold(output, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 13, 3)
+    output = cv2.morphologyEx(output, cv2.MORPH_CLOSE, np.ones((3, 3), np.uint8), iterations=1)
+
+    h, w = output.shape
+    mask = np.zeros((h + 2, w + 2), np.uint8)
+    floodfilled = output.copy()
+    for x in range(w):
+        if floodfilled[0, x] == 255:
+            cv2.floodFill(floodfilled, mask, (x, 0), 0)
+        if floodfilled[h - 1, x] == 255:
+            cv2.floodFill(floodfilled, mask, (x, h - 1), 0)
+    for y in range(h):
+        if floodfilled[y, 0] == 255:
+            cv2.floodFill(floodfilled, mask, (0, y), 0)
+        if floodfilled[y, w - 1] == 255:
+            cv2.floodFill(floodfilled, mask, (w - 1, y), 0)
+    output = floodfilled
+
+    kernel = np.ones((4, 4), np.uint8) if min(img.shape[0], img.shape[1]) > 100 else np.ones((2, 2), np.uint8)
+    output = cv2.morphologyEx(output, cv2.MORPH_OPEN, kernel, iterations=1)
+    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(output, connectivity=8)
+    if num_labels > 5:
+        min_area = max(sorted(stats[1:, cv2.CC_STAT_AREA])[-4], img.shape[0] * img.shape[1] * 0.01)
+    else:
+        min_area = img.shape[0] * img.shape[1] * 0.01
+    for i in range(1, num_labels):
+        if stats[i, cv2.CC_STAT_AREA] < min_area:
+            output[labels == i] = 0
+    return output
+
+
+def make_synthetic_slots(count: int = 8, seed: int = 0):
+    """合成藥水格：彩色藥水圖示、雜訊背景與左下角帶黑邊的白色數字（一半使用高對比的雜亂背景）"""
+    rng = np.random.default_rng(seed)
+    slots = []
+    for index in range(count):
+        low, high = (30, 90) if index % 2 == 0 else (0, 256)
+        slot = rng.integers(low, high, size=(18, 37, 3), dtype=np.uint8)
+        color = tuple(int(c) for c in rng.integers(0, 256, size=3))
+        cv2.circle(slot, (24, 8), 7, color, -1)
+        text = str(int(rng.integers(1, 9999)))
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                cv2.putText(slot, text, (1 + dx, 16 + dy), cv2.FONT_HERSHEY_PLAIN, 0.8, (0, 0, 0), 1)
+        cv2.putText(slot, text, (1, 16), cv2.FONT_HERSHEY_PLAIN, 0.8, (255, 255, 255), 1)
+        slots.append(slot)
+    return slots
+
+
+def load_slots(directory: str):
+    """載入目錄中的藥水格PNG（例如除錯時保存的 tmp/藥水*.png）"""
+    paths = sorted(glob.glob(os.path.join(directory, "*.png")))
+    return [np.asarray(Image.open(path).convert("RGB")) for path in paths]
+
+
+def measure(function, slots, repeat: int):
+    """返回每格延遲（毫秒）的列表"""
+    timings = []
+    for _ in range(repeat):
+        for slot in slots:
+            start = time.perf_counter()
+            function(slot)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="藥水預處理效能比較")
+    parser.add_argument("--images", help="藥水格PNG所在目錄")
+    parser.add_argument("--repeat", type=int, default=50, help="每格重複次數")
+    args = parser.parse_args()
+
+    slots = load_slots(args.images) if args.images else make_synthetic_slots()
+    if not slots:
+        print("找不到藥水格圖像")
+        return
+
+    engine = OCREngine(None)
+    mismatched = sum(
+        not np.array_equal(legacy_preprocess(slot), engine._potions_preprocess_image(slot)) for slot in slots)
+
+    print(f"藥水格數量: {len(slots)}，每格重複 {args.repeat} 次，輸出不一致: {mismatched}")
+    print(f"{'版本':<8}{'平均(ms)':>10}{'p50(ms)':>10}{'p95(ms)':>10}")
+    for name, function in (("原本", legacy_preprocess), ("向量化", engine._potions_preprocess_image)):
+        timings = measure(function, slots, args.repeat)
+        print(f"{name:<8}{np.mean(timings):>10.3f}{np.percentile(timings, 50):>10.3f}"
+              f"{np.percentile(timings, 95):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,11 @@ Capture Package
 
 import sys
 from .base_capture import BaseCaptureEngine, create_capture_engine
+from .frame_buffer import FrameBuffer, FrameInfo
+from .frame_dispatcher import FrameDispatcher
+from .frame_recorder import FrameRecorder, FrameRecording
+from .pixel_format import NativeFrame
+from .replay_capture import ReplayCaptureEngine
 from utils.log import get_logger
 
 logger = get_logger(__name__)
@@ -30,10 +35,22 @@ if sys.platform == "darwin":
 else:
     MAC_AVAILABLE = False
 
+if sys.platform.startswith("linux"):
+    try:
+        from .linux_capture import LinuxCaptureEngine, XLIB_AVAILABLE as LINUX_AVAILABLE
+    except ImportError:
+        LINUX_AVAILABLE = False
+        logger.warning("警告: Linux捕捉引擎導入失敗")
+else:
+    LINUX_AVAILABLE = False
+
 # 根據可用性決定導出的類別
-__all__ = ['BaseCaptureEngine', 'create_capture_engine']
+__all__ = ['BaseCaptureEngine', 'create_capture_engine', 'FrameBuffer', 'FrameInfo', 'FrameDispatcher', 'FrameRecorder', 'FrameRecording',
+           'NativeFrame', 'ReplayCaptureEngine']
 
 if WINDOWS_AVAILABLE:
     __all__.append('WindowsCaptureEngine')
 if MAC_AVAILABLE:
     __all__.append('MacCaptureEngine')
+if LINUX_AVAILABLE:
+    __all__.append('LinuxCaptureEngine')
@@ -4,21 +4,32 @@ Base Capture Module
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, Union
 from PIL import Image
+import numpy as np
 import time
 import threading
 from utils.log import get_logger
+from .frame_buffer import FrameBuffer, FrameInfo
+from .frame_recorder import FrameRecorder
+from .pixel_format import NativeFrame, get_frame_size, to_native, to_rgb
 
 logger = get_logger(__name__)
 
+# 捕捉模式
+CAPTURE_MODE_FULL = "full"        # 每次捕捉完整視窗
+CAPTURE_MODE_REGIONS = "regions"  # 僅捕捉涵蓋所有監測區域的最小矩形
+
+RECT_CAPTURE_MAX_FAILURES = 3         # 區域捕捉連續失敗幾次後暫停使用
+RECT_CAPTURE_RETRY_INTERVAL = 30.0    # 暫停區域捕捉後多久重試（秒）
+
 class BaseCaptureEngine(ABC):
     """捕捉引擎抽象基類，支援多執行緒快取與自動更新"""
 
     def __init__(self):
         self.is_initialized = False
         self.current_resources = None
-        self.latest_image = None
+        self.frame_buffer = FrameBuffer()
         self.cache_lock = threading.Lock()
         self.current_window_handle = None
         self.last_window_handle = None
@@ -27,7 +38,20 @@ class BaseCaptureEngine(ABC):
         self.capture_thread = None
         self.capture_lock = threading.Lock()
         self.capture_fps = 2.0  # FPS
+        self.rate_scheduler = None  # 自適應頻率排程器（未設定時使用固定的 capture_fps）
+        self.frame_recorder: Optional[FrameRecorder] = None  # 錄製中時不為None
         self._stop_event = threading.Event()
+        self._frame_condition = threading.Condition()  # 新幀寫入時通知等待者
+        # 區域聯集捕捉相關
+        self.capture_mode = CAPTURE_MODE_FULL
+        self.capture_regions: Dict[str, Dict[str, int]] = {}
+        self.capture_margin = 2  # 聯集矩形外擴像素
+        self._capture_box: Optional[Tuple[int, int, int, int]] = None  # (x, y, w, h)
+        self._window_size: Optional[Tuple[int, int]] = None
+        # 子類別未覆寫 capture_rect 時永遠使用完整視窗捕捉
+        self._rect_capture_implemented = type(self).capture_rect is not BaseCaptureEngine.capture_rect
+        self._rect_capture_failures = 0
+        self._rect_capture_retry_at: Optional[float] = None  # 暫停區域捕捉時的重試時間
 
     def initialize(self, window_handle: Any) -> bool:
         """
@@ -35,6 +59,9 @@ class BaseCaptureEngine(ABC):
         """
         self.last_window_handle = window_handle
         self.current_window_handle = window_handle
+        self._capture_box = None
+        self._window_size = None
+        self._reset_rect_capture()
         window_rect = self.get_window_rect(window_handle)
         if window_rect:
             full_region = {
@@ -67,12 +94,214 @@ class BaseCaptureEngine(ABC):
         """清理捕捉資源"""
         self.current_window_handle = None
         with self.cache_lock:
-            self.latest_image = None
+            self.frame_buffer.clear()
         self.cleanup_resources()
 
+    def get_region_array(self, x: int, y: int, w: int, h: int) -> Optional[np.ndarray]:
+        """
+        從最新擷取的完整圖像中取得指定區域的唯讀RGB圖像（只複製此區域）
+        
+        Args:
+            x, y: 區域左上角座標（相對於視窗）
+            w, h: 區域寬度和高度
+            
+        Returns:
+            np.ndarray: 區域的唯讀RGB圖像 (h, w, 3)，尚無圖像時返回None
+        """
+        result = self.get_region_frame(x, y, w, h)
+        return result[0] if result else None
+
+    def get_region_frame(self, x: int, y: int, w: int, h: int) -> Optional[Tuple[np.ndarray, FrameInfo]]:
+        """
+        取得指定區域的唯讀RGB圖像與其所屬幀的資訊（幀序號、擷取時間）
+        
+        Args:
+            x, y: 區域左上角座標（相對於視窗）
+            w, h: 區域寬度和高度
+            
+        Returns:
+            tuple: (區域的唯讀RGB圖像, 幀資訊)，尚無圖像時返回None
+        """
+        try:
+            return self.frame_buffer.get_view_with_info(x, y, w, h)
+        except ValueError:
+            if self.capture_mode == CAPTURE_MODE_REGIONS and self.frame_buffer.size != self._window_size:
+                # 區域不在目前的聯集矩形內，下一次改為捕捉完整視窗
+                self._capture_box = None
+                return None
+            raise
+
+    def get_region_frames(self, regions: Dict[str, Dict[str, int]]) -> Tuple[Dict[str, Optional[np.ndarray]], Optional[FrameInfo]]:
+        """
+        從同一幀一次裁切多個區域的唯讀RGB圖像
+        
+        Args:
+            regions: {name: {'x': int, 'y': int, 'w': int, 'h': int}}
+            
+        Returns:
+            tuple: ({name: 區域圖像，超出範圍時為None}, 幀資訊)，尚無圖像時幀資訊為None
+        """
+        views, info = self.frame_buffer.get_views_with_info(regions)
+        if (info is not None and self.capture_mode == CAPTURE_MODE_REGIONS and
+                any(view is None for view in views.values()) and
+                self.frame_buffer.size != self._window_size):
+            # 有區域不在目前的聯集矩形內，下一次改為捕捉完整視窗
+            self._capture_box = None
+        return views, info
+
+    def wait_for_frame(self, last_frame_id: int = 0, timeout: Optional[float] = None) -> Optional[FrameInfo]:
+        """
+        等待比 last_frame_id 更新的幀
+        
+        Args:
+            last_frame_id: 已處理過的最後幀序號
+            timeout: 最長等待時間（秒），None 表示無限等待
+            
+        Returns:
+            FrameInfo: 新幀的資訊，逾時或捕捉停止時返回None
+        """
+        def has_new_frame():
+            info = self.frame_buffer.latest_info
+            return info is not None and info.frame_id > last_frame_id
+
+        with self._frame_condition:
+            self._frame_condition.wait_for(
+                lambda: has_new_frame() or self._stop_event.is_set(), timeout)
+        return self.frame_buffer.latest_info if has_new_frame() else None
+
+    def _notify_frame_waiters(self) -> None:
+        """喚醒所有等待新幀的執行緒"""
+        with self._frame_condition:
+            self._frame_condition.notify_all()
+
+    def set_capture_mode(self, mode: str) -> None:
+        """
+        設定捕捉模式
+        
+        Args:
+            mode: CAPTURE_MODE_FULL 或 CAPTURE_MODE_REGIONS
+        """
+        if mode not in (CAPTURE_MODE_FULL, CAPTURE_MODE_REGIONS):
+            raise ValueError(f"不支援的捕捉模式: {mode}")
+        self.capture_mode = mode
+        self._capture_box = None
+
+    def set_capture_regions(self, regions: Dict[str, Dict[str, int]]) -> None:
+        """
+        設定目前啟用的監測區域（區域集合變更時回退為完整視窗捕捉）
+        
+        Args:
+            regions: {tab_name: {'x': int, 'y': int, 'w': int, 'h': int}}
+        """
+        regions = {name: dict(region) for name, region in regions.items() if region}
+        if regions != self.capture_regions:
+            self.capture_regions = regions
+            self._capture_box = None
+            self._reset_rect_capture()
+
+    def _compute_capture_box(self, window_w: int, window_h: int) -> Optional[Tuple[int, int, int, int]]:
+        """
+        計算涵蓋所有監測區域的最小矩形（限制在視窗範圍內）
+        
+        Returns:
+            tuple: (x, y, w, h)，沒有區域時返回None
+        """
+        if not self.capture_regions:
+            return None
+        margin = self.capture_margin
+        x1 = min(r['x'] for r in self.capture_regions.values()) - margin
+        y1 = min(r['y'] for r in self.capture_regions.values()) - margin
+        x2 = max(r['x'] + r['w'] for r in self.capture_regions.values()) + margin
+        y2 = max(r['y'] + r['h'] for r in self.capture_regions.values()) + margin
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(window_w, x2), min(window_h, y2)
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return (x1, y1, x2 - x1, y2 - y1)
+
+    def _capture_frame(self) -> Tuple[Optional[Union[Image.Image, np.ndarray, NativeFrame]], Tuple[int, int]]:
+        """
+        依捕捉模式擷取一幀
+        
+        Returns:
+            tuple: (圖像, 圖像左上角在視窗中的座標)
+        """
+        failed_box = None
+        if self.capture_mode == CAPTURE_MODE_REGIONS and self._rect_capture_implemented:
+            window_rect = self.get_window_rect(self.current_window_handle)
+            window_size = (window_rect[2] - window_rect[0], window_rect[3] - window_rect[1]) if window_rect else None
+            if window_size != self._window_size:
+                # 視窗尺寸改變，回退為完整視窗捕捉並重新計算
+                self._window_size = window_size
+                self._capture_box = None
+                self._reset_rect_capture()
+            elif self._capture_box is not None and self._rect_capture_available():
+                capture_box = self._capture_box  # 其他執行緒可能同時重設
+                image = self.capture_rect(*capture_box)
+                if image is not None:
+                    self._rect_capture_failures = 0
+                    return image, capture_box[:2]
+                failed_box = capture_box
+
+        # 區域捕捉失敗時只有這一幀改用完整視窗捕捉
+        image = self.capture_window()
+        if image is not None and failed_box is not None:
+            self._record_rect_failure(image, failed_box)
+        if image is not None and self.capture_mode == CAPTURE_MODE_REGIONS:
+            width, height = get_frame_size(image)
+            self._capture_box = self._compute_capture_box(width, height)
+            logger.debug(f"區域聯集捕捉範圍: {self._capture_box}")
+        return image, (0, 0)
+
+    def _rect_capture_available(self) -> bool:
+        """區域捕捉是否可用（暫停期間到達重試時間後恢復）"""
+        if self._rect_capture_retry_at is None:
+            return True
+        if time.monotonic() < self._rect_capture_retry_at:
+            return False
+        logger.debug("重試區域捕捉")
+        self._reset_rect_capture()
+        return True
+
+    def _reset_rect_capture(self) -> None:
+        """清除區域捕捉的失敗計數與暫停狀態"""
+        self._rect_capture_failures = 0
+        self._rect_capture_retry_at = None
+
+    def _record_rect_failure(self, image: Union[Image.Image, np.ndarray, NativeFrame],
+                             box: Tuple[int, int, int, int]) -> None:
+        """
+        記錄一次區域捕捉失敗
+
+        只有完整視窗捕捉在同一範圍內有內容時才計入失敗；兩者都是全黑時
+        （切換地圖、讀取畫面）是畫面本身為黑，不代表區域捕捉無法使用。
+        """
+        x, y, w, h = box
+        frame = to_native(image)
+        if not to_rgb(frame.pixels[y:y + h, x:x + w], frame.pixel_format).any():
+            self._rect_capture_failures = 0
+            return
+        self._rect_capture_failures += 1
+        if self._rect_capture_failures >= RECT_CAPTURE_MAX_FAILURES:
+            logger.warning(f"區域捕捉連續失敗，{RECT_CAPTURE_RETRY_INTERVAL:.0f} 秒內改用完整視窗捕捉")
+            self._rect_capture_retry_at = time.monotonic() + RECT_CAPTURE_RETRY_INTERVAL
+
+    def capture_rect(self, x: int, y: int, w: int, h: int) -> Optional[Union[Image.Image, np.ndarray, NativeFrame]]:
+        """
+        只捕捉視窗中的指定矩形（子類別可覆寫以減少擷取量）
+        
+        Args:
+            x, y: 矩形左上角座標（相對於視窗）
+            w, h: 矩形寬度和高度
+        
+        Returns:
+            NativeFrame、PIL.Image 或 np.ndarray(RGB): 捕捉到的圖像，不支援或失敗時返回None
+        """
+        return None
+
     def get_region(self, x: int, y: int, w: int, h: int) -> Optional[Image.Image]:
         """
-        從最新擷取的完整圖像中裁切指定區域
+        從最新擷取的完整圖像中裁切指定區域（轉換為PIL圖像，僅在需要PIL時使用）
         
         Args:
             x, y: 區域左上角座標（相對於視窗）
@@ -81,17 +310,21 @@ class BaseCaptureEngine(ABC):
         Returns:
             PIL.Image: 裁切的區域圖像，失敗時返回None
         """
-        with self.cache_lock:
-            if self.latest_image is None:
-                return None
-            img_w, img_h = self.latest_image.size
-            if x < 0 or y < 0 or x + w > img_w or y + h > img_h:
-                raise ValueError("裁切區域超出圖像範圍")
-            try:
-                cropped = self.latest_image.crop((x, y, x + w, y + h))
-                return cropped
-            except Exception:
-                return None
+        region = self.get_region_array(x, y, w, h)
+        if region is None:
+            return None
+        try:
+            return Image.fromarray(region)
+        except Exception:
+            return None
+
+    def get_latest_frame(self) -> Optional[np.ndarray]:
+        """獲取最新完整幀的唯讀原生視圖（像素格式見 frame_buffer.pixel_format）"""
+        return self.frame_buffer.latest
+
+    def get_latest_frame_info(self) -> Optional[FrameInfo]:
+        """獲取最新幀的幀資訊"""
+        return self.frame_buffer.latest_info
 
     def start_capture(self) -> bool:
         """
@@ -111,14 +344,66 @@ class BaseCaptureEngine(ABC):
             return
         self.is_running = False
         self._stop_event.set()
+        self._notify_frame_waiters()
         if self.capture_thread and self.capture_thread.is_alive():
             self.capture_thread.join(timeout=1.0)
+        self.stop_recording()
         self.cleanup()
 
     def set_capture_fps(self, fps: float):
         """更新捕捉頻率"""
         self.capture_fps = fps
 
+    def start_recording(self, path: str, slot_count: int = 300, regions_only: bool = True) -> bool:
+        """
+        開始將捕捉到的幀錄製到記憶體映射環形檔案（寫入在背景執行緒進行）
+        
+        Args:
+            path: 錄製檔路徑
+            slot_count: 最多保留的幀數
+            regions_only: True 只錄製目前的監測區域，False 錄製整張幀
+        
+        Returns:
+            bool: 是否成功開始錄製
+        """
+        self.stop_recording()
+        window_rect = self.get_window_rect(self.current_window_handle) if self.current_window_handle else None
+        window_size = (window_rect[2] - window_rect[0], window_rect[3] - window_rect[1]) if window_rect else None
+        try:
+            if regions_only:
+                if not self.capture_regions:
+                    logger.warning("沒有監測區域，無法錄製")
+                    return False
+                recorder = FrameRecorder(path, slot_count, regions=self.capture_regions, window_size=window_size)
+            else:
+                if window_size is None:
+                    logger.warning("無法取得視窗尺寸，無法錄製")
+                    return False
+                recorder = FrameRecorder(path, slot_count, max_size=window_size, window_size=window_size)
+            recorder.open()
+        except (OSError, ValueError) as e:
+            logger.error(f"開始錄製失敗: {e}")
+            return False
+        self.frame_recorder = recorder
+        return True
+
+    def stop_recording(self) -> None:
+        """停止錄製"""
+        recorder = self.frame_recorder
+        if recorder is not None:
+            self.frame_recorder = None
+            recorder.close()
+
+    def set_rate_scheduler(self, rate_scheduler) -> None:
+        """設定自適應頻率排程器（None 表示使用固定的 capture_fps）"""
+        self.rate_scheduler = rate_scheduler
+
+    def _get_capture_interval(self) -> float:
+        """獲取兩次捕捉之間的等待時間（秒）"""
+        if self.rate_scheduler is not None:
+            return self.rate_scheduler.get_capture_interval()
+        return 1.0 / self.capture_fps
+
     def _capture_loop(self):
         """自動捕捉循環"""
         logger.debug("開始自動捕捉循環")
@@ -127,18 +412,25 @@ class BaseCaptureEngine(ABC):
                 if not self.is_window_valid(self.current_window_handle):
                     break
                 with self.capture_lock:
-                    full_image = self.capture_window()
-                    if full_image:
-                        logger.debug(f"捕捉到新圖像: {full_image.size}")
-                        with self.cache_lock:
-                            self.latest_image = full_image
+                    capture_time = time.time()
+                    full_image, origin = self._capture_frame()
+                    if full_image is not None:
+                        # 複製到預先配置的緩衝槽，不再保留整張PIL圖像
+                        frame = self.frame_buffer.write(full_image, origin, capture_time)
+                        logger.debug(f"捕捉到新圖像: {frame.shape[1]}x{frame.shape[0]}")
+                        # 錄製器在 submit 中複製像素，不會持有緩衝槽的視圖
+                        recorder = self.frame_recorder
+                        if recorder is not None:
+                            recorder.submit(frame, origin, self.frame_buffer.latest_info,
+                                            self.frame_buffer.pixel_format)
+                        self._notify_frame_waiters()
                     else:
                         logger.warning("捕捉失敗，將重試")
                 
             except Exception as e:
                 logger.error(f"捕捉循環錯誤: {e}")
             finally:
-                interval = 1.0 / self.capture_fps
+                interval = self._get_capture_interval()
                 if not self._stop_event.wait(interval):
                     continue
                 else:
@@ -160,12 +452,13 @@ class BaseCaptureEngine(ABC):
         pass
     
     @abstractmethod
-    def capture_window(self) -> Optional[Image.Image]:
+    def capture_window(self) -> Optional[Union[Image.Image, np.ndarray, NativeFrame]]:
         """
         捕捉指定區域
         
         Returns:
-            PIL.Image: 捕捉到的圖像，失敗時返回None
+            NativeFrame: 原生像素格式的幀（建議，格式轉換延後到裁切區域時），
+            或 PIL.Image / np.ndarray: RGB圖像；失敗時返回None
         """
         pass
     
@@ -212,13 +505,22 @@ class BaseCaptureEngine(ABC):
 
 
 
-def create_capture_engine() -> BaseCaptureEngine:
+def create_capture_engine(replay_source: Optional[str] = None) -> BaseCaptureEngine:
     """
     根據當前平台創建對應的捕捉引擎
+
+    Args:
+        replay_source: 回放來源路徑（PNG資料夾或打包幀檔案），
+                       未指定時讀取環境變數 GAME_MONITOR_REPLAY
     Returns:
         BaseCaptureEngine: 捕捉引擎實例
     """
+    import os
     import platform
+    replay_source = replay_source or os.environ.get("GAME_MONITOR_REPLAY")
+    if replay_source:
+        from .replay_capture import ReplayCaptureEngine
+        return ReplayCaptureEngine(replay_source)
     system = platform.system().lower()
     if system == "windows":
         from .windows_capture import WindowsCaptureEngine
@@ -226,5 +528,8 @@ def create_capture_engine() -> BaseCaptureEngine:
     elif system == "darwin":  # Mac
         from .mac_capture import MacCaptureEngine
         return MacCaptureEngine()
+    elif system == "linux":  # X11（含Wine/Proton下執行的客戶端）
+        from .linux_capture import LinuxCaptureEngine
+        return LinuxCaptureEngine()
     else:
         raise NotImplementedError(f"不支援的平台: {system}")
@@ -0,0 +1,183 @@
+"""
+Frame Buffer Module
+預先配置的NumPy幀緩衝區，以原生像素格式儲存並只轉換裁切的區域
+"""
+
+import time
+from typing import Optional, Tuple, Union, NamedTuple, Dict
+from PIL import Image
+import numpy as np
+
+from .pixel_format import NativeFrame, PIXEL_FORMAT_RGB, to_native, to_rgb
+
+
+class FrameInfo(NamedTuple):
+    """幀識別資訊（隨幀、裁切區域與OCR結果一起傳遞）"""
+    frame_id: int     # 單調遞增的幀序號
+    timestamp: float  # 擷取時間 (time.time())
+
+
+class FrameBuffer:
+    """
+    環形多緩衝幀儲存
+
+    每次寫入時將新幀以捕捉引擎的原生像素格式（例如BGRX）複製到下一個預先配置的緩衝槽中，
+    不做整張畫面的格式轉換；裁切區域時才將該區域轉換為RGB。
+    裁切結果一律為獨立的唯讀陣列（RGB幀複製區域，原生格式轉換時產生新陣列），
+    不會引用緩衝槽，OCR等長時間持有區域圖像的使用者不受之後的寫入影響。
+    寫入只會覆寫非最新的緩衝槽，發佈最新幀為單一參考賦值；裁切只在複製區域的短暫期間讀取緩衝槽。
+    latest 與 write() 返回的整幀視圖仍會在 slots - 1 次寫入後被覆寫，需要保存時應自行複製。
+    """
+
+    def __init__(self, slots: int = 4):
+        self.slots = max(2, slots)
+        self._buffers = []
+        self._shape = None
+        self._index = -1
+        self._next_frame_id = 1
+        # (唯讀原生視圖, 幀左上角在視窗中的座標, 幀資訊, 像素格式)，以單一元組發佈確保四者一致
+        self._latest: Optional[Tuple[np.ndarray, Tuple[int, int], FrameInfo, str]] = None
+
+    def write(self, frame: Union[np.ndarray, Image.Image, NativeFrame], origin: Tuple[int, int] = (0, 0),
+              timestamp: Optional[float] = None) -> np.ndarray:
+        """
+        寫入新幀
+
+        Args:
+            frame: 新幀（原生幀，或視為RGB的NumPy陣列/PIL圖像）
+            origin: 幀左上角在視窗中的座標（僅擷取部分視窗時不為 (0, 0)）
+            timestamp: 擷取時間，未指定時使用目前時間
+
+        Returns:
+            np.ndarray: 新幀的唯讀原生視圖
+        """
+        native = to_native(frame)
+        array = native.pixels
+        if not self._buffers or array.shape != self._shape or array.dtype != self._buffers[0].dtype:
+            self._allocate(array.shape, array.dtype)
+
+        self._index = (self._index + 1) % self.slots
+        buffer = self._buffers[self._index]
+        np.copyto(buffer, array)
+
+        view = buffer.view()
+        view.flags.writeable = False
+        info = FrameInfo(self._next_frame_id, timestamp if timestamp is not None else time.time())
+        self._next_frame_id += 1
+        self._latest = (view, (int(origin[0]), int(origin[1])), info, native.pixel_format)
+        return view
+
+    def _allocate(self, shape, dtype) -> None:
+        """依新尺寸重新配置緩衝槽"""
+        self._buffers = [np.empty(shape, dtype=dtype) for _ in range(self.slots)]
+        self._shape = shape
+        self._index = -1
+
+    def get_view_with_info(self, x: int, y: int, w: int, h: int) -> Optional[Tuple[np.ndarray, FrameInfo]]:
+        """
+        取得最新幀中指定區域的RGB圖像與幀資訊（只複製或轉換此區域）
+
+        Args:
+            x, y: 區域左上角座標（相對於視窗）
+            w, h: 區域寬度和高度
+
+        Returns:
+            tuple: (區域RGB圖像, 幀資訊)，尚無幀時返回None
+        """
+        published = self._latest  # 取得參考後即不受後續寫入影響
+        if published is None:
+            return None
+        latest, (origin_x, origin_y), info, pixel_format = published
+        x -= origin_x
+        y -= origin_y
+        img_h, img_w = latest.shape[:2]
+        if x < 0 or y < 0 or x + w > img_w or y + h > img_h:
+            raise ValueError("裁切區域超出圖像範圍")
+        return self._crop_rgb(latest, pixel_format, x, y, w, h), info
+
+    def get_views_with_info(self, regions: Dict[str, Dict[str, int]]) -> Tuple[Dict[str, Optional[np.ndarray]], Optional[FrameInfo]]:
+        """
+        從同一幀一次取得多個區域的RGB圖像
+
+        Args:
+            regions: {name: {'x': int, 'y': int, 'w': int, 'h': int}}（座標相對於視窗）
+
+        Returns:
+            tuple: ({name: 區域RGB圖像，超出範圍時為None}, 幀資訊)，尚無幀時幀資訊為None
+        """
+        published = self._latest
+        if published is None:
+            return {}, None
+        latest, (origin_x, origin_y), info, pixel_format = published
+        img_h, img_w = latest.shape[:2]
+        views: Dict[str, Optional[np.ndarray]] = {}
+        for name, region in regions.items():
+            x = region['x'] - origin_x
+            y = region['y'] - origin_y
+            w, h = region['w'], region['h']
+            if x < 0 or y < 0 or x + w > img_w or y + h > img_h:
+                views[name] = None
+            else:
+                views[name] = self._crop_rgb(latest, pixel_format, x, y, w, h)
+        return views, info
+
+    @staticmethod
+    def _crop_rgb(frame: np.ndarray, pixel_format: str, x: int, y: int, w: int, h: int) -> np.ndarray:
+        """裁切區域並轉換為RGB（返回不引用緩衝槽的唯讀陣列）"""
+        crop = frame[y:y + h, x:x + w]
+        if pixel_format == PIXEL_FORMAT_RGB:
+            rgb = np.array(crop)  # 區域很小，複製成本遠低於OCR；不複製時緩衝槽輪替後會被覆寫
+        else:
+            rgb = to_rgb(crop, pixel_format)
+        rgb.flags.writeable = False
+        return rgb
+
+    def get_view(self, x: int, y: int, w: int, h: int) -> Optional[np.ndarray]:
+        """
+        取得最新幀中指定區域的唯讀RGB圖像
+
+        Args:
+            x, y: 區域左上角座標（相對於視窗）
+            w, h: 區域寬度和高度
+
+        Returns:
+            np.ndarray: 區域RGB圖像，尚無幀時返回None
+        """
+        result = self.get_view_with_info(x, y, w, h)
+        return result[0] if result else None
+
+    @property
+    def latest(self) -> Optional[np.ndarray]:
+        """最新幀的唯讀原生視圖（像素格式見 pixel_format）"""
+        published = self._latest
+        return published[0] if published else None
+
+    @property
+    def origin(self) -> Tuple[int, int]:
+        """最新幀左上角在視窗中的座標"""
+        published = self._latest
+        return published[1] if published else (0, 0)
+
+    @property
+    def pixel_format(self) -> str:
+        """最新幀的像素格式"""
+        published = self._latest
+        return published[3] if published else PIXEL_FORMAT_RGB
+
+    @property
+    def latest_info(self) -> Optional[FrameInfo]:
+        """最新幀的幀資訊"""
+        published = self._latest
+        return published[2] if published else None
+
+    @property
+    def size(self) -> Optional[tuple]:
+        """最新幀尺寸 (width, height)"""
+        latest = self.latest
+        if latest is None:
+            return None
+        return latest.shape[1], latest.shape[0]
+
+    def clear(self) -> None:
+        """清除最新幀（保留已配置的緩衝槽，幀序號持續遞增）"""
+        self._latest = None
@@ -0,0 +1,179 @@
+"""
+Frame Dispatcher Module
+幀分派模組：單一執行緒等待新幀，一次裁切所有區域並發佈給各分頁與OCR
+"""
+
+import threading
+import time
+from typing import Optional, Dict, Any, Tuple, Callable, List
+import numpy as np
+
+from utils.log import get_logger
+from .base_capture import BaseCaptureEngine
+from .frame_buffer import FrameInfo
+
+logger = get_logger(__name__)
+
+# 區域裁切結果：(唯讀區域視圖, 幀資訊)
+RegionFrame = Tuple[np.ndarray, FrameInfo]
+
+
+class FrameDispatcher:
+    """
+    幀分派器
+
+    取代每個分頁各自輪詢的擷取執行緒：捕捉引擎寫入新幀後喚醒分派執行緒，
+    從同一幀一次裁切所有啟用的區域，再發佈給訂閱的分頁並提供給OCR階段讀取。
+    """
+
+    def __init__(self, capture_engine: BaseCaptureEngine, wait_timeout: float = 0.5):
+        """
+        Args:
+            capture_engine: 共享的捕捉引擎
+            wait_timeout: 等待新幀的逾時（秒），用於定期檢查停止旗標
+        """
+        self.capture_engine = capture_engine
+        self.wait_timeout = wait_timeout
+        self.is_running = False
+        self.dispatch_thread = None
+        self._stop_event = threading.Event()
+        self._regions: Dict[str, Dict[str, int]] = {}
+        self._subscribers: Dict[str, Callable[[Optional[RegionFrame]], None]] = {}
+        self._listeners: List[Callable[[Dict[str, RegionFrame]], None]] = []
+        self._latest_frames: Dict[str, RegionFrame] = {}
+        self._last_frame_id = 0
+        self._condition = threading.Condition()
+        # 統計
+        self.frames_dispatched = 0
+        self.last_latency: Optional[float] = None  # 擷取到發佈的延遲（秒）
+
+    def set_regions(self, regions: Dict[str, Dict[str, int]]) -> None:
+        """
+        設定需要分派的區域
+
+        Args:
+            regions: {tab_name: {'x': int, 'y': int, 'w': int, 'h': int}}
+        """
+        self._regions = {name: dict(region) for name, region in regions.items() if region}
+        # 移除已不再分派的區域
+        latest = self._latest_frames
+        self._latest_frames = {name: frame for name, frame in latest.items() if name in self._regions}
+
+    def add_subscriber(self, name: str, callback: Callable[[Optional[RegionFrame]], None]) -> None:
+        """
+        訂閱指定區域的裁切結果
+
+        Args:
+            name: 區域名稱（分頁名稱）
+            callback: 於分派執行緒中呼叫，參數為 (區域視圖, 幀資訊)，區域超出幀範圍時為None
+        """
+        subscribers = dict(self._subscribers)
+        subscribers[name] = callback
+        self._subscribers = subscribers
+
+    def remove_subscriber(self, name: str) -> None:
+        """取消訂閱"""
+        subscribers = dict(self._subscribers)
+        subscribers.pop(name, None)
+        self._subscribers = subscribers
+
+    def add_listener(self, callback: Callable[[Dict[str, RegionFrame]], None]) -> None:
+        """
+        監聽每次分派的完整結果
+
+        Args:
+            callback: 於分派執行緒中呼叫，參數為 {name: (區域視圖, 幀資訊)}
+        """
+        self._listeners = self._listeners + [callback]
+
+    def get_latest_frames(self) -> Dict[str, RegionFrame]:
+        """獲取最新一次分派的所有區域 {name: (區域視圖, 幀資訊)}"""
+        return dict(self._latest_frames)
+
+    def wait_for_frames(self, last_frame_id: int = 0, timeout: Optional[float] = None) -> int:
+        """
+        等待比 last_frame_id 更新的分派結果
+
+        Returns:
+            int: 目前最新分派的幀序號（逾時時可能等於 last_frame_id）
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._last_frame_id > last_frame_id or self._stop_event.is_set(), timeout)
+            return self._last_frame_id
+
+    def start(self) -> None:
+        """啟動分派執行緒"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._stop_event.clear()
+        self.dispatch_thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self.dispatch_thread.start()
+
+    def stop(self) -> None:
+        """停止分派執行緒"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self.dispatch_thread and self.dispatch_thread.is_alive():
+            self.dispatch_thread.join(timeout=1.0)
+        self._latest_frames = {}
+
+    def _dispatch_loop(self) -> None:
+        """分派循環"""
+        logger.debug("開始幀分派循環")
+        last_frame_id = 0
+        while not self._stop_event.is_set():
+            try:
+                info = self.capture_engine.wait_for_frame(last_frame_id, self.wait_timeout)
+                if info is None:
+                    continue
+                self._dispatch(self._regions)
+                last_frame_id = max(last_frame_id, self._last_frame_id, info.frame_id)
+            except Exception as e:
+                logger.error(f"幀分派錯誤: {e}")
+                self._stop_event.wait(self.wait_timeout)
+        logger.debug("幀分派循環結束")
+
+    def _dispatch(self, regions: Dict[str, Dict[str, int]]) -> None:
+        """從同一幀裁切所有區域並發佈"""
+        views, info = self.capture_engine.get_region_frames(regions)
+        if info is None:
+            return
+        latest_frames = {name: (view, info) for name, view in views.items() if view is not None}
+        self._latest_frames = latest_frames
+        with self._condition:
+            self._last_frame_id = info.frame_id
+            self._condition.notify_all()
+
+        self.frames_dispatched += 1
+        self.last_latency = time.time() - info.timestamp
+
+        subscribers = self._subscribers
+        for name in regions:
+            callback = subscribers.get(name)
+            if callback is None:
+                continue
+            try:
+                callback(latest_frames.get(name))
+            except Exception as e:
+                logger.error(f"{name} 幀分派回調錯誤: {e}")
+
+        for listener in self._listeners:
+            try:
+                listener(latest_frames)
+            except Exception as e:
+                logger.error(f"幀分派監聽錯誤: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取分派統計"""
+        return {
+            'frames_dispatched': self.frames_dispatched,
+            'last_frame_id': self._last_frame_id,
+            'last_latency': self.last_latency,
+            'regions': len(self._regions)
+        }
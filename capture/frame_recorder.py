@@ -0,0 +1,333 @@
+"""
+Frame Recorder Module
+幀錄製模組：將捕捉到的幀寫入預先配置的記憶體映射環形檔案，並提供讀取介面
+"""
+
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+from typing import Optional, Dict, Tuple, List, NamedTuple, Iterator
+import numpy as np
+
+from utils.log import get_logger
+from .frame_buffer import FrameInfo
+from .pixel_format import PIXEL_FORMAT_RGB, to_rgb
+
+logger = get_logger(__name__)
+
+RECORDING_EXTENSION = '.gmrec'
+RECORDING_MAGIC = b'GMREC001'
+RECORDING_VERSION = 1
+
+# 錄製模式
+RECORD_FRAMES = 0   # 整張幀（區域聯集捕捉時為聯集矩形）
+RECORD_REGIONS = 1  # 僅監測區域
+
+# 檔頭: magic, version, mode, slot_count, slot_size, max_height, max_width,
+#       window_width, window_height, write_count
+HEADER_FORMAT = '<8sIIIIIIIIQ'
+HEADER_SIZE = 4096
+LAYOUT_OFFSET = 64  # 區域配置(JSON)的起始位置
+# 槽標頭: frame_id, timestamp, origin_x, origin_y, height, width
+SLOT_HEADER_FORMAT = '<QdiiII'
+SLOT_HEADER_SIZE = 64
+
+
+class RecordedFrame(NamedTuple):
+    """錄製檔中的一幀"""
+    frame_id: int
+    timestamp: float
+    origin: Tuple[int, int]
+    image: Optional[np.ndarray]       # 整張幀模式的圖像，區域模式為None
+    regions: Dict[str, np.ndarray]    # 區域模式的各區域圖像，整張幀模式為空
+
+
+class FrameRecorder:
+    """
+    幀錄製器
+
+    檔案在開啟時依槽數與最大幀尺寸一次配置完成，之後以環形方式覆寫最舊的槽。
+    submit 將幀（區域模式只取各區域）複製到錄製器自己的暫存緩衝區後放入容量為1的佇列，
+    由背景執行緒轉換格式並寫入映射檔；寫入跟不上時丟棄新幀，不會阻塞捕捉循環。
+    不直接排入 FrameBuffer 的視圖：磁碟較慢時緩衝槽可能在寫入前就被覆寫。
+    整張幀模式輪流使用兩個暫存緩衝區：佇列容量為1，新幀被接受時寫入端最多仍在處理上一幀。
+    """
+
+    def __init__(self, path: str, slot_count: int = 300,
+                 max_size: Optional[Tuple[int, int]] = None,
+                 regions: Optional[Dict[str, Dict[str, int]]] = None,
+                 window_size: Optional[Tuple[int, int]] = None):
+        """
+        Args:
+            path: 錄製檔路徑
+            slot_count: 環形槽數量（最多保留的幀數）
+            max_size: 整張幀模式下的最大幀尺寸 (width, height)
+            regions: 指定時只錄製這些區域 {name: {'x', 'y', 'w', 'h'}}
+            window_size: 視窗尺寸 (width, height)，回放時用於還原畫面
+        """
+        if regions:
+            self.mode = RECORD_REGIONS
+            self.layout = {name: [int(r['x']), int(r['y']), int(r['w']), int(r['h'])]
+                           for name, r in regions.items()}
+            payload_size = sum(w * h * 3 for _, _, w, h in self.layout.values())
+            max_w, max_h = 0, 0
+        elif max_size:
+            self.mode = RECORD_FRAMES
+            self.layout = {}
+            max_w, max_h = max_size
+            payload_size = max_w * max_h * 3
+        else:
+            raise ValueError("必須指定錄製區域或最大幀尺寸")
+
+        self.path = path
+        self.slot_count = max(1, slot_count)
+        self.slot_size = SLOT_HEADER_SIZE + payload_size
+        self.max_size = (max_w, max_h)
+        self.window_size = window_size or self.max_size
+        self.write_count = 0
+        self.dropped_count = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=1)
+        # 整張幀模式的暫存緩衝區（輪流使用）
+        self._staging: List[Optional[np.ndarray]] = [None, None]
+        self._staging_index = 0
+        self._stop_event = threading.Event()
+        self._file = None
+        self._mmap = None
+        self._writer_thread = None
+
+    def open(self) -> None:
+        """建立並映射錄製檔，啟動背景寫入執行緒"""
+        layout_bytes = json.dumps(self.layout, ensure_ascii=False).encode('utf-8') + b'\0'
+        if LAYOUT_OFFSET + len(layout_bytes) > HEADER_SIZE:
+            raise ValueError("錄製區域過多，超出檔頭容量")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        total_size = HEADER_SIZE + self.slot_count * self.slot_size
+        self._file = open(self.path, 'w+b')
+        self._file.truncate(total_size)
+        self._mmap = mmap.mmap(self._file.fileno(), total_size)
+        self._mmap[LAYOUT_OFFSET:LAYOUT_OFFSET + len(layout_bytes)] = layout_bytes
+        self._write_header()
+
+        self._stop_event.clear()
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+        logger.info(f"開始錄製: {self.path} ({self.slot_count} 槽, {total_size / 1024 / 1024:.1f} MB)")
+
+    def submit(self, frame: np.ndarray, origin: Tuple[int, int], info: FrameInfo,
+               pixel_format: str = PIXEL_FORMAT_RGB) -> bool:
+        """
+        提交一幀（不阻塞，只複製像素，格式轉換在寫入執行緒進行；僅可由捕捉執行緒呼叫）
+
+        Returns:
+            bool: 是否已排入寫入佇列，寫入端忙碌時返回False並丟棄此幀
+        """
+        if self._mmap is None:
+            return False
+        if self._queue.full():
+            self.dropped_count += 1
+            return False
+
+        if self.mode == RECORD_REGIONS:
+            frame_h, frame_w = frame.shape[:2]
+            payload = []
+            for x, y, w, h in self.layout.values():
+                x -= origin[0]
+                y -= origin[1]
+                if 0 <= x and 0 <= y and x + w <= frame_w and y + h <= frame_h:
+                    payload.append(np.array(frame[y:y + h, x:x + w]))
+                else:
+                    payload.append(None)
+        else:
+            staging = self._staging[self._staging_index]
+            if staging is None or staging.shape != frame.shape or staging.dtype != frame.dtype:
+                staging = self._staging[self._staging_index] = np.empty(frame.shape, dtype=frame.dtype)
+            np.copyto(staging, frame)
+            self._staging_index ^= 1
+            payload = staging
+
+        # 只有捕捉執行緒放入佇列，檢查後佇列不會變滿
+        self._queue.put_nowait((payload, origin, info, pixel_format))
+        return True
+
+    def close(self) -> None:
+        """停止寫入並關閉錄製檔（佇列中尚未寫入的幀會先寫完）"""
+        if self._mmap is None:
+            return
+        self._stop_event.set()
+        if self._writer_thread and self._writer_thread.is_alive():
+            self._writer_thread.join(timeout=2.0)
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+        self._mmap = None
+        self._file = None
+        logger.info(f"錄製結束: {self.path} (寫入 {self.write_count} 幀, 丟棄 {self.dropped_count} 幀)")
+
+    def _writer_loop(self) -> None:
+        while True:
+            try:
+                payload, origin, info, pixel_format = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                if self._stop_event.is_set():
+                    break
+                continue
+            try:
+                self._write_slot(payload, origin, info, pixel_format)
+            except Exception as e:
+                logger.error(f"寫入錄製檔錯誤: {e}")
+
+    def _write_slot(self, payload, origin: Tuple[int, int], info: FrameInfo,
+                    pixel_format: str) -> None:
+        """寫入一個槽（payload 為整張幀，或區域模式下依配置順序的區域列表）"""
+        slot_offset = HEADER_SIZE + (self.write_count % self.slot_count) * self.slot_size
+        payload_offset = slot_offset + SLOT_HEADER_SIZE
+        # 先清除幀序號，寫入中的槽不會被讀取端視為有效
+        struct.pack_into(SLOT_HEADER_FORMAT, self._mmap, slot_offset, 0, 0.0, 0, 0, 0, 0)
+
+        if self.mode == RECORD_REGIONS:
+            offset = payload_offset
+            for (_, _, w, h), crop in zip(self.layout.values(), payload):
+                target = np.ndarray((h, w, 3), dtype=np.uint8, buffer=self._mmap, offset=offset)
+                if crop is not None:
+                    to_rgb(crop, pixel_format, out=target)
+                else:
+                    target.fill(0)
+                offset += w * h * 3
+            height, width = 0, 0
+        else:
+            frame = payload
+            height, width = frame.shape[:2]
+            max_w, max_h = self.max_size
+            if width > max_w or height > max_h:
+                self.dropped_count += 1
+                return
+            target = np.ndarray((height, width, 3), dtype=np.uint8, buffer=self._mmap, offset=payload_offset)
+            to_rgb(frame, pixel_format, out=target)
+
+        struct.pack_into(SLOT_HEADER_FORMAT, self._mmap, slot_offset, info.frame_id, info.timestamp,
+                         int(origin[0]), int(origin[1]), height, width)
+        self.write_count += 1
+        self._write_header()
+
+    def _write_header(self) -> None:
+        struct.pack_into(HEADER_FORMAT, self._mmap, 0, RECORDING_MAGIC, RECORDING_VERSION, self.mode,
+                         self.slot_count, self.slot_size, self.max_size[1], self.max_size[0],
+                         self.window_size[0], self.window_size[1], self.write_count)
+
+    def get_stats(self) -> Dict[str, int]:
+        """獲取錄製統計"""
+        return {'written': self.write_count, 'dropped': self.dropped_count, 'slots': self.slot_count}
+
+
+class FrameRecording:
+    """
+    錄製檔讀取器
+
+    以唯讀方式映射錄製檔，依幀序號由舊到新存取已寫入的幀；
+    返回的圖像為映射檔的唯讀視圖，關閉後不可再使用。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.mode, self.slot_count, self.slot_size, max_h, max_w,
+         window_w, window_h, self.write_count) = struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            self.close()
+            raise ValueError(f"不是有效的錄製檔: {path}")
+        self.max_size = (max_w, max_h)
+        self.window_size = (window_w, window_h)
+        layout_end = self._mmap.find(b'\0', LAYOUT_OFFSET, HEADER_SIZE)
+        self.layout: Dict[str, List[int]] = json.loads(self._mmap[LAYOUT_OFFSET:layout_end].decode('utf-8'))
+        self._slots = self._scan_slots()
+
+    def _scan_slots(self) -> List[int]:
+        """依幀序號排序的有效槽索引"""
+        slots = []
+        for index in range(self.slot_count):
+            frame_id = struct.unpack_from('<Q', self._mmap, HEADER_SIZE + index * self.slot_size)[0]
+            if frame_id:
+                slots.append((frame_id, index))
+        return [index for _, index in sorted(slots)]
+
+    def refresh(self) -> None:
+        """重新掃描（讀取仍在錄製中的檔案時使用）"""
+        self.write_count = struct.unpack_from(HEADER_FORMAT, self._mmap, 0)[-1]
+        self._slots = self._scan_slots()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __getitem__(self, index: int) -> RecordedFrame:
+        slot_offset = HEADER_SIZE + self._slots[index] * self.slot_size
+        frame_id, timestamp, origin_x, origin_y, height, width = struct.unpack_from(
+            SLOT_HEADER_FORMAT, self._mmap, slot_offset)
+        payload_offset = slot_offset + SLOT_HEADER_SIZE
+
+        if self.mode == RECORD_REGIONS:
+            regions = {}
+            offset = payload_offset
+            for name, (_, _, w, h) in self.layout.items():
+                regions[name] = np.ndarray((h, w, 3), dtype=np.uint8, buffer=self._mmap, offset=offset)
+                offset += w * h * 3
+            return RecordedFrame(frame_id, timestamp, (origin_x, origin_y), None, regions)
+
+        image = np.ndarray((height, width, 3), dtype=np.uint8, buffer=self._mmap, offset=payload_offset)
+        return RecordedFrame(frame_id, timestamp, (origin_x, origin_y), image, {})
+
+    def get_timestamp(self, index: int) -> float:
+        """指定幀的擷取時間（只讀取槽標頭）"""
+        slot_offset = HEADER_SIZE + self._slots[index] * self.slot_size
+        return struct.unpack_from('<d', self._mmap, slot_offset + 8)[0]
+
+    def frames(self) -> Iterator[RecordedFrame]:
+        """由舊到新逐幀讀取"""
+        for index in range(len(self)):
+            yield self[index]
+
+    def render(self, index: int) -> np.ndarray:
+        """
+        將指定幀還原為視窗尺寸的畫面（未錄製的部分為黑色），供回放使用
+
+        Returns:
+            np.ndarray: (window_height, window_width, 3) RGB圖像
+        """
+        recorded = self[index]
+        window_w, window_h = self.window_size
+        canvas = np.zeros((window_h, window_w, 3), dtype=np.uint8)
+        if recorded.image is not None:
+            patches = [(recorded.origin[0], recorded.origin[1], recorded.image)]
+        else:
+            patches = [(self.layout[name][0], self.layout[name][1], image)
+                       for name, image in recorded.regions.items()]
+        for x, y, image in patches:
+            h = min(image.shape[0], window_h - y)
+            w = min(image.shape[1], window_w - x)
+            if h > 0 and w > 0:
+                canvas[y:y + h, x:x + w] = image[:h, :w]
+        return canvas
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # 仍有使用中的幀視圖，交由垃圾回收釋放映射
+                logger.debug("錄製檔仍有使用中的視圖，延後釋放")
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,484 @@
+"""
+Linux Capture Module
+Linux平台(X11)捕捉實現，支援MIT-SHM共享記憶體快速路徑
+"""
+
+import sys
+import ctypes
+import ctypes.util
+import threading
+from typing import Optional, Dict, Any, Tuple, List
+
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# X11 常數
+ZPIXMAP = 2
+ALL_PLANES = 0xFFFFFFFF
+IS_VIEWABLE = 2
+XA_WINDOW = 33
+ANY_PROPERTY_TYPE = 0
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+LSB_FIRST = 0
+
+Window = ctypes.c_ulong
+Atom = ctypes.c_ulong
+
+
+class XWindowAttributes(ctypes.Structure):
+    _fields_ = [
+        ('x', ctypes.c_int), ('y', ctypes.c_int),
+        ('width', ctypes.c_int), ('height', ctypes.c_int),
+        ('border_width', ctypes.c_int), ('depth', ctypes.c_int),
+        ('visual', ctypes.c_void_p), ('root', Window),
+        ('class_', ctypes.c_int), ('bit_gravity', ctypes.c_int),
+        ('win_gravity', ctypes.c_int), ('backing_store', ctypes.c_int),
+        ('backing_planes', ctypes.c_ulong), ('backing_pixel', ctypes.c_ulong),
+        ('save_under', ctypes.c_int), ('colormap', ctypes.c_ulong),
+        ('map_installed', ctypes.c_int), ('map_state', ctypes.c_int),
+        ('all_event_masks', ctypes.c_long), ('your_event_mask', ctypes.c_long),
+        ('do_not_propagate_mask', ctypes.c_long), ('override_redirect', ctypes.c_int),
+        ('screen', ctypes.c_void_p),
+    ]
+
+
+class XImage(ctypes.Structure):
+    # 只宣告讀取所需的前段欄位（結構由Xlib配置，不在Python端建立）
+    _fields_ = [
+        ('width', ctypes.c_int), ('height', ctypes.c_int),
+        ('xoffset', ctypes.c_int), ('format', ctypes.c_int),
+        ('data', ctypes.c_void_p),
+        ('byte_order', ctypes.c_int), ('bitmap_unit', ctypes.c_int),
+        ('bitmap_bit_order', ctypes.c_int), ('bitmap_pad', ctypes.c_int),
+        ('depth', ctypes.c_int), ('bytes_per_line', ctypes.c_int),
+        ('bits_per_pixel', ctypes.c_int),
+        ('red_mask', ctypes.c_ulong), ('green_mask', ctypes.c_ulong),
+        ('blue_mask', ctypes.c_ulong),
+    ]
+
+
+class XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ('shmseg', ctypes.c_ulong), ('shmid', ctypes.c_int),
+        ('shmaddr', ctypes.c_void_p), ('readOnly', ctypes.c_int),
+    ]
+
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ('type', ctypes.c_int), ('display', ctypes.c_void_p),
+        ('resourceid', ctypes.c_ulong), ('serial', ctypes.c_ulong),
+        ('error_code', ctypes.c_ubyte), ('request_code', ctypes.c_ubyte),
+        ('minor_code', ctypes.c_ubyte),
+    ]
+
+
+XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(XErrorEvent))
+
+# 根據平台條件載入 libX11 / libXext
+XLIB_AVAILABLE = False
+XSHM_AVAILABLE = False
+xlib = xext = libc = None
+if sys.platform.startswith("linux"):
+    try:
+        xlib = ctypes.CDLL(ctypes.util.find_library('X11') or 'libX11.so.6')
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+
+        xlib.XOpenDisplay.restype = ctypes.c_void_p
+        xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        xlib.XDefaultRootWindow.restype = Window
+        xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        xlib.XInternAtom.restype = Atom
+        xlib.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+        xlib.XGetWindowProperty.argtypes = [
+            ctypes.c_void_p, Window, Atom, ctypes.c_long, ctypes.c_long, ctypes.c_int, Atom,
+            ctypes.POINTER(Atom), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_ulong),
+            ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_void_p)
+        ]
+        xlib.XFree.argtypes = [ctypes.c_void_p]
+        xlib.XGetWindowAttributes.argtypes = [ctypes.c_void_p, Window, ctypes.POINTER(XWindowAttributes)]
+        xlib.XTranslateCoordinates.argtypes = [
+            ctypes.c_void_p, Window, Window, ctypes.c_int, ctypes.c_int,
+            ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(Window)
+        ]
+        xlib.XQueryTree.argtypes = [
+            ctypes.c_void_p, Window, ctypes.POINTER(Window), ctypes.POINTER(Window),
+            ctypes.POINTER(ctypes.POINTER(Window)), ctypes.POINTER(ctypes.c_uint)
+        ]
+        xlib.XGetImage.restype = ctypes.POINTER(XImage)
+        xlib.XGetImage.argtypes = [
+            ctypes.c_void_p, Window, ctypes.c_int, ctypes.c_int, ctypes.c_uint, ctypes.c_uint,
+            ctypes.c_ulong, ctypes.c_int
+        ]
+        xlib.XDestroyImage.argtypes = [ctypes.POINTER(XImage)]
+        xlib.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        xlib.XSetErrorHandler.restype = ctypes.c_void_p
+        xlib.XSetErrorHandler.argtypes = [XErrorHandler]
+        XLIB_AVAILABLE = True
+
+        try:
+            xext = ctypes.CDLL(ctypes.util.find_library('Xext') or 'libXext.so.6')
+            xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+            xext.XShmCreateImage.restype = ctypes.POINTER(XImage)
+            xext.XShmCreateImage.argtypes = [
+                ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_char_p,
+                ctypes.POINTER(XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint
+            ]
+            xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo)]
+            xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo)]
+            xext.XShmGetImage.argtypes = [
+                ctypes.c_void_p, Window, ctypes.POINTER(XImage), ctypes.c_int, ctypes.c_int, ctypes.c_ulong
+            ]
+            libc.shmget.restype = ctypes.c_int
+            libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+            libc.shmat.restype = ctypes.c_void_p
+            libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+            libc.shmdt.argtypes = [ctypes.c_void_p]
+            libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+            XSHM_AVAILABLE = True
+        except (OSError, AttributeError) as e:
+            logger.warning(f"警告: libXext載入失敗，將不使用MIT-SHM: {e}")
+    except (OSError, AttributeError) as e:
+        logger.warning(f"警告: Linux捕捉引擎需要libX11: {e}")
+
+from .base_capture import BaseCaptureEngine
+from .pixel_format import (
+    NativeFrame, PIXEL_FORMAT_BGRX, PIXEL_FORMAT_RGBX, PIXEL_FORMAT_XRGB, from_buffer
+)
+
+# X錯誤處理：記錄本引擎連線的最後一次錯誤而非讓Xlib結束程式，
+# 其他連線（例如Tk）的錯誤交回原本的處理函數
+_last_x_error = {'code': 0}
+_engine_displays = set()
+_previous_x_error_handler = None
+
+
+def _handle_x_error(display, event):
+    if display in _engine_displays or _previous_x_error_handler is None:
+        _last_x_error['code'] = event.contents.error_code
+        return 0
+    return _previous_x_error_handler(display, event)
+
+
+_x_error_handler = XErrorHandler(_handle_x_error)
+
+
+def _install_error_handler(display) -> None:
+    """註冊引擎的X連線並安裝錯誤處理函數（僅安裝一次）"""
+    global _previous_x_error_handler
+    if not _engine_displays:
+        previous = xlib.XSetErrorHandler(_x_error_handler)
+        if previous:
+            _previous_x_error_handler = XErrorHandler(previous)
+    _engine_displays.add(display)
+
+
+class _ShmImage:
+    """綁定於共享記憶體區段的XImage（X伺服器直接寫入，不經過socket傳輸像素）"""
+
+    def __init__(self, display, visual, depth: int, width: int, height: int):
+        self.display = display
+        self.width = width
+        self.height = height
+        self.info = XShmSegmentInfo()
+        self.image = xext.XShmCreateImage(display, visual, depth, ZPIXMAP, None,
+                                          ctypes.byref(self.info), width, height)
+        if not self.image:
+            raise RuntimeError("XShmCreateImage 失敗")
+        image = self.image.contents
+        size = image.bytes_per_line * image.height
+        self.info.shmid = libc.shmget(IPC_PRIVATE, size, IPC_CREAT | 0o600)
+        if self.info.shmid < 0:
+            xlib.XDestroyImage(self.image)
+            raise RuntimeError(f"shmget 失敗: errno {ctypes.get_errno()}")
+        address = libc.shmat(self.info.shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            libc.shmctl(self.info.shmid, IPC_RMID, None)
+            xlib.XDestroyImage(self.image)
+            raise RuntimeError(f"shmat 失敗: errno {ctypes.get_errno()}")
+        self.info.shmaddr = address
+        self.info.readOnly = 0
+        image.data = address
+
+        _last_x_error['code'] = 0
+        xext.XShmAttach(display, ctypes.byref(self.info))
+        xlib.XSync(display, 0)
+        # 標記刪除，最後一個行程脫離後由系統回收
+        libc.shmctl(self.info.shmid, IPC_RMID, None)
+        if _last_x_error['code']:
+            # 遠端X伺服器等無法存取共享記憶體的情況
+            self._release(attached=False)
+            raise RuntimeError(f"XShmAttach 失敗 (X錯誤 {_last_x_error['code']})")
+        self.buffer = (ctypes.c_ubyte * size).from_address(address)
+
+    def get(self, window: int, x: int, y: int) -> bool:
+        """擷取 window 中以 (x, y) 為左上角、本影像尺寸的內容"""
+        _last_x_error['code'] = 0
+        ok = xext.XShmGetImage(self.display, window, self.image, x, y, ALL_PLANES)
+        xlib.XSync(self.display, 0)
+        return bool(ok) and not _last_x_error['code']
+
+    def _release(self, attached: bool) -> None:
+        if attached:
+            xext.XShmDetach(self.display, ctypes.byref(self.info))
+            xlib.XSync(self.display, 0)
+        # XShmCreateImage 建立的影像銷毀時不會釋放共享記憶體
+        xlib.XDestroyImage(self.image)
+        libc.shmdt(self.info.shmaddr)
+        self.image = None
+        self.buffer = None
+
+    def destroy(self) -> None:
+        if self.image:
+            self._release(attached=True)
+
+
+class LinuxCaptureEngine(BaseCaptureEngine):
+    """Linux平台(X11)捕捉引擎"""
+
+    def __init__(self, display_name: Optional[str] = None, use_shm: bool = True):
+        super().__init__()
+        self.display = None
+        self.root = None
+        self.use_shm = False
+        self._x_lock = threading.RLock()  # Xlib連線不可跨執行緒同時使用
+        self._shm_images: Dict[str, _ShmImage] = {}
+        if not XLIB_AVAILABLE:
+            logger.warning("警告: Linux捕捉引擎僅在具有X11的Linux平台可用")
+            return
+        self.display = xlib.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self.display:
+            logger.warning("警告: 無法連線到X伺服器，請確認DISPLAY環境變數")
+            return
+        _install_error_handler(self.display)
+        self.root = xlib.XDefaultRootWindow(self.display)
+        self.use_shm = use_shm and XSHM_AVAILABLE and bool(xext.XShmQueryExtension(self.display))
+        self._atoms = {
+            name: xlib.XInternAtom(self.display, name.encode(), 0)
+            for name in ('_NET_CLIENT_LIST', '_NET_WM_NAME', 'UTF8_STRING', 'WM_NAME')
+        }
+        logger.info(f"X11捕捉引擎已啟用 (MIT-SHM: {'是' if self.use_shm else '否'})")
+
+    def initialize_resources(self, window_handle: int, region: Dict[str, int]) -> bool:
+        """初始化X11捕捉資源"""
+        if not self.display:
+            return False
+        with self._x_lock:
+            attributes = self._get_attributes(window_handle)
+            if attributes is None or attributes.map_state != IS_VIEWABLE:
+                return False
+            self._release_shm_images()
+            self.current_resources = {
+                'window': window_handle,
+                'visual': attributes.visual,
+                'depth': attributes.depth,
+                'region': region
+            }
+            self.is_initialized = True
+            logger.debug(f"X11捕捉資源初始化成功: {attributes.width}x{attributes.height}")
+            return True
+
+    def capture_window(self) -> Optional[NativeFrame]:
+        """捕捉整個視窗"""
+        if not self.is_initialized or not self.current_resources:
+            return None
+        with self._x_lock:
+            attributes = self._get_attributes(self.current_resources['window'])
+            if attributes is None or attributes.map_state != IS_VIEWABLE:
+                return None
+            return self._grab('window', 0, 0, attributes.width, attributes.height)
+
+    def capture_rect(self, x: int, y: int, w: int, h: int) -> Optional[NativeFrame]:
+        """只捕捉視窗中的指定矩形"""
+        if not self.is_initialized or not self.current_resources:
+            return None
+        with self._x_lock:
+            return self._grab('rect', x, y, w, h)
+
+    def _grab(self, slot: str, x: int, y: int, w: int, h: int) -> Optional[NativeFrame]:
+        """
+        擷取視窗中的矩形，優先使用共享記憶體
+
+        共享記憶體路徑返回的原生幀直接指向共享區段，在下一次同一 slot 擷取前有效
+        （捕捉循環會立即複製到幀緩衝區）
+        """
+        window = self.current_resources['window']
+        if self.use_shm:
+            shm_image = self._get_shm_image(slot, w, h)
+            if shm_image is not None:
+                if shm_image.get(window, x, y):
+                    return self._to_native(shm_image.image.contents, shm_image.buffer, w, h)
+                logger.debug(f"XShmGetImage 失敗 (X錯誤 {_last_x_error['code']})，改用XGetImage")
+
+        _last_x_error['code'] = 0
+        image_ptr = xlib.XGetImage(self.display, window, x, y, w, h, ALL_PLANES, ZPIXMAP)
+        xlib.XSync(self.display, 0)
+        if not image_ptr:
+            logger.debug(f"XGetImage 失敗 (X錯誤 {_last_x_error['code']})")
+            return None
+        try:
+            image = image_ptr.contents
+            size = image.bytes_per_line * image.height
+            buffer = (ctypes.c_ubyte * size).from_address(image.data)
+            frame = self._to_native(image, buffer, w, h)
+            return None if frame is None else NativeFrame(frame.pixels.copy(), frame.pixel_format)
+        finally:
+            xlib.XDestroyImage(image_ptr)
+
+    def _get_shm_image(self, slot: str, w: int, h: int) -> Optional[_ShmImage]:
+        """取得指定尺寸的共享記憶體影像（尺寸改變時重建）"""
+        shm_image = self._shm_images.get(slot)
+        if shm_image is not None and (shm_image.width, shm_image.height) == (w, h):
+            return shm_image
+        if shm_image is not None:
+            shm_image.destroy()
+            del self._shm_images[slot]
+        try:
+            shm_image = _ShmImage(self.display, self.current_resources['visual'],
+                                  self.current_resources['depth'], w, h)
+        except RuntimeError as e:
+            logger.warning(f"MIT-SHM不可用，改用XGetImage: {e}")
+            self.use_shm = False
+            return None
+        self._shm_images[slot] = shm_image
+        return shm_image
+
+    @staticmethod
+    def _to_native(image: XImage, buffer, w: int, h: int) -> Optional[NativeFrame]:
+        """將32位元ZPixmap影像包裝為原生幀（不複製像素）"""
+        if image.bits_per_pixel != 32:
+            logger.warning(f"不支援的像素格式: {image.bits_per_pixel} bpp")
+            return None
+        if image.byte_order == LSB_FIRST and image.red_mask == 0xFF0000:
+            pixel_format = PIXEL_FORMAT_BGRX
+        elif image.byte_order == LSB_FIRST and image.red_mask == 0xFF:
+            pixel_format = PIXEL_FORMAT_RGBX
+        else:
+            pixel_format = PIXEL_FORMAT_XRGB  # 大端序
+        frame = from_buffer(buffer, image.width, image.height, image.bytes_per_line, pixel_format)
+        return NativeFrame(frame.pixels[:h, :w], pixel_format)
+
+    def _release_shm_images(self) -> None:
+        for shm_image in self._shm_images.values():
+            try:
+                shm_image.destroy()
+            except Exception as e:
+                logger.error(f"釋放共享記憶體影像錯誤: {e}")
+        self._shm_images = {}
+
+    def cleanup_resources(self) -> None:
+        """清理X11捕捉資源"""
+        with self._x_lock:
+            if self.display:
+                self._release_shm_images()
+            self.current_resources = None
+            self.is_initialized = False
+
+    def _get_attributes(self, window_handle: Any) -> Optional[XWindowAttributes]:
+        if not self.display or not window_handle:
+            return None
+        attributes = XWindowAttributes()
+        _last_x_error['code'] = 0
+        status = xlib.XGetWindowAttributes(self.display, window_handle, ctypes.byref(attributes))
+        if not status or _last_x_error['code']:
+            return None
+        return attributes
+
+    def _get_property(self, window: int, atom_name: str, req_type: int) -> Tuple[Optional[bytes], int, int]:
+        """
+        讀取視窗屬性
+
+        Returns:
+            tuple: (原始資料, 格式(8/16/32), 項目數)
+        """
+        actual_type = Atom()
+        actual_format = ctypes.c_int()
+        nitems = ctypes.c_ulong()
+        bytes_after = ctypes.c_ulong()
+        prop = ctypes.c_void_p()
+        _last_x_error['code'] = 0
+        status = xlib.XGetWindowProperty(
+            self.display, window, self._atoms[atom_name], 0, 1 << 20, 0, req_type,
+            ctypes.byref(actual_type), ctypes.byref(actual_format), ctypes.byref(nitems),
+            ctypes.byref(bytes_after), ctypes.byref(prop)
+        )
+        if status != 0 or _last_x_error['code'] or not prop.value:
+            return None, 0, 0
+        try:
+            # 格式32的項目在客戶端以 long 儲存
+            item_size = {8: 1, 16: ctypes.sizeof(ctypes.c_short), 32: ctypes.sizeof(ctypes.c_long)}.get(actual_format.value, 0)
+            return ctypes.string_at(prop.value, nitems.value * item_size), actual_format.value, nitems.value
+        finally:
+            xlib.XFree(prop)
+
+    def _get_window_title(self, window: int) -> str:
+        data, _, _ = self._get_property(window, '_NET_WM_NAME', self._atoms['UTF8_STRING'])
+        if not data:
+            data, _, _ = self._get_property(window, 'WM_NAME', ANY_PROPERTY_TYPE)
+        if not data:
+            return ""
+        return data.decode('utf-8', errors='replace').strip('\x00').strip()
+
+    def _get_client_windows(self) -> List[int]:
+        """列出頂層視窗（優先使用視窗管理員提供的 _NET_CLIENT_LIST）"""
+        data, fmt, count = self._get_property(self.root, '_NET_CLIENT_LIST', XA_WINDOW)
+        if data and fmt == 32:
+            return list((Window * count).from_buffer_copy(data))
+
+        # 沒有視窗管理員（例如Xvfb）時列出根視窗的子視窗
+        root_return, parent_return = Window(), Window()
+        children = ctypes.POINTER(Window)()
+        count = ctypes.c_uint()
+        if not xlib.XQueryTree(self.display, self.root, ctypes.byref(root_return),
+                               ctypes.byref(parent_return), ctypes.byref(children), ctypes.byref(count)):
+            return []
+        try:
+            return [children[i] for i in range(count.value)]
+        finally:
+            if children:
+                xlib.XFree(children)
+
+    def is_window_valid(self, window_handle: Any) -> bool:
+        if not self.display:
+            return False
+        with self._x_lock:
+            attributes = self._get_attributes(window_handle)
+            return attributes is not None and attributes.map_state == IS_VIEWABLE
+
+    def get_window_list(self) -> List[Tuple[Any, str]]:
+        if not self.display:
+            return []
+        try:
+            with self._x_lock:
+                windows = []
+                for window in self._get_client_windows():
+                    attributes = self._get_attributes(window)
+                    if attributes is None or attributes.map_state != IS_VIEWABLE:
+                        continue
+                    title = self._get_window_title(window)
+                    if title:
+                        windows.append((int(window), title))
+                return windows
+        except Exception as e:
+            logger.error(f"獲取視窗列表錯誤: {e}")
+            return []
+
+    def get_window_rect(self, window_handle: Any) -> Optional[Tuple[int, int, int, int]]:
+        if not self.display:
+            return None
+        try:
+            with self._x_lock:
+                attributes = self._get_attributes(window_handle)
+                if attributes is None:
+                    return None
+                x, y, child = ctypes.c_int(), ctypes.c_int(), Window()
+                xlib.XTranslateCoordinates(self.display, window_handle, self.root, 0, 0,
+                                           ctypes.byref(x), ctypes.byref(y), ctypes.byref(child))
+                return (x.value, y.value, x.value + attributes.width, y.value + attributes.height)
+        except Exception as e:
+            logger.error(f"獲取視窗矩形錯誤: {e}")
+            return None
@@ -1,6 +1,5 @@
 import sys
 from typing import Optional, Dict, Any, Tuple, List
-from PIL import Image
 
 from utils.log import get_logger
 logger = get_logger(__name__)
@@ -24,6 +23,7 @@ if sys.platform == "darwin":
         logger.error(f"錯誤: {e}")
 
 from .base_capture import BaseCaptureEngine
+from .pixel_format import NativeFrame, PIXEL_FORMAT_BGRA, from_buffer
 
 class MacCaptureEngine(BaseCaptureEngine):
     def __init__(self):
@@ -84,7 +84,7 @@ class MacCaptureEngine(BaseCaptureEngine):
                 old_region.get('w') == new_region.get('w') and
                 old_region.get('h') == new_region.get('h'))
 
-    def capture_window(self) -> Optional[Image.Image]:
+    def capture_window(self) -> Optional[NativeFrame]:
         if not PYOBJC_AVAILABLE or not self.is_initialized:
             return None
         try:
@@ -113,11 +113,11 @@ class MacCaptureEngine(BaseCaptureEngine):
                 if not image_ref:
                     logger.warning("CGWindowListCreateImage 回傳 None")
                     return None
-                pil_img = self._cgimage_to_pil(image_ref)
-                if pil_img is None:
-                    logger.warning("CGImage 轉 PIL 失敗")
+                frame = self._cgimage_to_native(image_ref)
+                if frame is None:
+                    logger.warning("CGImage 轉換失敗")
                     return None
-                return pil_img
+                return frame
             # else:
                 # # ...原本的螢幕區域擷取...
                 # print("沒有指定視窗ID，使用螢幕區域擷取")
@@ -129,13 +129,55 @@ class MacCaptureEngine(BaseCaptureEngine):
                 # )
                 # if not image_ref:
                 #     return None
-                # return self._cgimage_to_pil(image_ref)
+                # return self._cgimage_to_native(image_ref)
         except Exception as e:
             logger.error(f"Mac區域捕捉錯誤: {e}")
             import traceback
             traceback.print_exc()
             return None
 
+    def capture_rect(self, x: int, y: int, w: int, h: int) -> Optional[NativeFrame]:
+        """只捕捉視窗中的指定矩形（座標為實際像素，轉換為邏輯座標後擷取）"""
+        if not PYOBJC_AVAILABLE or not self.is_initialized or not self.window_id:
+            return None
+        try:
+            window_info = self._get_window_info(self.window_id)
+            if not window_info:
+                return None
+            bounds = window_info.get('kCGWindowBounds')
+            if not bounds:
+                return None
+            scale_factor = self._get_cached_scale_factor()
+            image_ref = CGWindowListCreateImage(
+                CGRectMake(
+                    bounds['X'] + x / scale_factor,
+                    bounds['Y'] + y / scale_factor,
+                    w / scale_factor,
+                    h / scale_factor
+                ),
+                kCGWindowListOptionIncludingWindow,
+                self.window_id,
+                kCGWindowImageBoundsIgnoreFraming
+            )
+            if not image_ref:
+                return None
+            frame = self._cgimage_to_native(image_ref)
+            if frame is None or frame.pixels.shape[1] < w or frame.pixels.shape[0] < h:
+                return None
+            if frame.pixels.shape[:2] != (h, w):
+                # 邏輯座標取整造成的多餘像素
+                frame = NativeFrame(frame.pixels[:h, :w], frame.pixel_format)
+            return frame
+        except Exception as e:
+            logger.error(f"Mac區域捕捉錯誤: {e}")
+            return None
+
+    def _get_cached_scale_factor(self) -> float:
+        """獲取快取的顯示縮放因子"""
+        if getattr(self, '_scale_factor', None) is None:
+            self._scale_factor = self.get_display_scale_factor()
+        return self._scale_factor
+
     def _get_window_info(self, window_id: Any) -> Optional[Dict]:
         try:
             window_list = CGWindowListCopyWindowInfo(
@@ -150,7 +192,8 @@ class MacCaptureEngine(BaseCaptureEngine):
             logger.error(f"獲取視窗資訊錯誤: {e}")
             return None
 
-    def _cgimage_to_pil(self, cgimage_ref) -> Optional[Image.Image]:
+    def _cgimage_to_native(self, cgimage_ref) -> Optional[NativeFrame]:
+        """將CGImage包裝為原生BGRA幀（不做整張畫面的格式轉換與alpha合成）"""
         try:
             width = CGImageGetWidth(cgimage_ref)
             height = CGImageGetHeight(cgimage_ref)
@@ -166,23 +209,10 @@ class MacCaptureEngine(BaseCaptureEngine):
 
             image_data = bytes(data)
             expected_length = height * bytes_per_row
-            if len(image_data) < expected_length:
+            if len(image_data) < expected_length or bytes_per_row < width * 4:
                 return None
 
-            try:
-                image = Image.frombytes('RGBA', (width, height), image_data, 'raw', 'BGRA', bytes_per_row, 1)
-            except:
-                try:
-                    image = Image.frombytes('RGB', (width, height), image_data, 'raw', 'BGR', bytes_per_row, 1)
-                except:
-                    return None
-
-            if image.mode == 'RGBA':
-                rgb_image = Image.new('RGB', image.size, (255, 255, 255))
-                rgb_image.paste(image, mask=image.split()[-1])
-                return rgb_image
-
-            return image.convert('RGB')
+            return from_buffer(image_data, width, height, bytes_per_row, PIXEL_FORMAT_BGRA)
 
         except Exception as e:
             logger.error(f"CGImage轉換錯誤: {e}")
@@ -0,0 +1,105 @@
+"""
+Pixel Format Module
+原生像素格式轉換層：捕捉引擎發佈原生緩衝區，只在裁切區域時轉換為RGB
+"""
+
+from typing import NamedTuple, Tuple, Union, Optional
+from PIL import Image
+import numpy as np
+
+# 像素格式（依記憶體中的位元組順序命名）
+PIXEL_FORMAT_RGB = "RGB"
+PIXEL_FORMAT_RGBX = "RGBX"
+PIXEL_FORMAT_BGRX = "BGRX"  # Windows DIB、X11 (LSB) 32位元
+PIXEL_FORMAT_BGRA = "BGRA"  # macOS CGImage（alpha 合成到白色背景）
+PIXEL_FORMAT_XRGB = "XRGB"  # X11 (MSB) 32位元
+
+# 格式 -> (RGB 通道索引, alpha 通道索引, 每像素通道數)
+_FORMAT_LAYOUTS = {
+    PIXEL_FORMAT_RGB: ((0, 1, 2), None, 3),
+    PIXEL_FORMAT_RGBX: ((0, 1, 2), None, 4),
+    PIXEL_FORMAT_BGRX: ((2, 1, 0), None, 4),
+    PIXEL_FORMAT_BGRA: ((2, 1, 0), 3, 4),
+    PIXEL_FORMAT_XRGB: ((1, 2, 3), None, 4),
+}
+
+
+class NativeFrame(NamedTuple):
+    """捕捉引擎的原生幀：pixels 為 (height, width, channels) 的 uint8 陣列（可為帶行距的視圖）"""
+    pixels: np.ndarray
+    pixel_format: str
+
+
+def get_channels(pixel_format: str) -> int:
+    """獲取像素格式的每像素通道數"""
+    if pixel_format not in _FORMAT_LAYOUTS:
+        raise ValueError(f"不支援的像素格式: {pixel_format}")
+    return _FORMAT_LAYOUTS[pixel_format][2]
+
+
+def from_buffer(data, width: int, height: int, stride: int, pixel_format: str) -> NativeFrame:
+    """
+    將原生緩衝區包裝為 NativeFrame（不複製像素）
+
+    Args:
+        data: 支援 buffer protocol 的原始位元組（bytes、memoryview、ctypes陣列等）
+        width, height: 影像尺寸
+        stride: 每行位元組數（可大於 width * channels）
+        pixel_format: 像素格式
+
+    Returns:
+        NativeFrame: 以 stride 建立的唯讀視圖
+    """
+    channels = get_channels(pixel_format)
+    if stride < width * channels:
+        raise ValueError(f"行距過小: {stride} < {width * channels}")
+    rows = np.frombuffer(data, dtype=np.uint8, count=stride * height).reshape(height, stride)
+    return NativeFrame(rows[:, :width * channels].reshape(height, width, channels), pixel_format)
+
+
+def to_native(image: Union[Image.Image, np.ndarray, NativeFrame]) -> NativeFrame:
+    """將捕捉結果統一為 NativeFrame（PIL圖像與NumPy陣列視為RGB）"""
+    if isinstance(image, NativeFrame):
+        return image
+    if isinstance(image, Image.Image) and image.mode != 'RGB':
+        image = image.convert('RGB')
+    return NativeFrame(np.asarray(image), PIXEL_FORMAT_RGB)
+
+
+def get_frame_size(image: Union[Image.Image, np.ndarray, NativeFrame]) -> Tuple[int, int]:
+    """獲取捕捉結果的尺寸 (width, height)"""
+    if isinstance(image, NativeFrame):
+        image = image.pixels
+    if isinstance(image, np.ndarray):
+        return image.shape[1], image.shape[0]
+    return image.size
+
+
+def to_rgb(pixels: np.ndarray, pixel_format: str, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    將原生格式的像素（通常為裁切後的小區域）轉換為連續的RGB陣列
+
+    Args:
+        pixels: (height, width, channels) 原生像素
+        pixel_format: 像素格式
+        out: 可選的輸出陣列 (height, width, 3)
+
+    Returns:
+        np.ndarray: (height, width, 3) RGB陣列；格式已是RGB且未指定 out 時直接返回輸入
+    """
+    order, alpha_index, _ = _FORMAT_LAYOUTS[pixel_format]
+    if pixel_format == PIXEL_FORMAT_RGB and out is None:
+        return pixels
+    if out is None:
+        out = np.empty(pixels.shape[:2] + (3,), dtype=np.uint8)
+    for target, source in enumerate(order):
+        out[..., target] = pixels[..., source]
+
+    if alpha_index is not None:
+        alpha = pixels[..., alpha_index]
+        if alpha.min() < 255:
+            # 與白色背景合成: c * a + 255 * (1 - a)
+            a = alpha[..., np.newaxis].astype(np.uint16)
+            blended = (out.astype(np.uint16) * a + 255 * (255 - a) + 127) // 255
+            out[...] = blended.astype(np.uint8)
+    return out
@@ -0,0 +1,268 @@
+"""
+Replay Capture Module
+錄製畫面回放捕捉實現（無需遊戲客戶端即可執行完整管線）
+"""
+
+import os
+import threading
+import time
+from typing import Optional, Dict, Any, Tuple, List, Union
+from PIL import Image
+import numpy as np
+
+from utils.log import get_logger
+from .base_capture import BaseCaptureEngine
+from .frame_recorder import FrameRecording, RECORDING_EXTENSION
+
+logger = get_logger(__name__)
+
+# 回放速度模式
+PLAYBACK_REALTIME = "realtime"  # 依照錄製時的幀間隔播放（無時間資訊的來源使用 source_fps）
+PLAYBACK_FIXED = "fixed"        # 依照 capture_fps 固定頻率播放
+PLAYBACK_FAST = "fast"          # 不等待，盡可能快地播放
+
+IMAGE_EXTENSIONS = ('.png',)
+PACKED_EXTENSIONS = ('.npy',)
+RECORDING_EXTENSIONS = (RECORDING_EXTENSION,)
+
+
+class _FrameSource:
+    """單一回放來源（PNG資料夾、打包幀檔案或錄製檔）"""
+
+    def __init__(self, path: str, preload: bool = False):
+        self.path = path
+        self.title = os.path.basename(os.path.normpath(path))
+        self.frame_files: List[str] = []
+        self.packed = None
+        self.recording: Optional[FrameRecording] = None
+        self.preloaded: Optional[List[Image.Image]] = None
+
+        if os.path.isdir(path):
+            self.frame_files = sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+            if preload:
+                self.preloaded = [self._load_png(f) for f in self.frame_files]
+        elif path.lower().endswith(PACKED_EXTENSIONS):
+            # 打包格式: (N, H, W, 3) uint8，以 mmap 方式讀取避免一次載入全部
+            self.packed = np.load(path, mmap_mode='r')
+            if self.packed.ndim != 4 or self.packed.shape[-1] != 3:
+                raise ValueError(f"打包幀檔案格式錯誤: {path} {self.packed.shape}")
+        elif path.lower().endswith(RECORDING_EXTENSIONS):
+            # FrameRecorder 錄製檔，依幀序號順序回放
+            self.recording = FrameRecording(path)
+        else:
+            raise ValueError(f"不支援的回放來源: {path}")
+
+    @staticmethod
+    def _load_png(file_path: str) -> Image.Image:
+        with Image.open(file_path) as img:
+            return img.convert('RGB')
+
+    def __len__(self) -> int:
+        if self.recording is not None:
+            return len(self.recording)
+        if self.packed is not None:
+            return int(self.packed.shape[0])
+        return len(self.frame_files)
+
+    def get_frame(self, index: int) -> Union[Image.Image, np.ndarray]:
+        """讀取指定索引的幀"""
+        if self.recording is not None:
+            return self.recording.render(index)
+        if self.packed is not None:
+            return self.packed[index]
+        if self.preloaded is not None:
+            return self.preloaded[index]
+        return self._load_png(self.frame_files[index])
+
+    def get_timestamp(self, index: int) -> Optional[float]:
+        """指定幀的錄製時間，PNG與打包幀沒有時間資訊時返回None"""
+        if self.recording is not None:
+            return self.recording.get_timestamp(index)
+        return None
+
+    def get_size(self) -> Optional[Tuple[int, int]]:
+        """獲取幀尺寸 (width, height)"""
+        if len(self) == 0:
+            return None
+        if self.recording is not None:
+            return self.recording.window_size
+        if self.packed is not None:
+            return int(self.packed.shape[2]), int(self.packed.shape[1])
+        if self.preloaded is not None:
+            return self.preloaded[0].size
+        with Image.open(self.frame_files[0]) as img:
+            return img.size
+
+
+class ReplayCaptureEngine(BaseCaptureEngine):
+    """
+    回放捕捉引擎
+
+    從PNG資料夾、打包幀檔案(.npy)或錄製檔(.gmrec)回放錄製的畫面，提供與其他平台引擎相同的
+    get_region/start_capture 介面，用於在Linux上無頭執行與效能量測。
+
+    source 可以是：
+      - 單一PNG資料夾、.npy 或 .gmrec 檔案（僅一個視窗）
+      - 包含多個PNG子資料夾、.npy 或 .gmrec 檔案的資料夾（每個來源視為一個視窗）
+    """
+
+    def __init__(self, source: str, playback: str = PLAYBACK_FIXED,
+                 source_fps: float = 2.0, loop: bool = True, preload: bool = False):
+        super().__init__()
+        if playback not in (PLAYBACK_REALTIME, PLAYBACK_FIXED, PLAYBACK_FAST):
+            raise ValueError(f"不支援的回放模式: {playback}")
+        self.source = source
+        self.playback = playback
+        self.source_fps = source_fps
+        self.loop = loop
+        self.preload = preload
+        self.sources: Dict[str, _FrameSource] = {}
+        self.active_source: Optional[_FrameSource] = None
+        self.frame_index = 0
+        self.frames_played = 0
+        self.playback_finished = threading.Event()
+        # 目前幀的索引與讀取時間（perf_counter），realtime 模式據此計算到下一幀的等待時間
+        self._current_index = -1
+        self._current_shown_at = 0.0
+        self._scan_sources()
+
+    def _scan_sources(self) -> None:
+        """掃描回放來源，建立視窗控制代碼對應表"""
+        path = self.source
+        candidates = []
+        if os.path.isdir(path):
+            has_frames = any(name.lower().endswith(IMAGE_EXTENSIONS) for name in os.listdir(path))
+            if has_frames:
+                candidates.append(path)
+            else:
+                for name in sorted(os.listdir(path)):
+                    sub_path = os.path.join(path, name)
+                    if os.path.isdir(sub_path) or name.lower().endswith(PACKED_EXTENSIONS + RECORDING_EXTENSIONS):
+                        candidates.append(sub_path)
+        elif os.path.exists(path):
+            candidates.append(path)
+        else:
+            logger.error(f"回放來源不存在: {path}")
+
+        for candidate in candidates:
+            try:
+                frame_source = _FrameSource(candidate, self.preload)
+                if len(frame_source) > 0:
+                    self.sources[candidate] = frame_source
+            except Exception as e:
+                logger.warning(f"略過無效的回放來源 {candidate}: {e}")
+        logger.info(f"回放來源: {len(self.sources)} 個")
+
+    def initialize_resources(self, window_handle: Any, region: Dict[str, int]) -> bool:
+        frame_source = self.sources.get(window_handle)
+        if frame_source is None:
+            return False
+        if self.active_source is not frame_source:
+            self.frame_index = 0
+            self.frames_played = 0
+            self.playback_finished.clear()
+        self.active_source = frame_source
+        self.current_resources = {'source': window_handle, 'region': region}
+        self.is_initialized = True
+        return True
+
+    def capture_window(self) -> Optional[Union[Image.Image, np.ndarray]]:
+        return self._next_frame()
+
+    def capture_rect(self, x: int, y: int, w: int, h: int) -> Optional[np.ndarray]:
+        frame = self._next_frame()
+        if frame is None:
+            return None
+        return np.asarray(frame)[y:y + h, x:x + w]
+
+    def _next_frame(self) -> Optional[Union[Image.Image, np.ndarray]]:
+        """讀取下一幀並推進回放位置"""
+        if not self.is_initialized or self.active_source is None:
+            return None
+        if self.frame_index >= len(self.active_source):
+            if not self.loop:
+                # 回放結束，停止捕捉循環
+                self.playback_finished.set()
+                self._stop_event.set()
+                return None
+            self.frame_index = 0
+        try:
+            image = self.active_source.get_frame(self.frame_index)
+        except Exception as e:
+            logger.error(f"讀取回放幀錯誤: {e}")
+            image = None
+        self._current_index = self.frame_index
+        self._current_shown_at = time.perf_counter()
+        self.frame_index += 1
+        self.frames_played += 1
+        return image
+
+    def _get_capture_interval(self) -> float:
+        if self.playback == PLAYBACK_FAST:
+            return 0.0
+        if self.playback == PLAYBACK_REALTIME:
+            return self._get_realtime_interval()
+        return super()._get_capture_interval()
+
+    def _get_realtime_interval(self) -> float:
+        """
+        依錄製時間計算到下一幀的等待時間（扣除本幀已花費的處理時間）
+
+        錄製檔使用相鄰兩幀的時間差；沒有時間資訊的來源、循環回到開頭或時間差無效時使用 source_fps。
+        """
+        fallback = 1.0 / self.source_fps
+        frame_source = self.active_source
+        current = self._current_index
+        if frame_source is None or current < 0:
+            return fallback
+        delta = None
+        if current + 1 < len(frame_source):
+            current_time = frame_source.get_timestamp(current)
+            next_time = frame_source.get_timestamp(current + 1)
+            if current_time is not None and next_time is not None and next_time >= current_time:
+                delta = next_time - current_time
+        if delta is None:
+            delta = fallback
+        elapsed = time.perf_counter() - self._current_shown_at
+        return max(0.0, delta - elapsed)
+
+    def cleanup_resources(self) -> None:
+        self.active_source = None
+        self.current_resources = None
+        self.is_initialized = False
+
+    def is_window_valid(self, window_handle: Any) -> bool:
+        return window_handle in self.sources
+
+    def get_window_list(self) -> List[Tuple[Any, str]]:
+        return [(handle, source.title) for handle, source in self.sources.items()]
+
+    def get_window_rect(self, window_handle: Any) -> Optional[Tuple[int, int, int, int]]:
+        frame_source = self.sources.get(window_handle)
+        if frame_source is None:
+            return None
+        size = frame_source.get_size()
+        if size is None:
+            return None
+        return (0, 0, size[0], size[1])
+
+    def wait_until_finished(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待回放結束（僅在 loop=False 時有意義）
+
+        Returns:
+            bool: 是否在逾時前結束
+        """
+        return self.playback_finished.wait(timeout)
+
+    def get_playback_stats(self) -> Dict[str, Any]:
+        """獲取回放統計"""
+        return {
+            'frames_played': self.frames_played,
+            'frame_index': self.frame_index,
+            'total_frames': len(self.active_source) if self.active_source else 0,
+            'finished': self.playback_finished.is_set()
+        }
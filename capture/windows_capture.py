@@ -7,7 +7,6 @@ import time
 import ctypes
 import sys
 from typing import Optional, Dict, Any, Tuple, List
-from PIL import Image
 import subprocess
 from utils.log import get_logger
 
@@ -28,6 +27,7 @@ else:
     WIN32_AVAILABLE = False
 
 from .base_capture import BaseCaptureEngine
+from .pixel_format import NativeFrame, PIXEL_FORMAT_BGRX, from_buffer
 
 
 class WindowsCaptureEngine(BaseCaptureEngine):
@@ -85,7 +85,7 @@ class WindowsCaptureEngine(BaseCaptureEngine):
             self.cleanup_resources()
             return False
     
-    def capture_window(self) -> Optional[Image.Image]:
+    def capture_window(self) -> Optional[NativeFrame]:
         """捕捉完整視窗畫面"""
         if not WIN32_AVAILABLE:
             return None
@@ -118,25 +118,14 @@ class WindowsCaptureEngine(BaseCaptureEngine):
 
             result = self.user32.PrintWindow(hwnd, hdcTemp.GetSafeHdc(), 2)  # PW_RENDERFULLCONTENT
 
-            if result:
-                # 直接將整個視窗內容轉為PIL Image
-                bmpinfo = hbmTemp.GetInfo()
-                bmpstr = hbmTemp.GetBitmapBits(True)
-                img = Image.frombuffer(
-                    'RGB',
-                    (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-                    bmpstr, 'raw', 'BGRX', 0, 1
-                )
-            else:
+            if not result:
                 # 回退到 BitBlt 畫面
                 hdcTemp.BitBlt((0, 0), (window_width, window_height), hdcMem, (0, 0), win32con.SRCCOPY)
-                bmpinfo = hbmTemp.GetInfo()
-                bmpstr = hbmTemp.GetBitmapBits(True)
-                img = Image.frombuffer(
-                    'RGB',
-                    (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-                    bmpstr, 'raw', 'BGRX', 0, 1
-                )
+            # 保留原生BGRX緩衝區，只在裁切區域時轉換為RGB
+            bmpinfo = hbmTemp.GetInfo()
+            bmpstr = hbmTemp.GetBitmapBits(True)
+            img = from_buffer(bmpstr, bmpinfo['bmWidth'], bmpinfo['bmHeight'],
+                              bmpinfo['bmWidthBytes'], PIXEL_FORMAT_BGRX)
 
             # 清理臨時資源
             win32gui.DeleteObject(hbmTemp.GetHandle())
@@ -147,12 +136,68 @@ class WindowsCaptureEngine(BaseCaptureEngine):
             logger.error(f"Windows捕捉完整畫面錯誤: {e}")
             return None
     
+    def capture_rect(self, x: int, y: int, w: int, h: int) -> Optional[NativeFrame]:
+        """只捕捉視窗中的指定矩形（以BitBlt複製，避免整個視窗的PrintWindow）"""
+        if not WIN32_AVAILABLE:
+            return None
+        
+        if not self.is_initialized or not self.current_resources:
+            return None
+        
+        try:
+            resources = self.current_resources
+            hwnd = resources['hwnd']
+            hdcMem = resources['hdcMem']
+
+            if not self.is_window_valid(hwnd):
+                return None
+
+            # 重複使用相同尺寸的點陣圖，避免每幀重新建立
+            if resources.get('rect_size') != (w, h):
+                self._release_rect_bitmap()
+                hdcRect = hdcMem.CreateCompatibleDC()
+                hbmRect = win32ui.CreateBitmap()
+                hbmRect.CreateCompatibleBitmap(hdcMem, w, h)
+                hdcRect.SelectObject(hbmRect)
+                resources.update({'rect_size': (w, h), 'hdcRect': hdcRect, 'hbmRect': hbmRect})
+
+            hdcRect = resources['hdcRect']
+            hbmRect = resources['hbmRect']
+            hdcRect.BitBlt((0, 0), (w, h), hdcMem, (x, y), win32con.SRCCOPY)
+            bmpinfo = hbmRect.GetInfo()
+            bmpstr = hbmRect.GetBitmapBits(True)
+            img = from_buffer(bmpstr, w, h, bmpinfo['bmWidthBytes'], PIXEL_FORMAT_BGRX)
+
+            # 硬體加速的視窗可能只能透過PrintWindow取得內容，全黑時交由完整視窗捕捉
+            # （基類會比對完整視窗的同一範圍，畫面本身全黑時不視為失敗）
+            if not img.pixels[..., :3].any():
+                return None
+            return img
+        except Exception as e:
+            logger.error(f"Windows區域捕捉錯誤: {e}")
+            return None
+    
+    def _release_rect_bitmap(self) -> None:
+        """釋放區域捕捉用的點陣圖"""
+        resources = self.current_resources
+        if not resources or 'hbmRect' not in resources:
+            return
+        try:
+            win32gui.DeleteObject(resources['hbmRect'].GetHandle())
+            resources['hdcRect'].DeleteDC()
+        except Exception as e:
+            logger.error(f"釋放區域捕捉點陣圖錯誤: {e}")
+        finally:
+            for key in ('rect_size', 'hdcRect', 'hbmRect'):
+                resources.pop(key, None)
+    
     def cleanup_resources(self) -> None:
         """清理Windows捕捉資源"""
         if not WIN32_AVAILABLE:
             return
         
         if self.current_resources:
+            self._release_rect_bitmap()
             try:
                 resources = self.current_resources
                 if 'hbm' in resources:
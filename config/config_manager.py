@@ -5,7 +5,7 @@ Configuration Manager Module
 
 import json
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from utils.log import get_logger
 
 logger = get_logger(__name__)
@@ -161,6 +161,87 @@ class ConfigManager:
         """設定FPS"""
         self.set_global_config("fps", fps)
     
+    def get_capture_mode(self) -> str:
+        """獲取捕捉模式（full: 完整視窗, regions: 僅監測區域聯集）"""
+        return self.get_global_config().get("capture_mode", "regions")
+    
+    def set_capture_mode(self, mode: str) -> None:
+        """設定捕捉模式"""
+        self.set_global_config("capture_mode", mode)
+    
+    def get_adaptive_rate(self) -> Dict[str, Any]:
+        """獲取自適應頻率設定 {'enabled': bool, 'min_fps': float, 'max_fps': float}（預設停用，沿用 fps 設定）"""
+        config = {"enabled": False, "min_fps": 0.5, "max_fps": 5.0}
+        config.update(self.get_global_config().get("adaptive_rate", {}))
+        return config
+    
+    def set_adaptive_rate(self, enabled: bool, min_fps: float, max_fps: float) -> None:
+        """設定自適應頻率"""
+        self.set_global_config("adaptive_rate", {"enabled": enabled, "min_fps": min_fps, "max_fps": max_fps})
+    
+    def get_ocr_workers(self) -> int:
+        """獲取OCR子程序數量（0 表示在主程序中執行OCR）"""
+        return int(self.get_global_config().get("ocr_workers", 1))
+    
+    def set_ocr_workers(self, count: int) -> None:
+        """設定OCR子程序數量"""
+        self.set_global_config("ocr_workers", count)
+    
+    def get_ocr_detection_free(self) -> bool:
+        """獲取是否略過文字偵測直接辨識框選區域"""
+        return bool(self.get_global_config().get("ocr_detection_free", True))
+    
+    def set_ocr_detection_free(self, enabled: bool) -> None:
+        """設定是否略過文字偵測"""
+        self.set_global_config("ocr_detection_free", enabled)
+    
+    def get_ocr_scheduling(self) -> Dict[str, Any]:
+        """
+        獲取分頁OCR排程設定
+        {'enabled': bool, 'max_tabs_per_cycle': int,
+         'classes': {等級: {'interval': 秒, 'priority': 優先度}}, 'tabs': {分頁: 等級}}
+        """
+        config = {"enabled": True, "max_tabs_per_cycle": 6, "classes": {}, "tabs": {}}
+        config.update(self.get_global_config().get("ocr_scheduling", {}))
+        return config
+    
+    def set_ocr_scheduling(self, enabled: bool, max_tabs_per_cycle: int,
+                           classes: Dict[str, Dict[str, float]], tabs: Dict[str, str]) -> None:
+        """設定分頁OCR排程"""
+        self.set_global_config("ocr_scheduling", {
+            "enabled": enabled, "max_tabs_per_cycle": max_tabs_per_cycle, "classes": classes, "tabs": tabs
+        })
+    
+    def get_debug_images(self) -> Dict[str, Any]:
+        """
+        獲取除錯圖像輸出設定
+        {'enabled': bool, 'output_dir': str, 'sample_every': int,
+         'tabs': [分頁]（空列表表示全部）, 'stages': ['raw' | 'preprocessed']}
+        """
+        config = {"enabled": False, "output_dir": "tmp", "sample_every": 10, "tabs": [], "stages": ["raw"]}
+        config.update(self.get_global_config().get("debug_images", {}))
+        return config
+    
+    def set_debug_images(self, enabled: bool, output_dir: str = "tmp", sample_every: int = 10,
+                         tabs: Optional[List[str]] = None, stages: Optional[List[str]] = None) -> None:
+        """設定除錯圖像輸出"""
+        self.set_global_config("debug_images", {
+            "enabled": enabled, "output_dir": output_dir, "sample_every": sample_every,
+            "tabs": tabs or [], "stages": stages or ["raw"]
+        })
+    
+    def get_ocr_backend(self) -> Dict[str, Any]:
+        """獲取OCR後端設定 {'name': 'easyocr'|'onnx', 'model_dir': str, 'quantized': bool, 'num_threads': int}"""
+        config = {"name": "easyocr", "model_dir": "", "quantized": False, "num_threads": 0}
+        config.update(self.get_global_config().get("ocr_backend", {}))
+        return config
+    
+    def set_ocr_backend(self, name: str, model_dir: str = "", quantized: bool = False, num_threads: int = 0) -> None:
+        """設定OCR後端（model_dir 為空時使用預設的 models/onnx）"""
+        self.set_global_config("ocr_backend", {
+            "name": name, "model_dir": model_dir, "quantized": quantized, "num_threads": num_threads
+        })
+    
     def get_window_title(self) -> str:
         """獲取視窗標題"""
         return self.get_global_config().get("window_title", "")
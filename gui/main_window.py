@@ -7,7 +7,7 @@ import tkinter as tk
 from tkinter import ttk
 import threading
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import os
 import ctypes
 
@@ -22,9 +22,12 @@ from module.hpmp_manager import HPMPManager
 from module.exp_manager import EXPManager
 from module.coin_manager import CoinManager
 from module.potion_manager import TotalPotionManager
-from utils.common import FrequencyController
+from utils.rate_scheduler import AdaptiveRateScheduler
+from utils.tab_scheduler import TabScheduler
 from utils.log import get_logger
 from capture.base_capture import create_capture_engine
+from capture.frame_buffer import FrameInfo
+from capture.frame_dispatcher import FrameDispatcher
 
 logger = get_logger(__name__)
 
@@ -90,7 +93,13 @@ class GameMonitorMainWindow:
         
         # OCR引擎
         self.ocr_engine = OCREngine(self.root)
-        self.ocr_frequency_controller = FrequencyController(self.fps_var)
+        # 自適應頻率排程器：協調擷取頻率與OCR頻率
+        self.rate_scheduler = AdaptiveRateScheduler(enabled=False)
+        self.adaptive_rate_var = tk.BooleanVar(value=False)
+        self.adaptive_min_fps_var = tk.StringVar(value="0.5")
+        self.adaptive_max_fps_var = tk.StringVar(value="5.0")
+        # 分頁OCR排程器：依頻率等級與優先度決定每次OCR處理的分頁
+        self.tab_scheduler = TabScheduler()
         # 監控標籤頁
         self.tabs = {}
         self.tabs_names = ["HP", "MP", "EXP", "楓幣", "藥水1", "藥水2", "藥水3", "藥水4", "藥水5", "藥水6", "藥水7", "藥水8"]
@@ -103,12 +112,16 @@ class GameMonitorMainWindow:
         
         # 共享捕捉引擎管理器
         self.capture_manager = create_capture_engine()
+        # 幀分派器：單一執行緒將每幀的區域裁切發佈給各分頁與OCR
+        self.frame_dispatcher = FrameDispatcher(self.capture_manager)
+        self.capture_manager.set_rate_scheduler(self.rate_scheduler)
+        self.frame_dispatcher.add_listener(self.rate_scheduler.observe_frames)
         
         
         self._create_gui()
-        self._init_ocr()
-        # 載入配置移到GUI創建後
+        # 載入配置移到GUI創建後（OCR子程序數量取自配置，需在初始化OCR前載入）
         self._load_config()
+        self._init_ocr()
         # 配置載入完成後，啟用配置保存
         self.is_loading_config = False
         
@@ -159,6 +172,13 @@ class GameMonitorMainWindow:
             self.window_transparency_var,
             self.auto_update_var
         )
+        self.settings_tab.set_rate_scheduler(
+            self.rate_scheduler,
+            self.adaptive_rate_var,
+            self.adaptive_min_fps_var,
+            self.adaptive_max_fps_var
+        )
+        self.settings_tab.set_ocr_engine(self.ocr_engine)
         
         # 設定回調函數
         self.settings_tab.set_callbacks(
@@ -262,6 +282,11 @@ class GameMonitorMainWindow:
         if self.settings_tab:
             self.settings_tab._update_fps(*args)
 
+    def _update_adaptive_rate(self):
+        """套用自適應頻率設定"""
+        if self.settings_tab:
+            self.settings_tab._update_adaptive_rate()
+
     def _update_status_visibility(self):
         """更新狀態顯示的可見性"""
         if hasattr(self, 'results_frame'):
@@ -401,7 +426,22 @@ class GameMonitorMainWindow:
                 potion_manager = self.potion_manager[i]
                 potion_manager.enabled = self.tab_visibility_vars[potion_tab_name].get()
 
+        self._update_capture_regions()
         self._save_config_if_ready()
+
+    def _update_capture_regions(self):
+        """將啟用中分頁的區域提供給捕捉引擎（區域聯集捕捉模式使用）與幀分派器"""
+        regions = {}
+        for tab_name, tab in self.tabs.items():
+            if not self.tab_visibility_vars[tab_name].get():
+                continue
+            region = tab.region_widget.get_region()
+            if region:
+                regions[tab_name] = region
+            else:
+                tab.show_region_hint()
+        self.capture_manager.set_capture_regions(regions)
+        self.frame_dispatcher.set_regions(regions)
     
     def _create_monitor_tab(self, tab_name: str):
         """創建監控標籤頁"""
@@ -415,6 +455,7 @@ class GameMonitorMainWindow:
         )
         
         self.tabs[tab_name] = tab
+        self.frame_dispatcher.add_subscriber(tab_name, tab.on_frame)
         frame = tab._create_tab()
         
         # 增加藥水單價輸入到藥水標籤頁
@@ -448,6 +489,11 @@ class GameMonitorMainWindow:
         
         # 設定OCR結果回調
         self.ocr_engine.set_result_callback(self._update_ocr_result)
+        self.ocr_engine.worker_count = self.config_manager.get_ocr_workers()
+        self.ocr_engine.detection_free = self.config_manager.get_ocr_detection_free()
+        backend_config = self.config_manager.get_ocr_backend()
+        self.ocr_engine.backend_name = backend_config.pop("name")
+        self.ocr_engine.backend_options = backend_config
         
         # 初始化OCR引擎
         self.ocr_engine.initialize(self.tabs_names)
@@ -458,36 +504,49 @@ class GameMonitorMainWindow:
     def _start_ocr_processing(self):
         """開始OCR處理"""
         def ocr_loop():
+            last_frame_id = 0
             while True:
                 try:
-                    if self.ocr_frequency_controller.should_process():
-                        # 收集所有啟用的標籤頁的圖像
+                    # 等待幀分派器發佈新幀（最多等待0.1秒）
+                    last_frame_id = self.frame_dispatcher.wait_for_frames(last_frame_id, timeout=0.1)
+                    if self.rate_scheduler.should_process_ocr():
+                        # 收集所有啟用的標籤頁的圖像（同一次分派的裁切結果）
                         images_dict = {}
-                        for tab_name, tab in self.tabs.items():
-                            if not tab.is_capturing:
+                        frame_infos = {}
+                        for tab_name, latest_frame in self.frame_dispatcher.get_latest_frames().items():
+                            tab = self.tabs.get(tab_name)
+                            if tab is None or not tab.is_capturing:
                                 continue  # 如果標籤頁沒有在捕捉，跳過
-                            image = tab.get_latest_image()
-                            if image:
-                                images_dict[tab_name] = image
+                            images_dict[tab_name], frame_infos[tab_name] = latest_frame
+                        # 只處理已到期的分頁（依優先度與逾期程度排序）
+                        selected = self.tab_scheduler.select(images_dict)
+                        images_dict = {tab_name: images_dict[tab_name] for tab_name in selected}
                         logger.debug(f"[OCR DEBUG] images_dict keys: {list(images_dict.keys())}")  # <--- debug
 
                         # 處理OCR
                         if images_dict:
                             logger.debug("[OCR DEBUG] 呼叫 process_images")
-                            self.ocr_engine.process_images(images_dict)
+                            ocr_start = time.time()
+                            if self.ocr_engine.process_images(images_dict, frame_infos):
+                                # 後備辨識逾時的分頁不記為已處理，下次循環立即重試
+                                deferred = self.ocr_engine.deferred_tabs
+                                self.tab_scheduler.mark_processed(
+                                    tab_name for tab_name in images_dict if tab_name not in deferred)
+                            self.rate_scheduler.report_ocr_cycle(time.time() - ocr_start)
                         else:
                             logger.debug("[OCR DEBUG] 沒有可用的圖像進行OCR")
-                            pass
-                    
-                    time.sleep(0.1)
+                            time.sleep(0.1)
+                    else:
+                        time.sleep(0.05)
                     
                 except Exception as e:
                     logger.error(f"OCR處理錯誤: {e}")
                     time.sleep(1.0)
         threading.Thread(target=ocr_loop, daemon=True).start()
 
-    def _update_ocr_result(self, tab_name: str, result: str):
-        """更新OCR結果"""
+    def _update_ocr_result(self, tab_name: str, result: str, frame_info: Optional[FrameInfo] = None):
+        """更新OCR結果（frame_info 為結果所屬幀的資訊，用於以擷取時間記錄資料）"""
+        timestamp = frame_info.timestamp if frame_info is not None else None
         logger.debug(f"[OCR DEBUG] set_ocr_result({tab_name}, {result})")
         
         # 將辨識結果傳送到對應的管理器和多功能追蹤器
@@ -525,7 +584,7 @@ class GameMonitorMainWindow:
                 
         elif tab_name == "EXP":
             # 更新EXP管理器
-            self.exp_manager.update(result)
+            self.exp_manager.update(result, timestamp)
             
             # 取得格式化EXP顯示 - 使用有效的經驗值
             exp_status = self.exp_manager.get_status()
@@ -554,7 +613,7 @@ class GameMonitorMainWindow:
                 self.overview_labels[tab_name].config(text=exp_formatted)
         elif tab_name == "楓幣":
             # 更新楓幣管理器
-            self.coin_manager.update(result)
+            self.coin_manager.update(result, timestamp)
                 
             coin = self.coin_manager.get_status()['current_coin_value']
             coin_text = f"{coin:,}" if coin is not None else "N/A"
@@ -570,7 +629,7 @@ class GameMonitorMainWindow:
             # 更新藥水管理器
             index = int(tab_name[-1]) - 1  # 假設標籤頁名稱為 "藥水1", "藥水2" 等
             potion_manager = self.potion_manager[index]
-            potion_manager.update(result)
+            potion_manager.update(result, timestamp)
             potion_status = potion_manager.get_status()
             
             if potion_status:
@@ -601,10 +660,16 @@ class GameMonitorMainWindow:
     def _start_monitoring(self):
         """開始監控"""
         self.capture_manager.start_capture()
+        # 設定環境變數 GAME_MONITOR_RECORD 時錄製監測區域（用於重現誤判與效能量測）
+        record_path = os.environ.get("GAME_MONITOR_RECORD")
+        if record_path:
+            self.capture_manager.start_recording(record_path)
+        self.frame_dispatcher.start()
         self._start_ocr_processing()
     
     def _stop_monitoring(self):
         """停止監控"""
+        self.frame_dispatcher.stop()
         self.capture_manager.stop_capture()
         for tab_name, tab in self.tabs.items():
             # 為每個標籤頁停止捕捉
@@ -636,6 +701,25 @@ class GameMonitorMainWindow:
             self._update_fps()
             self.auto_update_var.set(global_config.get('auto_update', True))
             
+            # 載入自適應頻率設定
+            adaptive_rate = self.config_manager.get_adaptive_rate()
+            self.adaptive_rate_var.set(bool(adaptive_rate['enabled']))
+            self.adaptive_min_fps_var.set(str(adaptive_rate['min_fps']))
+            self.adaptive_max_fps_var.set(str(adaptive_rate['max_fps']))
+            self._update_adaptive_rate()
+            
+            # 載入分頁OCR排程設定
+            scheduling = self.config_manager.get_ocr_scheduling()
+            self.tab_scheduler.enabled = bool(scheduling['enabled'])
+            self.tab_scheduler.max_tabs_per_cycle = int(scheduling['max_tabs_per_cycle'])
+            self.tab_scheduler.configure(scheduling['classes'], scheduling['tabs'])
+            
+            # 載入除錯圖像輸出設定
+            debug_images = self.config_manager.get_debug_images()
+            self.ocr_engine.debug_sink.configure(
+                bool(debug_images['enabled']), debug_images['output_dir'], int(debug_images['sample_every']),
+                debug_images['tabs'], debug_images['stages'])
+            
             # 載入顯示選項配置
             display_config = global_config.get('display_options', {})
             self.show_status_var.set(display_config.get('show_status', True))
@@ -675,6 +759,12 @@ class GameMonitorMainWindow:
             # 設定OCR允許字符列表
             allow_list = global_config.get('ocr_allow_list', '0123456789.[]/%')
             self.ocr_engine.set_allow_list(allow_list)
+            
+            # 設定捕捉模式
+            try:
+                self.capture_manager.set_capture_mode(self.config_manager.get_capture_mode())
+            except ValueError as e:
+                logger.warning(f"捕捉模式設定錯誤: {e}")
         
         # 配置載入完成後，啟用視窗大小變更監聽
         self.is_window_configure_bound = True
@@ -688,6 +778,11 @@ class GameMonitorMainWindow:
         self.fps_var.trace_add('write', lambda *args: self._save_config_if_ready())
         self.fps_var.trace_add('write', self._update_fps)
         
+        # 綁定自適應頻率變數的回調
+        for var in (self.adaptive_rate_var, self.adaptive_min_fps_var, self.adaptive_max_fps_var):
+            var.trace_add('write', lambda *args: self._update_adaptive_rate())
+            var.trace_add('write', lambda *args: self._save_config_if_ready())
+        
         # 綁定顯示選項變數的回調
         self.show_status_var.trace_add('write', lambda *args: self._save_config_if_ready())
         self.show_tracker_var.trace_add('write', lambda *args: self._save_config_if_ready())
@@ -722,6 +817,7 @@ class GameMonitorMainWindow:
                 for var in [tab.region_widget.x_var, tab.region_widget.y_var, 
                            tab.region_widget.w_var, tab.region_widget.h_var]:
                     var.trace_add('write', lambda *args: self._save_config_if_ready())
+                    var.trace_add('write', lambda *args: self._update_capture_regions())
                     
         # 綁定視窗大小和位置變更事件
         if hasattr(self, 'is_window_configure_bound'):
@@ -773,6 +869,15 @@ class GameMonitorMainWindow:
         except ValueError:
             pass
         
+        try:
+            self.config_manager.set_adaptive_rate(
+                self.adaptive_rate_var.get(),
+                float(self.adaptive_min_fps_var.get()),
+                float(self.adaptive_max_fps_var.get())
+            )
+        except ValueError:
+            pass
+        
         if self.settings_widget and hasattr(self.settings_widget, 'window_title_var'):
             window_title = self.settings_widget.window_title_var.get()
             self.config_manager.set_window_title(window_title)
@@ -810,6 +915,7 @@ class GameMonitorMainWindow:
         """視窗關閉事件處理"""
         self._save_config()
         self._stop_monitoring()
+        self.ocr_engine.shutdown()
         self.root.destroy()
     
     def _auto_select_window(self):
@@ -5,14 +5,14 @@ Monitor Tab Module
 
 import tkinter as tk
 from tkinter import ttk
-import threading
-import time
-from typing import Optional, Callable, Dict, Any
+from typing import Optional, Callable, Dict, Any, Tuple
 from PIL import Image
+import numpy as np
 
 from gui.widgets.region_selection import RegionSelectionWidget
 from gui.widgets.preview_widget import PreviewWidget
 from capture.base_capture import BaseCaptureEngine, create_capture_engine
+from capture.frame_buffer import FrameInfo
 from utils.common import FrequencyController
 from utils.log import get_logger
 
@@ -27,11 +27,10 @@ class GameMonitorTab:
         self.parent = parent
         self.tab_name = tab_name
         self.config_callback = config_callback
-        self.latest_image = None
+        self.latest_frame: Optional[Tuple[np.ndarray, FrameInfo]] = None  # (區域圖像, 幀資訊)
         self.ocr_result = "N/A"
         self.ocr_allow_list = '0123456789.[]/%'
         self.is_capturing = False
-        self.capture_thread = None
         self.get_window_info_callback = get_window_info_callback
         
         # 捕捉引擎 - 使用外部傳入的實例
@@ -96,61 +95,53 @@ class GameMonitorTab:
         cost_entry.bind('<FocusOut>', lambda e: on_cost_changed(self.potion_cost_var.get()))
     
     def start_capture(self):
-        """開始擷取"""
-        if self.is_capturing:
-            return
-            
+        """開始擷取（圖像由幀分派器透過 on_frame 推送）"""
         self.is_capturing = True
-        self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
-        self.capture_thread.start()
     
     def stop_capture(self):
         """停止擷取"""
         self.is_capturing = False
-        self.latest_image = None
+        self.latest_frame = None
     
-    def _capture_loop(self):
-        """擷取迴圈"""
-        while self.is_capturing:
-            try:
-                region = self.region_widget.get_region()
-                
-                if region:
-                    # 擷取圖像
-                    captured_img = self.capture_manager.get_region(
-                        x=region['x'], 
-                        y=region['y'], 
-                        w=region['w'], 
-                        h=region['h']
-                    )
-                    
-                    if captured_img:
-                        self.latest_image = captured_img
-                        
-                        # [Deubg] 儲存到tmp/{tab_name}.png
-                        # Image.Image.save(self.latest_image, f"tmp/{self.tab_name}.png")
-                        
-                        # 在主線程中更新預覽
-                        self.parent.after(0, self._update_preview)
-                    else:
-                        self.latest_image = None
-                        self.parent.after(0, lambda: self.preview_widget.set_message("擷取失敗"))
-                else:
-                    self.parent.after(0, lambda: self.preview_widget.set_message("請選擇視窗和設定區域"))
-
-            except Exception as e:
-                logger.error(f"{self.tab_name} 擷取錯誤: {e}")
-            time.sleep(1 /  float(self.capture_manager.capture_fps))
+    def on_frame(self, captured: Optional[Tuple[np.ndarray, FrameInfo]]):
+        """
+        接收幀分派器推送的區域圖像（於分派執行緒中呼叫）
         
+        Args:
+            captured: (區域唯讀圖像, 幀資訊)，區域超出畫面範圍時為None
+        """
+        if not self.is_capturing:
+            return
+        if captured is not None:
+            previous = self.latest_frame
+            self.latest_frame = captured
+            
+            # 在主線程中更新預覽（同一幀不重複更新）
+            if previous is None or previous[1].frame_id != captured[1].frame_id:
+                self.parent.after(0, self._update_preview)
+        else:
+            self.latest_frame = None
+            self.parent.after(0, lambda: self.preview_widget.set_message("擷取失敗"))
+    
+    def show_region_hint(self):
+        """尚未設定區域時顯示提示"""
+        self.latest_frame = None
+        self.preview_widget.set_message("請選擇視窗和設定區域")
     
     def _update_preview(self):
-        """更新預覽"""
-        if self.latest_image:
-            self.preview_widget.update_preview(self.latest_image)
+        """更新預覽（僅在此處轉換為PIL圖像）"""
+        latest_frame = self.latest_frame
+        if latest_frame is not None:
+            self.preview_widget.update_preview(Image.fromarray(latest_frame[0]))
+    
+    def get_latest_image(self) -> Optional[np.ndarray]:
+        """獲取最新圖像（唯讀RGB視圖）"""
+        latest_frame = self.latest_frame
+        return latest_frame[0] if latest_frame else None
     
-    def get_latest_image(self) -> Optional[Image.Image]:
-        """獲取最新圖像"""
-        return self.latest_image
+    def get_latest_frame(self) -> Optional[Tuple[np.ndarray, FrameInfo]]:
+        """獲取最新圖像與其幀資訊"""
+        return self.latest_frame
     
     def set_ocr_result(self, result: str):
         """設定OCR結果"""
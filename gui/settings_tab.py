@@ -7,6 +7,7 @@ import tkinter as tk
 from tkinter import ttk
 from typing import Dict, Callable, Any
 from utils.log import get_logger
+from ocr.ocr_engine import STAGE_LABELS
 
 logger = get_logger(__name__)
 
@@ -42,6 +43,17 @@ class SettingsTab:
         # 多功能追蹤器widget的引用
         self.multi_tracker_widget = None
         
+        # 自適應頻率排程
+        self.rate_scheduler = None
+        self.adaptive_rate_var = None
+        self.adaptive_min_fps_var = None
+        self.adaptive_max_fps_var = None
+        self.rate_status_label = None
+        
+        # OCR各階段延遲統計
+        self.ocr_engine = None
+        self.timing_label = None
+        
     def set_variables(self, shared_fps_var, show_status_var, show_tracker_var, tab_visibility_vars, window_pinned_var=None, window_transparency_var=None, auto_update_var=None):
         """設定從主視窗傳入的變數"""
         self.fps_var = shared_fps_var
@@ -57,6 +69,17 @@ class SettingsTab:
         self.tracker_coin_var = tk.BooleanVar(value=True)
         self.tracker_potion_var = tk.BooleanVar(value=True)
 
+    def set_rate_scheduler(self, rate_scheduler, adaptive_rate_var, adaptive_min_fps_var, adaptive_max_fps_var):
+        """設定自適應頻率排程器與其設定變數"""
+        self.rate_scheduler = rate_scheduler
+        self.adaptive_rate_var = adaptive_rate_var
+        self.adaptive_min_fps_var = adaptive_min_fps_var
+        self.adaptive_max_fps_var = adaptive_max_fps_var
+
+    def set_ocr_engine(self, ocr_engine):
+        """設定OCR引擎（顯示各階段延遲統計）"""
+        self.ocr_engine = ocr_engine
+
     def set_callbacks(self, update_status_visibility, update_tracker_visibility, apply_tab_visibility_changes, update_window_pinning=None, update_window_transparency=None, update_auto_update=None):
         """設定回調函數"""
         self.update_status_visibility = update_status_visibility
@@ -131,6 +154,26 @@ class SettingsTab:
         self.fps_label.pack(anchor=tk.W, pady=(2, 0))
         self._update_fps()
         
+        # 自適應頻率控制
+        if self.rate_scheduler and self.adaptive_rate_var:
+            ttk.Checkbutton(
+                setting_frame,
+                text="自適應擷取頻率（戰鬥時加快、靜止時降低）",
+                variable=self.adaptive_rate_var
+            ).pack(anchor=tk.W, pady=1)
+            
+            adaptive_frame = ttk.Frame(setting_frame)
+            adaptive_frame.pack(fill=tk.X, pady=2)
+            ttk.Label(adaptive_frame, text="最低 FPS:").grid(row=0, column=0, padx=2, sticky='w')
+            ttk.Entry(adaptive_frame, textvariable=self.adaptive_min_fps_var, width=6).grid(row=0, column=1, padx=2)
+            ttk.Label(adaptive_frame, text="最高 FPS:").grid(row=0, column=2, padx=2, sticky='w')
+            ttk.Entry(adaptive_frame, textvariable=self.adaptive_max_fps_var, width=6).grid(row=0, column=3, padx=2)
+            
+            self.rate_status_label = ttk.Label(setting_frame, text="", font=('Arial', 8))
+            self.rate_status_label.pack(anchor=tk.W, pady=(2, 0))
+            self._update_adaptive_rate()
+            self._refresh_rate_status()
+        
         # 顯示選項設定
         display_frame = ttk.LabelFrame(self.parent_frame, text="總覽顯示選項", padding=5)
         display_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -228,6 +271,14 @@ class SettingsTab:
         
         # 綁定視窗大小變化事件
         self.parent_frame.bind('<Configure>', lambda e: update_layout())
+        
+        # OCR效能統計
+        if self.ocr_engine:
+            timing_frame = ttk.LabelFrame(self.parent_frame, text="OCR效能 (毫秒)", padding=5)
+            timing_frame.pack(fill=tk.X, padx=10, pady=5)
+            self.timing_label = ttk.Label(timing_frame, text="", font=('Courier', 8), justify=tk.LEFT)
+            self.timing_label.pack(anchor=tk.W)
+            self._refresh_timing_stats()
     
         return self.shared_window_widget
 
@@ -246,10 +297,61 @@ class SettingsTab:
         elif fps > 30.0:
             self.fps_var.set('30.0')
         self.capture_manager.set_capture_fps(fps)
+        if self.rate_scheduler:
+            self.rate_scheduler.set_base_fps(fps)
         interval = 1.0 / fps if fps >= 0.1 else 0.1
         self.fps_label.config(text=f"當前: {fps:.1f} FPS (間隔: {interval:.3f}秒)")
 
     
+    def _update_adaptive_rate(self, *args):
+        """套用自適應頻率設定到排程器"""
+        if not self.rate_scheduler or not self.adaptive_rate_var:
+            return
+        self.rate_scheduler.set_enabled(self.adaptive_rate_var.get())
+        try:
+            min_fps = float(self.adaptive_min_fps_var.get())
+            max_fps = float(self.adaptive_max_fps_var.get())
+        except ValueError:
+            return
+        self.rate_scheduler.set_bounds(min(30.0, min_fps), min(30.0, max_fps))
+
+    def _refresh_rate_status(self):
+        """定期更新目前的擷取與OCR頻率顯示"""
+        if not self.rate_status_label or not self.rate_scheduler:
+            return
+        status = self.rate_scheduler.get_status()
+        if status['enabled']:
+            text = (f"目前擷取: {status['capture_fps']:.1f} FPS / OCR: {status['ocr_fps']:.1f} FPS "
+                    f"(活動度: {status['activity'] * 100:.0f}%)")
+        else:
+            text = f"固定頻率: {status['capture_fps']:.1f} FPS"
+        self.rate_status_label.config(text=text)
+        self.parent_frame.after(1000, self._refresh_rate_status)
+
+    def _refresh_timing_stats(self):
+        """定期更新OCR各階段的 p50/p95/p99 延遲"""
+        if not self.timing_label or not self.ocr_engine:
+            return
+        stats = self.ocr_engine.get_timing_stats()
+        # 中文字寬不固定，階段名稱放在最後一欄以保持數字對齊
+        lines = [f"{'p50':>7}{'p95':>7}{'p99':>7}{'count':>7}  階段"]
+        for stage, label in STAGE_LABELS.items():
+            stage_stats = stats['stages'].get(stage)
+            if not stage_stats or not stage_stats['count']:
+                continue
+            lines.append(f"{stage_stats['p50_ms']:>7.1f}{stage_stats['p95_ms']:>7.1f}"
+                         f"{stage_stats['p99_ms']:>7.1f}{stage_stats['count']:>7}  {label}")
+        # 各分頁所有階段 p95 的總和，顯示最慢的分頁
+        tab_costs = {tab: sum(stage_stats['p95_ms'] for stage_stats in tab_stats.values())
+                     for tab, tab_stats in stats['tabs'].items()}
+        if tab_costs:
+            slowest = max(tab_costs, key=tab_costs.get)
+            lines.append(f"最慢分頁: {slowest} (p95 合計 {tab_costs[slowest]:.1f})")
+        if len(lines) == 1:
+            lines.append("尚無資料")
+        self.timing_label.config(text="\n".join(lines))
+        self.parent_frame.after(1000, self._refresh_timing_stats)
+
     def _update_transparency_label(self, *args):
         """更新透明度標籤"""
         if not self.transparency_label or not self.window_transparency_var:
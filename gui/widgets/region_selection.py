@@ -468,6 +468,9 @@ class RegionSelectionWidget:
                 else:
                     logger.warning(f"subprocess 獲取縮放因子失敗: {result.stderr}")
                     return 1.0
+            elif system == 'Linux':
+                # X11 視窗座標即為實際像素
+                return 1.0
             else:
                 try:
                     from Cocoa import NSScreen
@@ -5,6 +5,7 @@ Main Entry Point
 
 import sys
 import os
+import multiprocessing
 
 # 添加當前目錄到Python路徑
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -33,5 +34,6 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 打包後的執行檔啟動OCR子程序時需要
     check_and_update()  # 檢查更新
     main()
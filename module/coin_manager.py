@@ -41,8 +41,8 @@ class CoinManager:
         self.start_coin_value = None
         self.coin_history.clear()
 
-    def update(self, coin_value: str):
-        """更新楓幣值"""
+    def update(self, coin_value: str, timestamp: Optional[float] = None):
+        """更新楓幣值（timestamp 為畫面擷取時間，未指定時使用目前時間）"""
         # 檢查新的楓幣值是否有效
         value = self._parse_coin_value(coin_value)
         
@@ -56,7 +56,7 @@ class CoinManager:
         
         if self.timer.is_tracking and not self.timer.is_paused:
             # 使用計時器基準時間，而非直接使用 time.time()
-            current_effective_time = self._get_current_effective_time()
+            current_effective_time = self._get_current_effective_time(timestamp)
             
             # 使用最後有效的楓幣值進行計算
             calc_value = self._get_valid_coin_value()
@@ -73,11 +73,14 @@ class CoinManager:
                 if self.timer.start_time is None:
                     self.timer.start_time = current_effective_time
 
-    def _get_current_effective_time(self) -> float:
-        """獲取當前有效時間（基於計時器的時間基準）"""
+    def _get_current_effective_time(self, timestamp: Optional[float] = None) -> float:
+        """獲取當前有效時間（基於計時器的時間基準）；指定擷取時間時以該時間點換算"""
         if not self.timer.is_tracking or self.timer.start_time is None:
             return 0.0
         
+        if timestamp is not None:
+            return self.timer.get_effective_time_at(timestamp)
+        
         elapsed = self.timer.get_elapsed_time()
         if elapsed is None:
             return self.timer.start_time
@@ -49,8 +49,8 @@ class EXPManager:
         self.total_exp_percent = 0.0
         self.exp_history.clear()
 
-    def update(self, exp_text: str):
-        """更新經驗值"""
+    def update(self, exp_text: str, timestamp: Optional[float] = None):
+        """更新經驗值（timestamp 為畫面擷取時間，未指定時使用目前時間）"""
         # 檢查新的經驗值是否有效
         value, percent = self._parse_exp_value(exp_text)
         
@@ -64,7 +64,7 @@ class EXPManager:
         
         if self.timer.is_tracking and not self.timer.is_paused:
             # 使用計時器基準時間，而非直接使用 time.time()
-            current_effective_time = self._get_current_effective_time()
+            current_effective_time = self._get_current_effective_time(timestamp)
             
             # 使用最後有效的經驗值進行計算
             calc_value, calc_percent = self._get_valid_exp_values()
@@ -105,11 +105,14 @@ class EXPManager:
         # 檢查經驗值是否達到100%
         return last_exp[2] > 90 and percent < 10
 
-    def _get_current_effective_time(self) -> float:
-        """獲取當前有效時間（基於計時器的時間基準）"""
+    def _get_current_effective_time(self, timestamp: Optional[float] = None) -> float:
+        """獲取當前有效時間（基於計時器的時間基準）；指定擷取時間時以該時間點換算"""
         if not self.timer.is_tracking or self.timer.start_time is None:
             return 0.0
         
+        if timestamp is not None:
+            return self.timer.get_effective_time_at(timestamp)
+        
         elapsed = self.timer.get_elapsed_time()
         if elapsed is None:
             return self.timer.start_time
@@ -1,5 +1,5 @@
 import time
-from typing import Optional
+from typing import Optional, List, Tuple
 
 class MonitorTimer:
     """負責處理監控時間相關邏輯"""
@@ -10,6 +10,7 @@ class MonitorTimer:
         self.is_paused = False
         self.paused_time = 0  # 累計暫停的時間
         self.pause_start_time = None  # 暫停開始時間
+        self.pause_intervals: List[Tuple[float, float]] = []  # 已結束的暫停 (開始, 結束)
         self.last_update_time = None
 
     def start_tracking(self):
@@ -20,6 +21,7 @@ class MonitorTimer:
         self.is_paused = False
         self.paused_time = 0
         self.pause_start_time = None
+        self.pause_intervals = []
         self.last_update_time = current_time
 
     def pause_tracking(self):
@@ -33,7 +35,9 @@ class MonitorTimer:
         if self.is_tracking and self.is_paused:
             self.is_paused = False
             if self.pause_start_time is not None:
-                self.paused_time += time.time() - self.pause_start_time
+                current_time = time.time()
+                self.paused_time += current_time - self.pause_start_time
+                self.pause_intervals.append((self.pause_start_time, current_time))
                 self.pause_start_time = None
 
     def stop_tracking(self):
@@ -42,6 +46,7 @@ class MonitorTimer:
         self.is_paused = False
         self.paused_time = 0
         self.pause_start_time = None
+        self.pause_intervals = []
 
     def reset_tracking(self):
         """重置追蹤時間"""
@@ -50,6 +55,7 @@ class MonitorTimer:
         self.is_paused = False
         self.paused_time = 0
         self.pause_start_time = None
+        self.pause_intervals = []
         self.last_update_time = None
 
     def get_elapsed_time(self) -> Optional[float]:
@@ -92,3 +98,20 @@ class MonitorTimer:
         
         # 返回基於起始時間加上有效經過時間的時間點
         return self.start_time + elapsed
+
+    def get_effective_time_at(self, timestamp: float) -> Optional[float]:
+        """
+        將擷取時間 (time.time()) 換算為有效時間（扣除暫停時間）
+        
+        用於以畫面實際擷取的時間點記錄資料，而非OCR完成的時間點。
+        只扣除 timestamp 之前的暫停時間：在恢復前擷取、恢復後才完成OCR的畫面
+        不會扣除整段暫停，有效時間隨擷取時間單調遞增。
+        """
+        if not self.is_tracking or self.start_time is None:
+            return None
+        
+        total_paused = sum(max(0.0, min(end, timestamp) - start) for start, end in self.pause_intervals)
+        if self.is_paused and self.pause_start_time is not None:
+            total_paused += max(0.0, timestamp - self.pause_start_time)
+        
+        return max(self.start_time, timestamp - total_paused)
@@ -76,8 +76,8 @@ class PotionManager:
         except ValueError as e:
             logger.error(f"無效的藥水單價: {e}. 請確保輸入為有效的正整術。")
 
-    def update(self, potion_text: str):
-        """更新藥水數量"""
+    def update(self, potion_text: str, timestamp: Optional[float] = None):
+        """更新藥水數量（timestamp 為畫面擷取時間，未指定時使用目前時間）"""
         # 檢查新的藥水值是否有效
         self.value = self._parse_potion_value(potion_text)
         self.value = self._correct_value(self.value)  # 確保值在合理範圍內
@@ -89,7 +89,7 @@ class PotionManager:
         
         if self.timer.is_tracking and not self.timer.is_paused:
             # 使用計時器基準時間，而非直接使用 time.time()
-            current_effective_time = self._get_current_effective_time()
+            current_effective_time = self._get_current_effective_time(timestamp)
             
             # 使用最後有效的藥水值進行計算
             calc_value = self.last_valid_value
@@ -136,11 +136,14 @@ class PotionManager:
                     self.timer.start_time = current_effective_time
 
 
-    def _get_current_effective_time(self) -> float:
-        """獲取當前有效時間（基於計時器的時間基準）"""
+    def _get_current_effective_time(self, timestamp: Optional[float] = None) -> float:
+        """獲取當前有效時間（基於計時器的時間基準）；指定擷取時間時以該時間點換算"""
         if not self.timer.is_tracking or self.timer.start_time is None:
             return 0.0
         
+        if timestamp is not None:
+            return self.timer.get_effective_time_at(timestamp)
+        
         elapsed = self.timer.get_elapsed_time()
         if elapsed is None:
             return self.timer.start_time
@@ -4,5 +4,13 @@ OCR Package
 """
 
 from .ocr_engine import OCREngine
+from .change_detector import RegionChangeTracker
+from .glyph_recognizer import GlyphRecognizer
+from .result_cache import OCRResultCache
+from .worker_pool import OCRWorkerPool
+from .backend import OCRBackend, EasyOCRBackend, create_backend
+from .result_channel import ResultChannel
+from .region_trimmer import RegionTrimmer
 
-__all__ = ['OCREngine']
+__all__ = ['OCREngine', 'RegionChangeTracker', 'GlyphRecognizer', 'OCRResultCache', 'OCRWorkerPool',
+           'OCRBackend', 'EasyOCRBackend', 'create_backend', 'ResultChannel', 'RegionTrimmer']
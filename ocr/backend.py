@@ -0,0 +1,190 @@
+"""
+OCR Backend Module
+OCR後端介面：OCREngine 與子程序池只依賴此介面，實際推論可由 EasyOCR 或 ONNX Runtime 提供
+"""
+
+import importlib.util
+import warnings
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any, List, Tuple, Sequence
+import numpy as np
+
+from utils.log import get_logger
+from .projection import to_gray
+
+logger = get_logger(__name__)
+
+# 後端名稱
+BACKEND_EASYOCR = "easyocr"
+BACKEND_ONNX = "onnx"
+
+# 各後端需要的套件（用於在不載入模型的情況下檢查是否可用）
+BACKEND_MODULES = {
+    BACKEND_EASYOCR: "easyocr",
+    BACKEND_ONNX: "onnxruntime",
+}
+
+
+class OCRBackend(ABC):
+    """
+    OCR後端抽象基類
+
+    readtext() 與 recognize() 的參數與返回格式與 easyocr.Reader 相同，
+    結果為 [(bbox, text, confidence), ...]，bbox 為四個角點 [[x, y], ...]。
+    readtext() 等同於 detect_text() 後以其文字框呼叫 recognize()，分開呼叫時可分別計時。
+    """
+
+    name = ""
+
+    def __init__(self, languages: Sequence[str] = ("en",), gpu: bool = False):
+        """
+        Args:
+            languages: 辨識語言
+            gpu: 是否使用GPU
+        """
+        self.languages = tuple(languages)
+        self.gpu = gpu
+
+    @abstractmethod
+    def load(self) -> None:
+        """載入模型（耗時，應在背景執行緒或子程序中呼叫）"""
+        pass
+
+    @abstractmethod
+    def readtext(self, image, **kwargs) -> List[Any]:
+        """偵測並辨識影像中的所有文字"""
+        pass
+
+    @abstractmethod
+    def detect_text(self, image, **kwargs) -> Tuple[List[Any], List[Any]]:
+        """
+        只偵測文字框（含文字框合併）
+
+        Args:
+            image: 影像
+            kwargs: readtext() 的偵測參數（text_threshold、low_text、link_threshold、
+                    canvas_size、mag_ratio、height_ths、width_ths、ycenter_ths、add_margin 等）
+
+        Returns:
+            tuple: (horizontal_list, free_list)，可直接傳給 recognize()
+        """
+        pass
+
+    @abstractmethod
+    def recognize(self, image, horizontal_list=None, free_list=None, **kwargs) -> List[Any]:
+        """
+        略過文字偵測，直接辨識指定的文字框
+
+        Args:
+            image: 影像
+            horizontal_list: 水平文字框 [[x_min, x_max, y_min, y_max], ...]
+            free_list: 任意四邊形文字框 [[[x, y] * 4], ...]
+        """
+        pass
+
+    def recognize_batch(self, crops: Sequence[Any], allowlist: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        批次辨識已裁切好的單行文字影像
+
+        預設實作將所有影像堆疊在同一張畫布上，以一次 recognize() 呼叫辨識。
+
+        Args:
+            crops: 單行文字影像列表
+            allowlist: 允許的字元
+
+        Returns:
+            list: 與 crops 順序相同的 [(text, confidence), ...]，沒有結果的影像為 ("", 0.0)
+        """
+        if not crops:
+            return []
+        canvas, boxes = stack_crops(crops)
+        results = self.recognize(canvas, horizontal_list=boxes, free_list=[], allowlist=allowlist,
+                                 detail=1, paragraph=False, batch_size=len(boxes))
+        texts = [("", 0.0)] * len(crops)
+        for bbox, text, confidence in results:
+            center_y = sum(point[1] for point in bbox) / len(bbox)
+            for index, (_, _, y1, y2) in enumerate(boxes):
+                if y1 <= center_y < y2:
+                    texts[index] = (text, float(confidence))
+                    break
+        return texts
+
+
+class EasyOCRBackend(OCRBackend):
+    """以 easyocr.Reader 實作的後端（需要 torch）"""
+
+    name = BACKEND_EASYOCR
+
+    def __init__(self, languages: Sequence[str] = ("en",), gpu: bool = False):
+        super().__init__(languages, gpu)
+        self._reader = None
+
+    def load(self) -> None:
+        try:
+            import easyocr
+        except ImportError as e:
+            raise ImportError("未安裝easyocr。請執行: pip install easyocr") from e
+        warnings.filterwarnings("ignore", message="'pin_memory' argument is set as true but no accelerator is found")
+        self._reader = easyocr.Reader(list(self.languages), gpu=self.gpu, verbose=False)
+
+    def readtext(self, image, **kwargs) -> List[Any]:
+        return self._reader.readtext(image, **kwargs)
+
+    def detect_text(self, image, **kwargs) -> Tuple[List[Any], List[Any]]:
+        # easyocr 的 detect 以批次格式返回，取第一張影像
+        horizontal_list, free_list = self._reader.detect(image, **kwargs)
+        return horizontal_list[0], free_list[0]
+
+    def recognize(self, image, horizontal_list=None, free_list=None, **kwargs) -> List[Any]:
+        # easyocr 的 recognize 需要灰階影像（readtext 內部也是先轉灰階再辨識）
+        return self._reader.recognize(to_gray(image), horizontal_list=horizontal_list, free_list=free_list, **kwargs)
+
+
+def stack_crops(crops: Sequence[Any], gap: int = 4) -> Tuple[np.ndarray, List[List[int]]]:
+    """
+    將多張灰階影像垂直堆疊在同一張畫布上（之間保留間隔，避免文字框跨越兩張影像）
+
+    Returns:
+        tuple: (畫布, 各影像的文字框 [x_min, x_max, y_min, y_max])
+    """
+    grays = [to_gray(crop) for crop in crops]
+    width = max(gray.shape[1] for gray in grays)
+    height = sum(gray.shape[0] + gap for gray in grays)
+    canvas = np.zeros((height, width), dtype=np.uint8)
+    boxes = []
+    y = 0
+    for gray in grays:
+        h, w = gray.shape
+        canvas[y:y + h, :w] = gray
+        boxes.append([0, w, y, y + h])
+        y += h + gap
+    return canvas, boxes
+
+
+def is_backend_available(name: str) -> bool:
+    """檢查後端需要的套件是否已安裝（不載入套件）"""
+    module = BACKEND_MODULES.get(name)
+    return module is not None and importlib.util.find_spec(module) is not None
+
+
+def create_backend(name: str = BACKEND_EASYOCR, languages: Sequence[str] = ("en",), gpu: bool = False,
+                   options: Optional[Dict[str, Any]] = None) -> OCRBackend:
+    """
+    建立OCR後端（尚未載入模型）
+
+    Args:
+        name: 後端名稱（easyocr 或 onnx）
+        languages: 辨識語言
+        gpu: 是否使用GPU
+        options: 後端專用設定，例如 ONNX 的 {'model_dir': ..., 'quantized': True}
+
+    Returns:
+        OCRBackend: 後端實例
+    """
+    options = options or {}
+    if name == BACKEND_EASYOCR:
+        return EasyOCRBackend(languages, gpu)
+    if name == BACKEND_ONNX:
+        from .onnx_backend import ONNXBackend
+        return ONNXBackend(languages, gpu, **options)
+    raise ValueError(f"不支援的OCR後端: {name}")
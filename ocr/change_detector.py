@@ -0,0 +1,126 @@
+"""
+Region Change Detector Module
+區域變化偵測模組：像素未變化的區域跳過OCR
+"""
+
+import threading
+import time
+from typing import Optional, Dict, Any
+import numpy as np
+
+from utils.common import (
+    region_fingerprint, region_changed, CHANGE_PIXEL_THRESHOLD, CHANGE_MIN_PIXELS, CHANGE_MAX_SAMPLES
+)
+
+# 視為無效、不可重複使用的OCR結果
+INVALID_RESULTS = ("無法識別", "OCR錯誤", "OCR未初始化", "N/A", "")
+
+
+class RegionChangeTracker:
+    """
+    區域變化追蹤器
+
+    對每個分頁保留上次實際送去OCR的像素指紋（降採樣後的像素），
+    新圖像與該指紋比較，變化的像素數量未超過門檻時即可沿用上次的結果。
+    """
+
+    def __init__(self, pixel_threshold: int = CHANGE_PIXEL_THRESHOLD, min_changed_pixels: int = CHANGE_MIN_PIXELS,
+                 max_samples: int = CHANGE_MAX_SAMPLES, max_skip_seconds: float = 10.0):
+        """
+        Args:
+            pixel_threshold: 單一像素視為變化的最小差值 (0-255)
+            min_changed_pixels: 超過此變化像素數才視為區域已變化
+            max_samples: 指紋最多取樣的像素數，超過時以固定步長降採樣
+            max_skip_seconds: 連續跳過的最長時間，超過後強制重新OCR
+        """
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self.max_samples = max_samples
+        self.max_skip_seconds = max_skip_seconds
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[str, np.ndarray] = {}
+        self._last_results: Dict[str, str] = {}
+        self._last_processed_time: Dict[str, float] = {}
+        self._processed_count: Dict[str, int] = {}
+        self._skipped_count: Dict[str, int] = {}
+
+    def _fingerprint(self, image) -> np.ndarray:
+        """計算區域指紋（降採樣像素，保留所有通道）"""
+        return region_fingerprint(image, self.max_samples)
+
+    def _is_changed(self, old: np.ndarray, new: np.ndarray) -> bool:
+        """比較兩個指紋"""
+        return region_changed(old, new, self.pixel_threshold, self.min_changed_pixels)
+
+    def should_process(self, tab_name: str, image) -> bool:
+        """
+        檢查分頁是否需要重新OCR
+
+        Args:
+            tab_name: 分頁名稱
+            image: 目前的區域圖像
+
+        Returns:
+            bool: True 表示需要OCR，False 表示可沿用上次結果
+        """
+        if not self.enabled:
+            return True
+        fingerprint = self._fingerprint(image)
+        now = time.time()
+        with self._lock:
+            last_result = self._last_results.get(tab_name)
+            old = self._fingerprints.get(tab_name)
+            if (old is not None and
+                last_result not in INVALID_RESULTS and last_result is not None and
+                now - self._last_processed_time.get(tab_name, 0.0) < self.max_skip_seconds and
+                not self._is_changed(old, fingerprint)):
+                self._skipped_count[tab_name] = self._skipped_count.get(tab_name, 0) + 1
+                return False
+            self._fingerprints[tab_name] = fingerprint
+            self._last_processed_time[tab_name] = now
+            self._processed_count[tab_name] = self._processed_count.get(tab_name, 0) + 1
+            return True
+
+    def update_result(self, tab_name: str, result: str) -> None:
+        """記錄分頁最新的OCR結果"""
+        with self._lock:
+            self._last_results[tab_name] = result
+
+    def get_last_result(self, tab_name: str) -> Optional[str]:
+        """獲取分頁上次的OCR結果"""
+        with self._lock:
+            return self._last_results.get(tab_name)
+
+    def reset(self, tab_name: Optional[str] = None) -> None:
+        """清除指紋（強制下一次重新OCR）"""
+        with self._lock:
+            if tab_name is None:
+                self._fingerprints.clear()
+            else:
+                self._fingerprints.pop(tab_name, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取跳過率統計
+
+        Returns:
+            dict: {'total': {...}, 'tabs': {tab_name: {...}}}，
+                  每項包含 processed、skipped、skip_rate
+        """
+        def make_entry(processed: int, skipped: int) -> Dict[str, Any]:
+            total = processed + skipped
+            return {
+                'processed': processed,
+                'skipped': skipped,
+                'skip_rate': skipped / total if total else 0.0
+            }
+
+        with self._lock:
+            tab_names = set(self._processed_count) | set(self._skipped_count)
+            tabs = {
+                name: make_entry(self._processed_count.get(name, 0), self._skipped_count.get(name, 0))
+                for name in tab_names
+            }
+            total = make_entry(sum(self._processed_count.values()), sum(self._skipped_count.values()))
+        return {'total': total, 'tabs': tabs}
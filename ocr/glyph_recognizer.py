@@ -0,0 +1,254 @@
+"""
+Glyph Recognizer Module
+字形模板辨識模組：以遊戲固定點陣字型的字形圖集快速辨識數值，信心不足時才交給EasyOCR
+"""
+
+import threading
+from collections import Counter
+from typing import Optional, Dict, Any, List, Tuple
+import numpy as np
+import cv2
+
+from utils.log import get_logger
+from .projection import binarize_text
+
+logger = get_logger(__name__)
+
+# 正規化後的模板尺寸（高, 寬）
+TEMPLATE_SIZE = (20, 14)
+
+
+class GlyphRecognizer:
+    """
+    字形模板辨識器
+
+    遊戲中的數值（HP/MP、經驗值、金幣、藥水數量）都使用同一套點陣字型。
+    以連通元件切出每個字元，正規化為固定尺寸後與字形圖集做正規化相關比對。
+    圖集不需手動準備：EasyOCR 高信心的結果會被切割成字元並自動加入圖集。
+    比對對字元尺度敏感，學習與辨識必須使用相同前處理（裁切、縮放）的圖像。
+    """
+
+    def __init__(self, allow_list: str = "0123456789.[]/%", accept_score: float = 0.93,
+                 min_margin: float = 0.04, learn_confidence: float = 0.9,
+                 max_samples_per_char: int = 4):
+        """
+        Args:
+            allow_list: 可辨識的字元
+            accept_score: 每個字元的最低相似度，任一字元低於此值即視為辨識失敗
+            min_margin: 最佳字元與次佳字元的最小分數差，避免相似字形誤判
+            learn_confidence: EasyOCR 結果的信心高於此值才用於建立圖集
+            max_samples_per_char: 每個字元最多保留的模板數
+        """
+        self.allow_list = allow_list
+        self.accept_score = accept_score
+        self.min_margin = min_margin
+        self.learn_confidence = learn_confidence
+        self.max_samples_per_char = max_samples_per_char
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[Tuple[np.ndarray, float]]] = {}
+        # 堆疊後的圖集（學習時重建）：(模板矩陣, 長寬比, 各模板的字元, 字元清單, 各字元第一個模板的索引)
+        self._atlas: Optional[Tuple[np.ndarray, np.ndarray, List[str], List[str], np.ndarray]] = None
+        # 統計
+        self.hits = 0
+        self.misses = 0
+        self.learned = 0
+
+    def recognize(self, image) -> Optional[Tuple[str, float]]:
+        """
+        以字形圖集辨識區域圖像
+
+        Args:
+            image: 區域圖像（RGB、灰階或二值化影像）
+
+        Returns:
+            tuple: (文字, 信心)，圖集不足或任一字元信心不足時返回None
+        """
+        atlas = self._atlas
+        if not self.enabled or atlas is None:
+            return None
+        templates, aspects, _, char_list, char_starts = atlas
+        glyphs = self._segment(image)
+        if not glyphs:
+            self.misses += 1
+            return None
+
+        vectors, glyph_aspects = self._normalize(glyphs)
+        scores = (vectors @ templates.T) * self._aspect_penalty(glyph_aspects, aspects)
+        # 同一字元有多個模板時取最高分（模板依字元連續排列）
+        char_scores = np.maximum.reduceat(scores, char_starts, axis=1)
+
+        rows = np.arange(len(glyphs))
+        best = np.argmax(char_scores, axis=1)
+        best_scores = char_scores[rows, best]
+        if len(char_list) > 1:
+            char_scores[rows, best] = -1.0
+            second_scores = char_scores.max(axis=1)
+        else:
+            second_scores = np.zeros_like(best_scores)
+        if best_scores.min() < self.accept_score or (best_scores - second_scores).min() < self.min_margin:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return "".join(char_list[i] for i in best), float(best_scores.min())
+
+    def learn(self, image, text: str, confidence: float) -> bool:
+        """
+        以EasyOCR的辨識結果擴充字形圖集
+
+        Args:
+            image: 只包含該段文字的圖像
+            text: EasyOCR 辨識出的文字
+            confidence: EasyOCR 的信心
+
+        Returns:
+            bool: 是否加入了新的模板
+        """
+        if not self.enabled or confidence < self.learn_confidence:
+            return False
+        text = "".join(text.split())
+        if not text or any(char not in self.allow_list for char in text):
+            return False
+        glyphs = self._segment(image)
+        if len(glyphs) != len(text):
+            # 字元黏連或斷裂，無法一一對應
+            return False
+
+        vectors, glyph_aspects = self._normalize(glyphs)
+        atlas = self._atlas
+        if atlas is not None:
+            # 字元會被圖集辨識為其他字元時表示對應可能錯誤，整段不學習
+            templates, aspects, chars, _, _ = atlas
+            scores = (vectors @ templates.T) * self._aspect_penalty(glyph_aspects, aspects)
+            for char, row in zip(text, scores):
+                best = int(np.argmax(row))
+                own = max((score for other, score in zip(chars, row) if other == char), default=-1.0)
+                if chars[best] != char and row[best] >= self.accept_score and own < row[best]:
+                    logger.debug(f"字形 '{char}' 被辨識為 '{chars[best]}'，略過學習: {text}")
+                    return False
+
+        added = False
+        with self._lock:
+            for char, vector, aspect in zip(text, vectors, glyph_aspects):
+                samples = self._samples.setdefault(char, [])
+                if any(float(vector @ sample) > 0.97 for sample, _ in samples):
+                    continue  # 已有幾乎相同的模板
+                samples.append((vector, float(aspect)))
+                if len(samples) > self.max_samples_per_char:
+                    samples.pop(0)
+                added = True
+            if added:
+                self.learned += 1
+                self._rebuild_atlas()
+        return added
+
+    def reset(self) -> None:
+        """清除字形圖集"""
+        with self._lock:
+            self._samples.clear()
+            self._atlas = None
+
+    def get_known_chars(self) -> str:
+        """獲取圖集中已有模板的字元"""
+        with self._lock:
+            return "".join(sorted(self._samples))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取辨識統計"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'learned': self.learned,
+            'known_chars': self.get_known_chars()
+        }
+
+    def _rebuild_atlas(self) -> None:
+        """重建堆疊後的圖集（呼叫端需持有鎖）"""
+        vectors = []
+        aspects = []
+        chars = []
+        char_list = []
+        char_starts = []
+        for char, samples in self._samples.items():
+            char_list.append(char)
+            char_starts.append(len(chars))
+            for vector, aspect in samples:
+                vectors.append(vector)
+                aspects.append(aspect)
+                chars.append(char)
+        # 以單一參考賦值發佈，辨識端不需要持有鎖
+        self._atlas = (np.stack(vectors), np.array(aspects, dtype=np.float32), chars,
+                       char_list, np.array(char_starts, dtype=np.intp))
+
+    def _segment(self, image) -> List[np.ndarray]:
+        """
+        切割字元：以連通元件為單位，水平方向大幅重疊的元件（如 '%'）合併為同一字元。
+        斜線等字元與相鄰字元的投影重疊但像素不相連，因此不使用單純的垂直投影。
+
+        每個字元裁切成相對於基線的固定高度視窗（以最常見的字元高度為字身高度），
+        讓 '.'、'/' 等字元的垂直位置成為特徵，且不受同一行其他字元影響。
+        """
+        foreground = binarize_text(image)
+        if foreground is None or not foreground.any():
+            return []
+
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(foreground.astype(np.uint8), connectivity=8)
+        groups: List[List[int]] = []  # [x1, x2, y1, y2, 元件標籤...]
+        for label in sorted(range(1, count), key=lambda i: stats[i, cv2.CC_STAT_LEFT]):
+            x1 = int(stats[label, cv2.CC_STAT_LEFT])
+            x2 = x1 + int(stats[label, cv2.CC_STAT_WIDTH])
+            y1 = int(stats[label, cv2.CC_STAT_TOP])
+            y2 = y1 + int(stats[label, cv2.CC_STAT_HEIGHT])
+            if groups:
+                group = groups[-1]
+                overlap = min(group[1], x2) - max(group[0], x1)
+                if overlap * 2 >= min(group[1] - group[0], x2 - x1):
+                    group[:4] = [min(group[0], x1), max(group[1], x2), min(group[2], y1), max(group[3], y2)]
+                    group.append(label)
+                    continue
+            groups.append([x1, x2, y1, y2, label])
+
+        # 字身高度與基線取眾數（點陣字型的數字高度一致且佔多數）
+        body = Counter(group[3] - group[2] for group in groups).most_common(1)[0][0]
+        baseline = Counter(group[3] for group in groups).most_common(1)[0][0]
+        top = baseline - body
+        bottom = baseline + max(1, body * 3 // 10)
+
+        # 元件標籤 -> 字元序號（從1開始），背景為0
+        owners = np.zeros(count, dtype=np.int32)
+        for index, (_, _, _, _, *members) in enumerate(groups, 1):
+            owners[members] = index
+        padded_top = max(0, -top)
+        owner_rows = owners[labels[max(0, top):bottom]]
+
+        glyphs = []
+        for index, (x1, x2, _, _, *_) in enumerate(groups, 1):
+            window = np.zeros((bottom - top, x2 - x1), dtype=bool)
+            window[padded_top:padded_top + owner_rows.shape[0]] = owner_rows[:, x1:x2] == index
+            glyphs.append(window)
+        return glyphs
+
+    @staticmethod
+    def _normalize(glyphs: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """將字元縮放為固定尺寸、去除平均值的單位向量（內積即相關係數），並返回各字元的長寬比"""
+        height, width = TEMPLATE_SIZE
+        vectors = np.empty((len(glyphs), height * width), dtype=np.float32)
+        aspects = np.empty(len(glyphs), dtype=np.float32)
+        for i, glyph in enumerate(glyphs):
+            aspects[i] = glyph.shape[1] / glyph.shape[0]
+            vectors[i] = cv2.resize(glyph.view(np.uint8) * np.uint8(255), (width, height), interpolation=cv2.INTER_AREA).ravel()
+        vectors -= vectors.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors /= norms
+        return vectors, aspects
+
+    @staticmethod
+    def _aspect_penalty(glyph_aspects: np.ndarray, template_aspects: np.ndarray) -> np.ndarray:
+        """長寬比差異的懲罰係數（縮放後 '1' 與 '0' 等字元的外形會趨於相同）"""
+        a = glyph_aspects[:, np.newaxis]
+        b = template_aspects[np.newaxis, :]
+        return np.sqrt(np.minimum(a, b) / np.maximum(a, b))
@@ -0,0 +1,103 @@
+"""
+Image Packer Module
+圖像排列模組：以貨架式裝箱將多個區域排列在同一張畫布上，減少合併OCR時需要掃描的空白像素
+"""
+
+from typing import Optional, Dict, List, Tuple
+import numpy as np
+
+# (x1, y1, x2, y2)
+Box = Tuple[int, int, int, int]
+
+
+def _pack_with_width(items: List[Tuple[str, int, int]], bin_width: int, gutter_x: int,
+                     gutter_y: int) -> Tuple[int, int, Dict[str, Box]]:
+    """
+    以固定寬度進行 First-Fit Decreasing Height 貨架排列（items 已依高度遞減排序）
+
+    Returns:
+        tuple: (實際寬度, 高度, 各區域位置)
+    """
+    shelves: List[List[int]] = []  # [y, 高度, 已使用寬度]
+    positions: Dict[str, Box] = {}
+    for name, width, height in items:
+        for shelf in shelves:
+            x = shelf[2] + gutter_x
+            if height <= shelf[1] and x + width <= bin_width:
+                positions[name] = (x, shelf[0], x + width, shelf[0] + height)
+                shelf[2] = x + width
+                break
+        else:
+            y = shelves[-1][0] + shelves[-1][1] + gutter_y if shelves else 0
+            shelves.append([y, height, width])
+            positions[name] = (0, y, width, y + height)
+    used_width = max(shelf[2] for shelf in shelves)
+    used_height = shelves[-1][0] + shelves[-1][1]
+    return used_width, used_height, positions
+
+
+def pack_shelves(sizes: Dict[str, Tuple[int, int]], gutter_x: int = 16, gutter_y: int = 4,
+                 max_width: Optional[int] = None) -> Tuple[Tuple[int, int], Dict[str, Box]]:
+    """
+    計算面積最小的貨架排列
+
+    同一列的區域之間保留 gutter_x，避免文字偵測把相鄰區域的文字合併為同一個文字框；
+    列與列之間保留 gutter_y。依序嘗試每一種列寬（最寬區域到全部排成一列），取總面積最小者。
+
+    Args:
+        sizes: 各區域的尺寸 {name: (width, height)}
+        gutter_x: 同一列區域之間的水平間隔
+        gutter_y: 列之間的垂直間隔
+        max_width: 畫布寬度上限（None 表示不限制）
+
+    Returns:
+        tuple: ((畫布寬度, 畫布高度), {name: (x1, y1, x2, y2)})
+    """
+    if not sizes:
+        return (0, 0), {}
+    # 依高度遞減排序（同高時寬者優先，再依原始順序保持穩定）
+    order = {name: index for index, name in enumerate(sizes)}
+    items = sorted(((name, int(w), int(h)) for name, (w, h) in sizes.items()),
+                   key=lambda item: (-item[2], -item[1], order[item[0]]))
+
+    widest = max(width for _, width, _ in items)
+    single_row = sum(width for _, width, _ in items) + gutter_x * (len(items) - 1)
+    limit = single_row if max_width is None else max(widest, min(max_width, single_row))
+    candidates = {widest, limit}
+    # 列寬候選：依排序後的前綴寬度（每多放一個區域到第一列）
+    running = 0
+    for index, (_, width, _) in enumerate(items):
+        running += width + (gutter_x if index else 0)
+        if widest <= running <= limit:
+            candidates.add(running)
+
+    best = None
+    for bin_width in sorted(candidates):
+        used_width, used_height, positions = _pack_with_width(items, bin_width, gutter_x, gutter_y)
+        # 面積相同時取較接近正方形的排列
+        score = (used_width * used_height, abs(used_width - used_height))
+        if best is None or score < best[0]:
+            best = (score, (used_width, used_height), positions)
+    return best[1], best[2]
+
+
+def compose(images: Dict[str, np.ndarray], size: Tuple[int, int], positions: Dict[str, Box],
+            channels: int = 3) -> np.ndarray:
+    """
+    依排列結果將區域複製到黑色畫布上
+
+    Args:
+        images: 各區域圖像 {name: array}（通道數需與 channels 相同）
+        size: (畫布寬度, 畫布高度)
+        positions: pack_shelves() 返回的位置
+        channels: 畫布通道數
+
+    Returns:
+        np.ndarray: 畫布
+    """
+    width, height = size
+    shape = (height, width, channels) if channels > 1 else (height, width)
+    canvas = np.zeros(shape, dtype=np.uint8)
+    for name, (x1, y1, x2, y2) in positions.items():
+        canvas[y1:y2, x1:x2] = images[name]
+    return canvas
@@ -3,24 +3,92 @@ OCR Engine Module
 光學字符識別引擎模組
 """
 
-import os
-import warnings
 import threading
 import time
-from typing import Optional, Dict, List, Callable, Tuple
+from concurrent.futures import wait, ThreadPoolExecutor
+from typing import Optional, Dict, List, Set, Callable, Tuple, Union, Any
 from PIL import Image
 import numpy as np
 import cv2
 from utils.log import get_logger
+from utils.common import StageTimings
+from utils.debug_sink import DebugImageSink, DEBUG_STAGE_RAW, DEBUG_STAGE_PREPROCESSED
+from capture.frame_buffer import FrameInfo
+from .change_detector import RegionChangeTracker
+from .glyph_recognizer import GlyphRecognizer
+from .result_cache import OCRResultCache
+from .worker_pool import OCRWorkerPool
+from .backend import create_backend, is_backend_available, BACKEND_EASYOCR
+from .projection import to_gray, find_text_lines
+from .image_packer import pack_shelves, compose
+from .result_channel import ResultChannel
+from .region_trimmer import RegionTrimmer
 
 logger = get_logger(__name__)
 
+# 區域圖像可以是PIL圖像或NumPy RGB陣列（捕捉引擎提供的唯讀區域圖像）
+ImageLike = Union[Image.Image, np.ndarray]
+
+# 合併圖像OCR的文字框水平合併門檻（EasyOCR width_ths）
+MERGED_WIDTH_THS = 0.7
+
+# 單一圖像OCR（含文字偵測）的 readtext 參數
+SINGLE_READTEXT_OPTIONS = {
+    'paragraph': False,
+    'text_threshold': 0.6, 'link_threshold': 0.5,
+    'low_text': 0.45, 'height_ths': 0.7
+}
+
+# readtext 參數中屬於文字偵測（detect_text）的部分，其餘傳給 recognize
+DETECT_OPTIONS = (
+    'text_threshold', 'low_text', 'link_threshold', 'canvas_size', 'mag_ratio',
+    'slope_ths', 'ycenter_ths', 'height_ths', 'width_ths', 'add_margin'
+)
+
+# 計時階段
+STAGE_TOTAL = "total"                # 一次 process_images 的總耗時
+STAGE_CHANGE = "change_check"        # 區域變化偵測
+STAGE_GLYPH = "glyph"                # 字形模板快速路徑
+STAGE_PREPROCESS = "preprocess"      # 區域裁切、藥水預處理、文字行切割
+STAGE_MERGE = "merge"                # 合併為單張畫布
+STAGE_DETECTION = "detection"        # detect_text（文字偵測）
+STAGE_RECOGNITION = "recognition"    # recognize（文字辨識）
+STAGE_FALLBACK = "fallback"          # 無法識別時的單獨處理
+STAGE_CALLBACK = "callback"          # 結果回調
+
+# 各階段的顯示名稱（依處理順序）
+STAGE_LABELS = {
+    STAGE_CHANGE: "變化偵測",
+    STAGE_GLYPH: "字形比對",
+    STAGE_PREPROCESS: "預處理",
+    STAGE_MERGE: "合併",
+    STAGE_DETECTION: "偵測",
+    STAGE_RECOGNITION: "辨識",
+    STAGE_FALLBACK: "單獨重試",
+    STAGE_CALLBACK: "結果回調",
+    STAGE_TOTAL: "總計",
+}
+
+
 class OCREngine:
     """OCR處理引擎"""
     
-    def __init__(self, root, allow_list: str = "0123456789.[]/%"):
+    def __init__(self, root, allow_list: str = "0123456789.[]/%", worker_count: int = 0):
+        """
+        Args:
+            root: Tk 根視窗
+            allow_list: 允許的字符列表
+            worker_count: OCR子程序數量，0 表示在本程序的執行緒中執行OCR
+        """
         self.root = root
         self.allow_list = allow_list
+        self.worker_count = worker_count
+        # OCR後端（easyocr 或 onnx）與後端專用設定
+        self.backend_name = BACKEND_EASYOCR
+        self.backend_options: Dict[str, Any] = {}
+        self.worker_pool = None
+        # 有多個子程序時，藥水批次在此執行緒中送出，與狀態區域的辨識同時在不同子程序處理
+        self._dispatch_executor: Optional[ThreadPoolExecutor] = None
         self.ocr_reader = None
         self.is_initialized = False
         self.is_running = False
@@ -29,8 +97,37 @@ class OCREngine:
         self.ocr_interval = 0.1  # OCR處理最小間隔（秒）
         self.tabs_order = None
         
-        # 回調函數：當OCR結果更新時調用
-        self.result_callback: Optional[Callable[[str, str], None]] = None
+        # 區域變化追蹤：像素未變化的分頁沿用上次結果
+        self.change_tracker = RegionChangeTracker()
+        # 各分頁最後處理過的幀序號（避免重複處理同一幀）
+        self.last_frame_ids: Dict[str, int] = {}
+        # 字形模板快速路徑：信心足夠時不呼叫EasyOCR（藥水使用預處理後的二值影像，另建圖集）
+        self.glyph_recognizer = GlyphRecognizer(allow_list)
+        self.potion_glyph_recognizer = GlyphRecognizer("0123456789")
+        # 相同像素（量化後）的EasyOCR結果快取
+        self.result_cache = OCRResultCache()
+        # 區域已由使用者框選，略過CRAFT文字偵測直接辨識文字行
+        self.detection_free = True
+        # 以投影輪廓裁掉區域中的空白背景並縮小過高的文字（送入神經網路前）
+        self.region_trimmer = RegionTrimmer()
+        # 合併圖像中區域之間的最小間隔（像素）
+        self.merge_gutter = 4
+        # 後備辨識必須在每次處理開始後此秒數內完成，超過時該分頁沿用上次的結果
+        self.fallback_deadline = 0.5
+        # 本程序後備辨識的耗時估計（秒）與子程序中逾時仍在執行的後備任務 {tab_name: (Future, 圖像, 快取鍵)}
+        self._fallback_cost = 0.0
+        self._fallback_stragglers: Dict[str, Tuple[Any, np.ndarray, bytes]] = {}
+        # 上次 process_images 中後備辨識逾時、沒有結果的分頁（呼叫端不應記為已處理）
+        self.deferred_tabs: Set[str] = set()
+        # 各階段與各分頁的滾動延遲統計（p50/p95/p99）
+        self.timings = StageTimings()
+        # 除錯圖像輸出（背景寫出，預設停用）
+        self.debug_sink = DebugImageSink()
+        
+        # 回調函數：當OCR結果更新時調用，參數為 (tab_name, result, frame_info)
+        self.result_callback: Optional[Callable[[str, str, Optional[FrameInfo]], None]] = None
+        # 結果通道：OCR執行緒放入結果，由主執行緒批次取出
+        self.result_channel: Optional[ResultChannel] = None
     
     def initialize(self, tabs_order: Optional[List[str]] = None) -> None:
         """初始化OCR引擎（異步）"""
@@ -40,99 +137,250 @@ class OCREngine:
         def init_thread():
             try:
                 self.tabs_order = tabs_order
-                import easyocr
-                warnings.filterwarnings("ignore", message="'pin_memory' argument is set as true but no accelerator is found")
-                logger.info("正在初始化OCR引擎...")
-                self.ocr_reader = easyocr.Reader(['en'], gpu=False)
+                if self.worker_count > 0 and self._start_worker_pool():
+                    return
+                logger.info(f"正在初始化OCR引擎（{self.backend_name}）...")
+                backend = create_backend(self.backend_name, ['en'], gpu=False, options=self.backend_options)
+                backend.load()
+                self.ocr_reader = backend
                 self.is_initialized = True
                 logger.info("OCR引擎初始化完成")
                 self.is_running = True
-            except ImportError:
-                logger.error("錯誤: 未安裝easyocr。請執行: pip install easyocr")
+            except ImportError as e:
+                logger.error(f"錯誤: {e}")
             except Exception as e:
                 logger.error(f"OCR引擎初始化失敗: {e}")
         
         threading.Thread(target=init_thread, daemon=True).start()
     
-    def set_result_callback(self, callback: Callable[[str, str], None]) -> None:
+    def _start_worker_pool(self) -> bool:
+        """
+        啟動OCR子程序池並以其取代本程序的reader
+        
+        Returns:
+            bool: 是否成功，失敗時由呼叫端改用本程序內的OCR
+        """
+        if not is_backend_available(self.backend_name):
+            return False  # 交由本程序初始化流程回報未安裝
+        logger.info(f"正在啟動 {self.worker_count} 個OCR子程序（{self.backend_name}）...")
+        pool = OCRWorkerPool(self.worker_count, ['en'], gpu=False,
+                             backend=self.backend_name, backend_options=self.backend_options)
+        pool.start()
+        if not pool.wait_ready(timeout=300):
+            pool.stop()
+            logger.warning("OCR子程序啟動失敗，改用程序內OCR")
+            return False
+        self.worker_pool = pool
+        self.ocr_reader = pool
+        self.is_initialized = True
+        self.is_running = True
+        logger.info("OCR引擎初始化完成（子程序模式）")
+        return True
+    
+    def shutdown(self) -> None:
+        """釋放OCR資源（停止子程序）"""
+        self.is_running = False
+        if self.result_channel is not None:
+            self.result_channel.stop()
+        self.debug_sink.stop()
+        if self._dispatch_executor is not None:
+            self._dispatch_executor.shutdown(wait=False)
+            self._dispatch_executor = None
+        if self.worker_pool is not None:
+            self.worker_pool.stop()
+            self.worker_pool = None
+            self.ocr_reader = None
+            self.is_initialized = False
+    
+    def set_result_callback(self, callback: Callable[[str, str, Optional[FrameInfo]], None]) -> None:
         """
         設定結果回調函數
         
         Args:
-            callback: 回調函數，參數為(tab_name, result)
+            callback: 回調函數，參數為(tab_name, result, frame_info)，
+                      frame_info 為結果所屬幀的資訊（未知時為None）。
+                      有 Tk 根視窗時經由結果通道在主執行緒中呼叫，同一分頁在一個批次內只回調最新的結果
         """
-        self.result_callback = lambda tab_name, result: self.root.after(0, callback(tab_name, result))
+        if self.result_channel is not None:
+            self.result_channel.stop()
+            self.result_channel = None
+        if self.root is None:
+            self.result_callback = callback
+            return
+        self.result_channel = ResultChannel(self.root, callback)
+        self.result_channel.start()
+        self.result_callback = self.result_channel.push
+    
+    def _emit_result(self, tab_name: str, result: str, frame_info: Optional[FrameInfo] = None) -> None:
+        """記錄並發送單一分頁的OCR結果"""
+        self.change_tracker.update_result(tab_name, result)
+        if self.result_callback:
+            with self.timings.measure(STAGE_CALLBACK, tab_name):
+                self.result_callback(tab_name, result, frame_info)
+    
+    def get_change_stats(self) -> Dict[str, Any]:
+        """獲取區域變化偵測的跳過率統計"""
+        return self.change_tracker.get_stats()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """獲取OCR結果快取的命中率統計"""
+        return self.result_cache.get_stats()
+    
+    def get_worker_stats(self) -> Optional[Dict[str, Any]]:
+        """獲取OCR子程序池統計（未使用子程序時為None）"""
+        return self.worker_pool.get_stats() if self.worker_pool is not None else None
+    
+    def get_channel_stats(self) -> Optional[Dict[str, Any]]:
+        """獲取結果通道統計（未使用通道時為None）"""
+        return self.result_channel.get_stats() if self.result_channel is not None else None
     
+    def get_trim_stats(self) -> Dict[str, Any]:
+        """獲取區域裁切統計"""
+        return self.region_trimmer.get_stats()
     
-    def process_images(self, images_dict: Dict[str, Image.Image]) -> None:
+    def get_timing_stats(self) -> Dict[str, Any]:
+        """
+        獲取各階段的延遲統計
+        
+        Returns:
+            dict: {'stages': {stage: stats}, 'tabs': {tab_name: {stage: stats}}}，
+                  stats 為 {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}
+        """
+        return self.timings.get_stats()
+    
+    def get_glyph_stats(self) -> Dict[str, Any]:
+        """獲取字形模板快速路徑的命中率統計"""
+        return {
+            'status': self.glyph_recognizer.get_stats(),
+            'potion': self.potion_glyph_recognizer.get_stats()
+        }
+    
+    def process_images(self, images_dict: Dict[str, ImageLike],
+                       frame_infos: Optional[Dict[str, FrameInfo]] = None) -> bool:
         """
         處理多個圖像的OCR - 合併圖像後進行單次OCR
         
         Args:
             images_dict: 圖像字典 {tab_name: image}
+            frame_infos: 各圖像所屬幀的資訊 {tab_name: FrameInfo}，
+                         已處理過的幀會被略過，結果會附帶幀資訊
+        
+        Returns:
+            bool: 是否處理了這些圖像（引擎未就緒或距上次處理未滿 ocr_interval 時為False）；
+                  為True時，後備辨識逾時而沒有結果的分頁記錄在 deferred_tabs，下次應立即重試
         """
+        frame_infos = frame_infos or {}
         # logger.debug(f"[OCR DEBUG] process_images called, images: {list(images_dict.keys())}")  # <--- debug
         logger.debug(f"[OCR DEBUG] process_images called, images: {list(images_dict.keys())}")  # <--- debug
         if not self.is_initialized or not self.ocr_reader:
-            return
+            return False
         
         current_time = time.time()
         if current_time - self.last_ocr_time < self.ocr_interval:
-            return
+            return False
 
+        self.deferred_tabs = set()
         try:
+            started = time.perf_counter()
             # 過濾有效圖像
             potion_images = {}
             status_images = {}
             for name, img in images_dict.items():
-                if isinstance(img, Image.Image):
+                if isinstance(img, (Image.Image, np.ndarray)):
+                    frame_info = frame_infos.get(name)
+                    if frame_info is not None:
+                        # 同一幀已處理過，略過
+                        if self.last_frame_ids.get(name) == frame_info.frame_id:
+                            continue
+                        self.last_frame_ids[name] = frame_info.frame_id
+                    frame_id = frame_info.frame_id if frame_info is not None else None
+                    self.debug_sink.submit(name, DEBUG_STAGE_RAW, img, frame_id)
+                    # 像素未變化的分頁沿用上次結果，不送OCR
+                    with self.timings.measure(STAGE_CHANGE, name):
+                        changed = self.change_tracker.should_process(name, img)
+                    if not changed:
+                        if self.result_callback:
+                            with self.timings.measure(STAGE_CALLBACK, name):
+                                self.result_callback(name, self.change_tracker.get_last_result(name), frame_info)
+                        continue
                     if '藥水' in name:
                         potion_images[name] = img
-                    else:
-                        status_images[name] = img
+                        continue
+                    with self.timings.measure(STAGE_PREPROCESS, name):
+                        trimmed = self.region_trimmer.trim(name, img)
+                    self.debug_sink.submit(name, DEBUG_STAGE_PREPROCESSED, trimmed, frame_id)
+                    # 字形圖集可辨識時直接使用，不送EasyOCR
+                    # 圖集由OCR輸入（裁切後的圖像）學習，辨識時必須使用相同的裁切圖像，尺度才一致
+                    with self.timings.measure(STAGE_GLYPH, name):
+                        fast_result = self.glyph_recognizer.recognize(trimmed)
+                    if fast_result is not None:
+                        self._emit_result(name, fast_result[0], frame_info)
+                        continue
+                    status_images[name] = trimmed
             if not status_images and not potion_images:
-                return
+                return True
             
             # 處理藥水圖像
-            for tab_name, image in potion_images.items():
-                # Image.Image.save(image, f"tmp/{tab_name}.png")  # 保存圖像以便調試
-                # new_image = Image.open(f"tmp/{tab_name}.png")
-                result = self._process_potion_image(image, tab_name)
-                if self.result_callback:
-                    self.result_callback(tab_name, result)
+            # 所有藥水格合併為單次OCR；有多個子程序時與狀態區域同時處理
+            potion_future = None
+            if potion_images:
+                executor = self._get_dispatch_executor() if status_images else None
+                if executor is not None:
+                    potion_future = executor.submit(self._process_potion_images, potion_images, frame_infos)
+                else:
+                    potion_results = self._process_potion_images(potion_images, frame_infos)
+                    for tab_name, result in potion_results.items():
+                        self._emit_result(tab_name, result, frame_infos.get(tab_name))
             
-
-
-            if len(status_images) == 1:
+            if status_images and self.detection_free:
+                # 略過文字偵測：所有區域的文字行一次送入辨識器
+                direct_results = self._recognize_regions(status_images)
+                # 信心不足的分頁改用含文字偵測的辨識（整批合併為一次偵測）
+                self._apply_fallback(direct_results, status_images, allow_merge=True, cycle_started=started)
+                for tab_name, result in direct_results.items():
+                    if result is not None:
+                        self._emit_result(tab_name, result, frame_infos.get(tab_name))
+            elif len(status_images) == 1:
                 # 單個圖像直接處理
                 tab_name, image = next(iter(status_images.items()))
                 result = self._process_single_image(image)
-                if self.result_callback:
-                    self.result_callback(tab_name, result)
-            else:
+                self._emit_result(tab_name, result, frame_infos.get(tab_name))
+            elif status_images:
                 # 多個圖像合併處理
-                merged_image, tab_positions = self._merge_images(status_images)
+                with self.timings.measure(STAGE_MERGE):
+                    merged_image, tab_positions = self._merge_images(status_images)
                 merged_results = self._process_merged_image(merged_image, tab_positions)
+                # 合併辨識失敗的分頁單獨處理（合併圖像已含文字偵測，不再合併）
+                self._apply_fallback(merged_results, status_images, allow_merge=False, cycle_started=started)
                 
                 # 分配結果給各個標籤
                 for tab_name, result in merged_results.items():
-                    # 如果結果為"無法識別"，則嘗試單獨處理該圖像
-                    if result == "無法識別":
-                        result = self._process_single_image(status_images[tab_name])
-                    
-                    if self.result_callback:
-                        self.result_callback(tab_name, result)
-                    
+                    if result is not None:
+                        self._emit_result(tab_name, result, frame_infos.get(tab_name))
+            
+            if potion_future is not None:
+                for tab_name, result in potion_future.result().items():
+                    self._emit_result(tab_name, result, frame_infos.get(tab_name))
             
+            self.timings.record(STAGE_TOTAL, time.perf_counter() - started)
             self.last_ocr_time = current_time
+            return True
             
         except Exception as e:
             logger.debug(f"批量OCR處理錯誤: {e}")
-            
+            return False
+
+    def _get_dispatch_executor(self) -> Optional[ThreadPoolExecutor]:
+        """有多個OCR子程序時返回同時送出任務用的執行緒池，否則返回None（依序處理）"""
+        if self.worker_pool is None or self.worker_pool.num_workers < 2:
+            return None
+        if self._dispatch_executor is None:
+            self._dispatch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="OCRDispatch")
+        return self._dispatch_executor
 
     def _potions_preprocess_image(self, image):
         try:
-            img = np.array(image)
+            img = np.asarray(image)
             scale = max(min(80 / img.shape[0], 1), 3)
             img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
 
@@ -148,13 +396,9 @@ class OCREngine:
             # 建立遮罩：彩度超過門檻的位置
             mask1 = saturation > threshold
 
-            # 將彩度高的像素設為黑色 (0,0,0)
-            output = img.copy()
-            output[mask1] = [0, 0, 0]
-            
-            
-            # 建立遮罩（需比原圖大2）
-            output = cv2.cvtColor(output, cv2.COLOR_BGR2GRAY)
+            # 將彩度高的像素設為黑色（灰階轉換逐像素進行，先轉灰階再遮罩結果相同，且只需處理單通道）
+            output = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            output[mask1] = 0
             
             #進行自適應閾值處理
             output = cv2.adaptiveThreshold(output, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
@@ -164,45 +408,30 @@ class OCREngine:
             kernel = np.ones((3, 3), np.uint8) if min(img.shape[0], img.shape[1]) > 100 else np.ones((2, 2), np.uint8)
             output = cv2.morphologyEx(output, cv2.MORPH_CLOSE, np.ones((3, 3), np.uint8), iterations=iterations)
                 
-            h, w = output.shape
-            mask = np.zeros((h + 2, w + 2), np.uint8)
-
-            # 複製原圖作為填色目標
-            floodfilled = output.copy()
-
-            # 對四個邊緣進行 floodFill，尋找相連的黑色 (0)
-            threshold = 255
-            to = 0
-            for x in range(w):
-                if floodfilled[0, x] == threshold:
-                    cv2.floodFill(floodfilled, mask, (x, 0), to)
-                if floodfilled[h - 1, x] == threshold:
-                    cv2.floodFill(floodfilled, mask, (x, h - 1), to)
-            for y in range(h):
-                if floodfilled[y, 0] == threshold:
-                    cv2.floodFill(floodfilled, mask, (0, y), to)
-                if floodfilled[y, w - 1] == threshold:
-                    cv2.floodFill(floodfilled, mask, (w - 1, y), to)
-
-            # floodfilled 中原本與邊界連通的黑色已變為白色 (255)
-            # 其餘區域保留原樣
-            output = floodfilled
+            # 移除與邊界連通的白色區域（等同從每個邊緣白色像素 floodFill 為黑色）：
+            # 一次4連通標記，邊緣上出現的標籤以查表清除
+            num_labels, labels = cv2.connectedComponents(output, connectivity=4)
+            border_labels = np.concatenate((labels[0], labels[-1], labels[:, 0], labels[:, -1]))
+            remove = np.zeros(num_labels, dtype=bool)
+            remove[border_labels] = True
+            remove[0] = False  # 背景（黑色）不變
+            output[remove[labels]] = 0
 
             kernel = np.ones((4, 4), np.uint8) if min(img.shape[0], img.shape[1]) > 100 else np.ones((2, 2), np.uint8)
             output = cv2.morphologyEx(output, cv2.MORPH_OPEN, kernel, iterations=1)
 
             num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(output, connectivity=8)
 
+            areas = stats[:, cv2.CC_STAT_AREA]
             if num_labels > 5:
-                min_area = max(sorted(stats[1:, cv2.CC_STAT_AREA])[-4], img.shape[0] * img.shape[1] * 0.01)
+                min_area = max(np.sort(areas[1:])[-4], img.shape[0] * img.shape[1] * 0.01)
             else:
                 min_area = img.shape[0] * img.shape[1] * 0.01
 
-            
-            for i in range(1, num_labels):
-                if stats[i, cv2.CC_STAT_AREA] < min_area:
-                    output[labels == i] = 0
-
+            # 面積過小的元件以查表一次清除
+            keep = areas >= min_area
+            keep[0] = False
+            output[~keep[labels]] = 0
             
         except Exception as e:
             logger.debug(f"圖像預處理錯誤: {e}")
@@ -247,43 +476,126 @@ class OCREngine:
         
         return best_result if best_result else (None, "無法識別", 0.0)
 
-    def _process_potion_image(self, image: Image.Image, name) -> str:
+    def _process_potion_image(self, image: ImageLike, name) -> str:
         """
-        處理藥水圖像的OCR
+        處理單一藥水圖像的OCR
         
         Args:
             image: 要處理的圖像
+            name: 藥水分頁名稱
         
         Returns:
             str: OCR識別結果
         """
+        return self._process_potion_images({name: image})[name]
+    
+    def _readtext(self, image: np.ndarray, **options) -> List[Any]:
+        """
+        與 readtext 相同，但分開呼叫 detect_text 與 recognize，讓兩個階段分別計時
+
+        Args:
+            image: 影像
+            options: readtext 參數（偵測參數見 DETECT_OPTIONS）
+
+        Returns:
+            list: [(bbox, text, confidence), ...]
+        """
+        detect_options = {key: options.pop(key) for key in DETECT_OPTIONS if key in options}
+        with self.timings.measure(STAGE_DETECTION):
+            horizontal_list, free_list = self.ocr_reader.detect_text(image, **detect_options)
+        if not horizontal_list and not free_list:
+            return []
+        with self.timings.measure(STAGE_RECOGNITION):
+            return self.ocr_reader.recognize(image, horizontal_list=horizontal_list, free_list=free_list, **options)
+    
+    def _process_potion_images(self, images_dict: Dict[str, ImageLike],
+                               frame_infos: Optional[Dict[str, FrameInfo]] = None) -> Dict[str, str]:
+        """
+        批次處理藥水圖像的OCR：快取與字形圖集無法辨識的藥水格，
+        預處理後垂直排列在同一張畫布上以單次OCR辨識，再依文字框座標分配回各藥水格
+        
+        Args:
+            images_dict: 藥水圖像字典 {tab_name: image}
+            frame_infos: 各圖像所屬幀的資訊（除錯圖像的檔名使用幀序號）
+        
+        Returns:
+            Dict[str, str]: 各藥水分頁的OCR結果
+        """
+        results = {}
         try:
             if not self.ocr_reader:
-                return "OCR未初始化"
-            # 將PIL圖像轉換為numpy數組
-            # 確保tmp目錄存在
-            if os.path.exists("tmp"):
-                Image.Image.save(image, f"tmp/{name}.png")  # 保存圖像以便調試
-            image = self._potions_preprocess_image(image)
-            result = self.ocr_reader.readtext(
-                image,
+                return {name: "OCR未初始化" for name in images_dict}
+            
+            pending = {}  # tab_name -> (預處理後的圖像, 快取鍵)
+            frame_infos = frame_infos or {}
+            for name, image in images_dict.items():
+                with self.timings.measure(STAGE_PREPROCESS, name):
+                    processed = to_gray(self._potions_preprocess_image(image))
+                frame_info = frame_infos.get(name)
+                self.debug_sink.submit(name, DEBUG_STAGE_PREPROCESSED, processed,
+                                       frame_info.frame_id if frame_info is not None else None)
+                cache_key = self.result_cache.make_key(processed, 'potion', '0123456789')
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    results[name] = cached[0]
+                    continue
+                with self.timings.measure(STAGE_GLYPH, name):
+                    fast_result = self.potion_glyph_recognizer.recognize(processed)
+                if fast_result is not None:
+                    results[name] = fast_result[0]
+                    continue
+                pending[name] = (processed, cache_key)
+            if not pending:
+                return results
+            
+            # 各藥水格之間留白，避免文字框跨越兩格
+            with self.timings.measure(STAGE_MERGE):
+                gap = 16
+                width = max(processed.shape[1] for processed, _ in pending.values())
+                height = sum(processed.shape[0] + gap for processed, _ in pending.values())
+                canvas = np.zeros((height, width), dtype=np.uint8)
+                slot_offsets = {}
+                y = 0
+                for name, (processed, _) in pending.items():
+                    h, w = processed.shape
+                    canvas[y:y + h, :w] = processed
+                    slot_offsets[name] = (y, y + h)
+                    y += h + gap
+            
+            ocr_results = self._readtext(
+                canvas,
                 allowlist='0123456789',
                 paragraph=False,
                 text_threshold=0.6, link_threshold=0.5,
                 low_text=0.45, height_ths=0.7,
                 detail=1
             )
-            bbox, text, confidence = self._potions_postprocess_result(result)
-
-            return text
+            
+            # 依文字框中心分配回各藥水格，並轉換為藥水格內的座標
+            slot_results = {name: [] for name in pending}
+            for bbox, text, confidence in ocr_results:
+                center_y = sum(point[1] for point in bbox) / len(bbox)
+                for name, (y1, y2) in slot_offsets.items():
+                    if y1 <= center_y < y2:
+                        local_bbox = [[point[0], point[1] - y1] for point in bbox]
+                        slot_results[name].append((local_bbox, text, confidence))
+                        break
+            
+            for name, (processed, cache_key) in pending.items():
+                bbox, text, confidence = self._potions_postprocess_result(slot_results[name])
+                if bbox is not None:
+                    self.potion_glyph_recognizer.learn(self._crop_bbox(processed, bbox), text, confidence)
+                self.result_cache.put(cache_key, (text, confidence))
+                results[name] = text
+            return results
 
         except Exception as e:
             logger.debug(f"藥水圖像OCR處理錯誤: {e}")
             import traceback
             traceback.print_exc()
-            return "OCR錯誤"
+            return {name: results.get(name, "OCR錯誤") for name in images_dict}
     
-    def _process_single_image(self, image: Image.Image) -> str:
+    def _process_single_image(self, image: ImageLike) -> str:
         """
         處理單個圖像的OCR
         
@@ -297,33 +609,14 @@ class OCREngine:
             if not self.ocr_reader:
                 return "OCR未初始化"
 
-            # 將PIL圖像轉換為numpy數組
-            import numpy as np
-            img_array = np.array(image)
-
-            # 若圖片為單通道，轉成3通道
-            if len(img_array.shape) == 2:
-                img_array = np.stack([img_array]*3, axis=-1)
+            img_array, cache_key = self._prepare_single_image(image)
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached[0]
 
             # 使用EasyOCR進行識別
-            results = self.ocr_reader.readtext(
-                img_array,
-                allowlist=self.allow_list,
-                paragraph=False,
-                text_threshold=0.6, link_threshold=0.5,
-                low_text=0.45, height_ths=0.7
-            )
-
-            # 提取識別的文本
-            if results:
-                results.sort(key=lambda x: x[2], reverse=True)
-                best_result = results[0]
-                text = best_result[1].strip()
-                confidence = best_result[2]
-                if confidence > 0.5:
-                    return text
-
-            return "無法識別"
+            results = self._readtext(img_array, allowlist=self.allow_list, **SINGLE_READTEXT_OPTIONS)
+            return self._parse_single_results(img_array, cache_key, results)
 
         except Exception as e:
             logger.debug(f"單個圖像OCR處理錯誤: {e}")
@@ -331,57 +624,268 @@ class OCREngine:
             traceback.print_exc()
             return "OCR錯誤"
     
-    def _merge_images(self, images_dict: Dict[str, Image.Image]) -> Tuple[Image.Image, Dict[str, Tuple[int, int, int, int]]]:
+    def _prepare_single_image(self, image: ImageLike) -> Tuple[np.ndarray, bytes]:
+        """轉換為3通道陣列並計算快取鍵"""
+        # 轉換為numpy數組（已是陣列時不複製）
+        img_array = np.asarray(image)
+
+        # 若圖片為單通道，轉成3通道
+        if len(img_array.shape) == 2:
+            img_array = np.stack([img_array]*3, axis=-1)
+
+        return img_array, self.result_cache.make_key(img_array, 'single', self.allow_list)
+    
+    def _parse_single_results(self, img_array: np.ndarray, cache_key: bytes, results: List[Any]) -> str:
+        """從 readtext 結果取出信心最高的文字，並更新字形圖集與快取"""
+        if results:
+            results.sort(key=lambda x: x[2], reverse=True)
+            best_result = results[0]
+            text = best_result[1].strip()
+            confidence = best_result[2]
+            if confidence > 0.5:
+                self.glyph_recognizer.learn(self._crop_bbox(img_array, best_result[0]), text, confidence)
+                self.result_cache.put(cache_key, (text, confidence))
+                return text
+
+        self.result_cache.put(cache_key, ("無法識別", 0.0))
+        return "無法識別"
+    
+    def _apply_fallback(self, results: Dict[str, Optional[str]], images_dict: Dict[str, ImageLike],
+                        allow_merge: bool, cycle_started: float) -> None:
+        """
+        以後備辨識取代結果中的"無法識別"（就地更新）
+        
+        後備辨識必須在本次處理開始後 fallback_deadline 秒內完成，未完成的分頁結果設為None，
+        呼叫端不回報該分頁，介面沿用上次的值；該分頁記錄在 deferred_tabs，並清除其變化指紋
+        與幀序號，下次處理時即使畫面未變化也會重試。
+        
+        Args:
+            results: 各標籤的OCR結果
+            images_dict: 各標籤送入OCR的圖像
+            allow_merge: 在本程序中處理多個分頁時，是否合併為一次含文字偵測的辨識
+            cycle_started: 本次處理的開始時間（time.perf_counter()）
+        """
+        failed = {name: images_dict[name] for name, result in results.items() if result == "無法識別"}
+        if not failed:
+            return
+        with self.timings.measure(STAGE_FALLBACK):
+            fallback_results = self._process_fallback_images(
+                failed, cycle_started + self.fallback_deadline, allow_merge)
+        for name, result in fallback_results.items():
+            results[name] = result
+            if result is None:
+                self.deferred_tabs.add(name)
+                self.change_tracker.reset(name)
+                self.last_frame_ids.pop(name, None)
+                logger.debug(f"後備辨識未在時限內完成，沿用上次結果: {name}")
+    
+    def _fallback_fits(self, deadline: float) -> bool:
+        """依最近的後備辨識耗時估計，在截止時間前是否還來得及執行一次"""
+        return time.perf_counter() + self._fallback_cost <= deadline
+    
+    def _record_fallback_cost(self, seconds: float) -> None:
+        """更新後備辨識耗時的估計值（指數移動平均）"""
+        self._fallback_cost = seconds if self._fallback_cost == 0 else 0.7 * self._fallback_cost + 0.3 * seconds
+    
+    def _process_fallback_images(self, images_dict: Dict[str, ImageLike], deadline: float,
+                                 allow_merge: bool) -> Dict[str, Optional[str]]:
+        """
+        含文字偵測的後備辨識，所有分頁同時處理並受截止時間限制
+        
+        有子程序池時每個分頁各送出一個任務並行處理，只等待到截止時間；逾時的任務會被取消
+        （子程序尚未開始時略過），子程序釋放該任務前不會為同一分頁重複送出。
+        在本程序中無法中斷進行中的辨識，因此依最近的耗時估計，來不及在截止時間前完成時不開始：
+        allow_merge 時合併為一次辨識，否則依序處理。
+        
+        Args:
+            images_dict: 圖像字典 {tab_name: image}
+            deadline: 截止時間（time.perf_counter()）
+            allow_merge: 是否可合併為一次辨識
+        
+        Returns:
+            Dict[str, Optional[str]]: 各標籤的OCR結果，截止時間前未完成的為None
+        """
+        results: Dict[str, Optional[str]] = {name: None for name in images_dict}
+        if self.worker_pool is not None:
+            pending = {}
+            for name, image in images_dict.items():
+                if self._collect_straggler(name):
+                    continue  # 上次的任務仍在子程序中執行
+                img_array, cache_key = self._prepare_single_image(image)
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    results[name] = cached[0]
+                    continue
+                future = self.worker_pool.submit(img_array, "readtext", allowlist=self.allow_list,
+                                                 **SINGLE_READTEXT_OPTIONS)
+                pending[future] = (name, img_array, cache_key)
+            if pending:
+                done, not_done = wait(pending, timeout=max(0.0, deadline - time.perf_counter()))
+                for future in done:
+                    name, img_array, cache_key = pending[future]
+                    try:
+                        results[name] = self._parse_single_results(img_array, cache_key, future.result())
+                    except Exception as e:
+                        logger.debug(f"後備辨識錯誤 ({name}): {e}")
+                        results[name] = "OCR錯誤"
+                for future in not_done:
+                    # 取消逾時的任務（子程序尚未開始時直接略過），子程序釋放前不再送出同一分頁
+                    self.worker_pool.cancel(future)
+                    name, img_array, cache_key = pending[future]
+                    self._fallback_stragglers[name] = (future, img_array, cache_key)
+            return results
+        
+        if allow_merge and len(images_dict) > 1:
+            if not self._fallback_fits(deadline):
+                return results
+            started = time.perf_counter()
+            with self.timings.measure(STAGE_MERGE):
+                merged_image, tab_positions = self._merge_images(images_dict)
+            results.update(self._process_merged_image(merged_image, tab_positions))
+            self._record_fallback_cost(time.perf_counter() - started)
+            return results
+        for name, image in images_dict.items():
+            if not self._fallback_fits(deadline):
+                break
+            started = time.perf_counter()
+            results[name] = self._process_single_image(image)
+            self._record_fallback_cost(time.perf_counter() - started)
+        return results
+    
+    def _collect_straggler(self, tab_name: str) -> bool:
+        """
+        處理分頁上次逾時的後備任務：子程序已釋放時清除追蹤，取消前已完成的結果寫入快取
+        
+        Returns:
+            bool: 任務是否仍佔用子程序（此時不應再送出同一分頁的任務）
+        """
+        straggler = self._fallback_stragglers.get(tab_name)
+        if straggler is None:
+            return False
+        future, img_array, cache_key = straggler
+        if self.worker_pool.is_in_flight(future):
+            return True
+        del self._fallback_stragglers[tab_name]
+        if not future.cancelled() and future.exception() is None:
+            self._parse_single_results(img_array, cache_key, future.result())
+        return False
+    
+    def _recognize_regions(self, images_dict: Dict[str, ImageLike]) -> Dict[str, str]:
+        """
+        略過文字偵測直接辨識：各區域以水平投影切出文字行，
+        所有區域的文字行放在同一張畫布上，以一次 recognize 呼叫批次辨識
+        
+        Args:
+            images_dict: 圖像字典 {tab_name: image}
+        
+        Returns:
+            Dict[str, str]: 各標籤的OCR結果，任一文字行信心不足時為"無法識別"
+        """
+        try:
+            if not self.ocr_reader:
+                return {name: "OCR未初始化" for name in images_dict}
+            
+            # 區域之間保留間隔，避免文字框跨越兩個區域
+            gap = 4
+            grays = {}
+            lines = {}
+            for name, image in images_dict.items():
+                with self.timings.measure(STAGE_PREPROCESS, name):
+                    gray = grays[name] = to_gray(image)
+                    lines[name] = find_text_lines(gray) or [(0, gray.shape[0])]
+            
+            with self.timings.measure(STAGE_MERGE):
+                width = max(gray.shape[1] for gray in grays.values())
+                height = sum(gray.shape[0] + gap for gray in grays.values())
+                canvas = np.zeros((height, width), dtype=np.uint8)
+                
+                boxes = []  # EasyOCR horizontal_list 格式: [x_min, x_max, y_min, y_max]
+                tab_spans = {}
+                y = 0
+                for name, gray in grays.items():
+                    h, w = gray.shape
+                    canvas[y:y + h, :w] = gray
+                    for y1, y2 in lines[name]:
+                        boxes.append([0, w, y + y1, y + y2])
+                    tab_spans[name] = (y, y + h)
+                    y += h + gap
+            
+            cache_key = self.result_cache.make_key(
+                canvas, 'direct', self.allow_list, tuple(tuple(box) for box in boxes))
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+            
+            with self.timings.measure(STAGE_RECOGNITION):
+                results = self.ocr_reader.recognize(
+                    canvas,
+                    horizontal_list=boxes,
+                    free_list=[],
+                    allowlist=self.allow_list,
+                    detail=1,
+                    paragraph=False,
+                    batch_size=len(boxes)
+                )
+            
+            # 依文字框中心分配回各區域（結果已依垂直位置排序）
+            tab_texts = {name: [] for name in images_dict}
+            failed = set()
+            for bbox, text, confidence in results:
+                center_y = sum(point[1] for point in bbox) / len(bbox)
+                for name, (y1, y2) in tab_spans.items():
+                    if y1 <= center_y < y2:
+                        break
+                else:
+                    continue
+                text = text.strip()
+                if confidence < 0.5 or not text:
+                    failed.add(name)
+                    continue
+                tab_texts[name].append(text)
+                self.glyph_recognizer.learn(self._crop_bbox(canvas, bbox), text, confidence)
+            
+            final_results = {
+                name: " ".join(texts) if texts and name not in failed else "無法識別"
+                for name, texts in tab_texts.items()
+            }
+            self.result_cache.put(cache_key, dict(final_results))
+            return final_results
+            
+        except Exception as e:
+            logger.debug(f"直接辨識錯誤: {e}")
+            return {name: "無法識別" for name in images_dict}
+    
+    def _merge_images(self, images_dict: Dict[str, ImageLike]) -> Tuple[np.ndarray, Dict[str, Tuple[int, int, int, int]]]:
         """
-        合併多個圖像為一張圖像（參考原始game_monitor的方式）
+        以貨架式排列將多個圖像合併為一張圖像（沒有圖像的分頁不佔空間）
         
         Args:
             images_dict: 圖像字典
             
         Returns:
-            Tuple[Image.Image, Dict]: (合併後的圖像, 各標籤的位置信息)
-        """
-        # 按固定順序處理圖像（參考原始代碼）
-        images_list = []
-        tab_names = []
-        
-        # 計算合併後的尺寸
-        max_width = 0
-        total_height = 0
-        
-        for tab_name in self.tabs_order:
-            if tab_name in images_dict:
-                image = images_dict[tab_name]
-                images_list.append(image)
-                tab_names.append(tab_name)
-                max_width = max(max_width, image.width)
-                total_height += image.height
-            else:
-                # 如果某個標籤沒有圖像，創建空白區域
-                dummy_image = Image.new('RGB', (100, 30), color=(0, 0, 0))
-                images_list.append(dummy_image)
-                tab_names.append(tab_name)
-                max_width = max(max_width, 100)
-                total_height += 30
-        
-        # 創建黑色背景的合併圖像
-        merged_image = Image.new('RGB', (max_width, total_height), color=(0, 0, 0))
-        
-        # 記錄每個標籤的位置
-        tab_positions = {}
-        current_y = 0
-        
-        for tab_name, image in zip(tab_names, images_list):
-            # 將圖像貼到合併圖像上
-            merged_image.paste(image, (0, current_y))
-            
-            # 記錄位置信息 (x1, y1, x2, y2)
-            tab_positions[tab_name] = (0, current_y, image.width, current_y + image.height)
-            current_y += image.height
+            Tuple[np.ndarray, Dict]: (合併後的RGB圖像陣列, 各標籤的位置信息 (x1, y1, x2, y2))
+        """
+        # 依分頁順序排列，排列結果在尺寸相同時保持此順序
+        order = [name for name in (self.tabs_order or []) if name in images_dict]
+        order += [name for name in images_dict if name not in order]
         
+        images = {}
+        for tab_name in order:
+            image = np.asarray(images_dict[tab_name])
+            if image.ndim == 2:
+                image = np.stack([image] * 3, axis=-1)
+            images[tab_name] = image[:, :, :3]
+        
+        # 同一列的區域間隔需大於文字偵測合併文字框的距離（width_ths × 文字高度）
+        max_height = max(image.shape[0] for image in images.values())
+        gutter_x = max(self.merge_gutter, int(np.ceil(MERGED_WIDTH_THS * max_height)) + 2)
+        size, tab_positions = pack_shelves(
+            {name: (image.shape[1], image.shape[0]) for name, image in images.items()},
+            gutter_x=gutter_x, gutter_y=self.merge_gutter)
+        merged_image = compose(images, size, tab_positions)
         return merged_image, tab_positions
     
-    def _process_merged_image(self, image: Image.Image, tab_positions: Dict[str, Tuple[int, int, int, int]]) -> Dict[str, str]:
+    def _process_merged_image(self, image: ImageLike, tab_positions: Dict[str, Tuple[int, int, int, int]]) -> Dict[str, str]:
         """
         處理合併圖像的OCR並根據座標分配結果
         
@@ -396,23 +900,24 @@ class OCREngine:
             if not self.ocr_reader:
                 return {name: "OCR未初始化" for name in tab_positions.keys()}
             
-            # 將PIL圖像轉換為numpy數組
-            import numpy as np
-            import cv2
-
-            
-            img_array = np.array(image)
+            img_array = np.asarray(image)
             
             # 轉換為灰階（參考原始game_monitor的做法）
             if len(img_array.shape) == 3:
                 img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
             
+            cache_key = self.result_cache.make_key(
+                img_array, 'merged', self.allow_list, tuple(sorted(tab_positions.items())))
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+            
             # 使用EasyOCR進行識別
-            results = self.ocr_reader.readtext(
+            results = self._readtext(
                 img_array,
                 allowlist=self.allow_list,
                 paragraph=False,
-                width_ths=0.7,
+                width_ths=MERGED_WIDTH_THS,
                 height_ths=0.7
             )
             
@@ -442,6 +947,8 @@ class OCREngine:
                     else:
                         continue
                     
+                    self.glyph_recognizer.learn(self._crop_bbox(img_array, bbox), text, confidence)
+                    
                     # 判斷文字屬於哪個標籤區域
                     for tab_name, (x1, y1, x2, y2) in tab_positions.items():
                         if x1 <= center_x <= x2 and y1 <= center_y <= y2:
@@ -460,51 +967,30 @@ class OCREngine:
                 else:
                     final_results[tab_name] = "無法識別"
             
+            self.result_cache.put(cache_key, dict(final_results))
             return final_results
             
         except Exception as e:
             logger.debug(f"合併圖像OCR處理錯誤: {e}")
             return {name: "OCR錯誤" for name in tab_positions.keys()}
     
-    def _distribute_merged_result(self, merged_result: str, tab_positions: Dict[str, Tuple[int, int, int, int]], tab_names: List[str]) -> None:
-        """
-        將合併OCR結果分配給各個標籤
-        
-        Args:
-            merged_result: 合併圖像的OCR結果
-            tab_positions: 各標籤的位置信息
-            tab_names: 標籤名稱列表
-        """
-        try:
-            if not self.result_callback:
-                return
-            
-            # 簡單策略：如果有多個標籤，嘗試按行分割結果
-            if len(tab_names) == 1:
-                self.result_callback(tab_names[0], merged_result)
-            else:
-                # 按換行符分割結果
-                lines = merged_result.split('\n') if '\n' in merged_result else [merged_result]
-                
-                # 如果行數匹配標籤數，按順序分配
-                if len(lines) == len(tab_names):
-                    for tab_name, line in zip(tab_names, lines):
-                        self.result_callback(tab_name, line.strip())
-                else:
-                    # 否則給每個標籤相同的結果
-                    for tab_name in tab_names:
-                        self.result_callback(tab_name, merged_result)
-                        
-        except Exception as e:
-            logger.debug(f"分配OCR結果錯誤: {e}")
-            # 發生錯誤時，給所有標籤相同的結果
-            for tab_name in tab_names:
-                if self.result_callback:
-                    self.result_callback(tab_name, merged_result)
+    @staticmethod
+    def _crop_bbox(image: np.ndarray, bbox) -> np.ndarray:
+        """裁切EasyOCR文字框的外接矩形"""
+        h, w = image.shape[:2]
+        x_coords = [point[0] for point in bbox]
+        y_coords = [point[1] for point in bbox]
+        x1 = max(0, int(min(x_coords)))
+        y1 = max(0, int(min(y_coords)))
+        x2 = min(w, int(np.ceil(max(x_coords))))
+        y2 = min(h, int(np.ceil(max(y_coords))))
+        return image[y1:y2, x1:x2]
     
     def set_allow_list(self, allow_list: str) -> None:
         """設定允許的字符列表"""
         self.allow_list = allow_list
+        self.glyph_recognizer.allow_list = allow_list
+        self.glyph_recognizer.reset()
     
     def get_status(self) -> str:
         """獲取OCR引擎狀態"""
@@ -0,0 +1,385 @@
+"""
+ONNX OCR Backend Module
+ONNX Runtime OCR後端：以匯出的 EasyOCR 偵測器 (CRAFT) 與辨識器 (CRNN) 模型在CPU上推論，不需要 torch
+
+模型匯出（需要 easyocr/torch，只需在開發環境執行一次）:
+    python -m ocr.onnx_backend --export models/onnx [--quantize]
+"""
+
+import argparse
+import math
+import os
+import sys
+from typing import Optional, Any, List, Tuple, Sequence
+import numpy as np
+import cv2
+
+from utils.log import get_logger
+from .backend import OCRBackend, BACKEND_ONNX
+from .projection import to_gray
+
+logger = get_logger(__name__)
+
+# 預設模型目錄（專案根目錄下的 models/onnx）
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "onnx")
+
+DETECTOR_FILE = "detector.onnx"
+RECOGNIZER_FILE = "recognizer.onnx"
+QUANTIZED_SUFFIX = "_int8"
+CHARSET_FILE = "charset.txt"
+
+# CRAFT 輸入正規化（ImageNet 平均值與標準差）
+DETECTOR_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32) * 255.0
+DETECTOR_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32) * 255.0
+# CRNN 輸入高度
+RECOGNIZER_HEIGHT = 64
+
+
+def model_path(model_dir: str, filename: str, quantized: bool = False) -> str:
+    """模型檔案路徑（量化版本在檔名後加上 _int8）"""
+    if quantized:
+        base, ext = os.path.splitext(filename)
+        filename = f"{base}{QUANTIZED_SUFFIX}{ext}"
+    return os.path.join(model_dir, filename)
+
+
+class ONNXBackend(OCRBackend):
+    """
+    ONNX Runtime 後端
+
+    偵測與辨識的前後處理與 EasyOCR 相同（文字框取水平外接矩形，遊戲介面的文字都是水平的），
+    因此可沿用 OCREngine 針對 EasyOCR 調整的參數。
+    """
+
+    name = BACKEND_ONNX
+
+    def __init__(self, languages: Sequence[str] = ("en",), gpu: bool = False, model_dir: str = "",
+                 quantized: bool = False, num_threads: int = 0):
+        """
+        Args:
+            languages: 辨識語言（僅用於記錄，字元集由匯出時的模型決定）
+            gpu: 是否使用GPU（ONNX後端固定使用CPU）
+            model_dir: 模型目錄，空字串表示使用預設目錄
+            quantized: 是否使用int8量化模型
+            num_threads: 每個推論的執行緒數，0 表示由 ONNX Runtime 決定
+        """
+        super().__init__(languages, gpu)
+        self.model_dir = model_dir or DEFAULT_MODEL_DIR
+        self.quantized = quantized
+        self.num_threads = num_threads
+        self._detector = None
+        self._recognizer = None
+        self._characters: List[str] = []
+
+    def load(self) -> None:
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError("未安裝onnxruntime。請執行: pip install onnxruntime") from e
+        if self.gpu:
+            logger.warning("ONNX後端僅支援CPU，忽略GPU設定")
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads > 0:
+            options.intra_op_num_threads = self.num_threads
+        providers = ["CPUExecutionProvider"]
+        self._detector = onnxruntime.InferenceSession(
+            model_path(self.model_dir, DETECTOR_FILE, self.quantized), options, providers=providers)
+        self._recognizer = onnxruntime.InferenceSession(
+            model_path(self.model_dir, RECOGNIZER_FILE, self.quantized), options, providers=providers)
+        with open(os.path.join(self.model_dir, CHARSET_FILE), "r", encoding="utf-8") as f:
+            charset = f.read().rstrip("\n")
+        # 索引0為CTC空白
+        self._characters = ["[blank]"] + list(charset)
+        logger.info(f"ONNX OCR模型已載入: {self.model_dir}{'（int8）' if self.quantized else ''}")
+
+    def readtext(self, image, allowlist: Optional[str] = None, detail: int = 1, paragraph: bool = False,
+                 text_threshold: float = 0.7, low_text: float = 0.4, link_threshold: float = 0.4,
+                 canvas_size: int = 2560, mag_ratio: float = 1.0, height_ths: float = 0.5,
+                 width_ths: float = 0.5, ycenter_ths: float = 0.5, add_margin: float = 0.1,
+                 batch_size: int = 16, **kwargs) -> List[Any]:
+        """偵測並辨識影像中的所有文字（參數與 easyocr.Reader.readtext 相同）"""
+        boxes, _ = self.detect_text(image, text_threshold=text_threshold, low_text=low_text,
+                                    link_threshold=link_threshold, canvas_size=canvas_size, mag_ratio=mag_ratio,
+                                    height_ths=height_ths, width_ths=width_ths, ycenter_ths=ycenter_ths,
+                                    add_margin=add_margin)
+        return self.recognize(image, horizontal_list=boxes, free_list=[], allowlist=allowlist,
+                              detail=detail, paragraph=paragraph, batch_size=batch_size)
+
+    def detect_text(self, image, text_threshold: float = 0.7, low_text: float = 0.4, link_threshold: float = 0.4,
+                    canvas_size: int = 2560, mag_ratio: float = 1.0, height_ths: float = 0.5,
+                    width_ths: float = 0.5, ycenter_ths: float = 0.5, add_margin: float = 0.1,
+                    **kwargs) -> Tuple[List[List[int]], List[Any]]:
+        """偵測並合併文字框（參數與 easyocr.Reader.detect 相同，只產生水平文字框）"""
+        boxes = self.detect(image, text_threshold, low_text, link_threshold, canvas_size, mag_ratio)
+        return group_text_boxes(boxes, height_ths, width_ths, ycenter_ths, add_margin), []
+
+    def recognize(self, image, horizontal_list=None, free_list=None, allowlist: Optional[str] = None,
+                  detail: int = 1, paragraph: bool = False, batch_size: int = 16, **kwargs) -> List[Any]:
+        """辨識指定的文字框（參數與 easyocr.Reader.recognize 相同，任意四邊形以外接矩形辨識）"""
+        if paragraph:
+            raise ValueError("ONNX後端不支援 paragraph=True")
+        gray = to_gray(image)
+        height, width = gray.shape
+        if horizontal_list is None and free_list is None:
+            horizontal_list = [[0, width, 0, height]]
+        rects = [list(box) for box in horizontal_list or []]
+        for quad in free_list or []:
+            xs = [point[0] for point in quad]
+            ys = [point[1] for point in quad]
+            rects.append([min(xs), max(xs), min(ys), max(ys)])
+
+        crops = []
+        kept = []
+        for x_min, x_max, y_min, y_max in rects:
+            x1, x2 = max(0, int(x_min)), min(width, int(math.ceil(x_max)))
+            y1, y2 = max(0, int(y_min)), min(height, int(math.ceil(y_max)))
+            if x2 - x1 < 1 or y2 - y1 < 1:
+                continue
+            crops.append(gray[y1:y2, x1:x2])
+            kept.append((x1, x2, y1, y2))
+
+        texts = []
+        batch_size = max(1, batch_size)
+        for start in range(0, len(crops), batch_size):
+            texts.extend(self.recognize_batch(crops[start:start + batch_size], allowlist))
+
+        results = []
+        for (x1, x2, y1, y2), (text, confidence) in zip(kept, texts):
+            bbox = [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+            results.append((bbox, text, confidence) if detail else text)
+        return results
+
+    def recognize_batch(self, crops: Sequence[Any], allowlist: Optional[str] = None) -> List[Tuple[str, float]]:
+        """以一次辨識器推論批次辨識單行文字影像"""
+        if not crops:
+            return []
+        resized = []
+        for crop in crops:
+            gray = to_gray(crop)
+            h, w = gray.shape
+            target_width = max(1, int(math.ceil(RECOGNIZER_HEIGHT * w / h)))
+            resized.append(cv2.resize(gray, (target_width, RECOGNIZER_HEIGHT), interpolation=cv2.INTER_CUBIC))
+
+        # 右側以最後一行像素延伸補齊到批次內最寬的寬度（與 EasyOCR 的 NormalizePAD 相同）
+        max_width = max(image.shape[1] for image in resized)
+        batch = np.empty((len(resized), 1, RECOGNIZER_HEIGHT, max_width), dtype=np.float32)
+        for index, image in enumerate(resized):
+            w = image.shape[1]
+            batch[index, 0, :, :w] = image
+            batch[index, 0, :, w:] = image[:, -1:]
+        batch = (batch / 255.0 - 0.5) / 0.5
+
+        logits = self._recognizer.run(None, {self._recognizer.get_inputs()[0].name: batch})[0]
+        return self._decode(logits, allowlist)
+
+    def detect(self, image, text_threshold: float = 0.7, low_text: float = 0.4, link_threshold: float = 0.4,
+               canvas_size: int = 2560, mag_ratio: float = 1.0) -> List[List[int]]:
+        """
+        以CRAFT偵測文字區塊
+
+        Returns:
+            list: 水平文字框 [[x_min, x_max, y_min, y_max], ...]（原始影像座標）
+        """
+        array = np.asarray(image)
+        if array.ndim == 2:
+            array = cv2.cvtColor(array, cv2.COLOR_GRAY2RGB)
+        else:
+            array = np.ascontiguousarray(array[:, :, :3])
+        height, width = array.shape[:2]
+
+        # 依長邊縮放並補齊為32的倍數
+        target = min(mag_ratio * max(height, width), canvas_size)
+        ratio = target / max(height, width)
+        resized = cv2.resize(array, (max(1, int(width * ratio)), max(1, int(height * ratio))),
+                             interpolation=cv2.INTER_LINEAR)
+        padded_h = int(math.ceil(resized.shape[0] / 32) * 32)
+        padded_w = int(math.ceil(resized.shape[1] / 32) * 32)
+        tensor = np.zeros((padded_h, padded_w, 3), dtype=np.float32)
+        tensor[:resized.shape[0], :resized.shape[1]] = resized
+        tensor = ((tensor - DETECTOR_MEAN) / DETECTOR_STD).transpose(2, 0, 1)[np.newaxis]
+
+        score = self._detector.run(None, {self._detector.get_inputs()[0].name: tensor})[0][0]
+        boxes = craft_boxes(score[:, :, 0], score[:, :, 1], text_threshold, link_threshold, low_text)
+        # 輸出為輸入的一半大小
+        scale = 2.0 / ratio
+        return [[int(x1 * scale), int(math.ceil(x2 * scale)), int(y1 * scale), int(math.ceil(y2 * scale))]
+                for x1, x2, y1, y2 in boxes]
+
+    def _decode(self, logits: np.ndarray, allowlist: Optional[str]) -> List[Tuple[str, float]]:
+        """CTC貪婪解碼，不在 allowlist 中的字元機率設為0（與 EasyOCR 相同）"""
+        logits = logits - logits.max(axis=2, keepdims=True)
+        probs = np.exp(logits)
+        if allowlist:
+            allowed = set(allowlist)
+            ignored = [index for index, char in enumerate(self._characters) if index and char not in allowed]
+            probs[:, :, ignored] = 0.0
+        probs /= probs.sum(axis=2, keepdims=True)
+
+        indices = probs.argmax(axis=2)
+        max_probs = probs.max(axis=2)
+        results = []
+        for row, row_probs in zip(indices, max_probs):
+            keep = (row != 0) & np.concatenate(([True], row[1:] != row[:-1]))
+            text = "".join(self._characters[index] for index in row[keep])
+            # EasyOCR 的信心計算方式（custom_mean）：非空白時間步最大機率的乘積再依長度調整，
+            # 沒有非空白時間步時信心為0
+            char_probs = row_probs[row != 0]
+            if len(char_probs):
+                confidence = float(np.prod(char_probs) ** (2.0 / math.sqrt(len(char_probs))))
+            else:
+                confidence = 0.0
+            results.append((text, confidence))
+        return results
+
+
+def craft_boxes(text_map: np.ndarray, link_map: np.ndarray, text_threshold: float,
+                link_threshold: float, low_text: float) -> List[Tuple[int, int, int, int]]:
+    """
+    由CRAFT的文字分數與連結分數圖取得文字區塊的外接矩形（分數圖座標）
+
+    Returns:
+        list: [(x_min, x_max, y_min, y_max), ...]
+    """
+    text_score = text_map > low_text
+    link_score = link_map > link_threshold
+    combined = (text_score | link_score).astype(np.uint8)
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(combined, connectivity=4)
+    if count <= 1:
+        return []
+
+    # 各元件的最高文字分數
+    peaks = np.zeros(count, dtype=np.float32)
+    np.maximum.at(peaks, labels.ravel(), text_map.ravel())
+
+    map_h, map_w = text_map.shape
+    boxes = []
+    for label in range(1, count):
+        x, y, w, h, area = stats[label]
+        if area < 10 or peaks[label] < text_threshold:
+            continue
+        # 依元件大小外擴（對應 EasyOCR 對分割圖的膨脹）
+        niter = int(math.sqrt(area * min(w, h) / (w * h)) * 2)
+        boxes.append((max(0, x - niter), min(map_w, x + w + niter + 1),
+                      max(0, y - niter), min(map_h, y + h + niter + 1)))
+    return boxes
+
+
+def group_text_boxes(boxes: List[List[int]], height_ths: float = 0.5, width_ths: float = 0.5,
+                     ycenter_ths: float = 0.5, add_margin: float = 0.1) -> List[List[int]]:
+    """
+    將同一行且距離相近的文字區塊合併為文字框（對應 EasyOCR 的 group_text_box）
+
+    Returns:
+        list: [[x_min, x_max, y_min, y_max], ...]，依由上而下、由左而右排序
+    """
+    lines: List[List[List[int]]] = []
+    for box in sorted(boxes, key=lambda b: (b[2] + b[3]) / 2):
+        height = box[3] - box[2]
+        center = (box[2] + box[3]) / 2
+        if lines:
+            line = lines[-1]
+            line_height = sum(b[3] - b[2] for b in line) / len(line)
+            line_center = sum((b[2] + b[3]) / 2 for b in line) / len(line)
+            if abs(center - line_center) < ycenter_ths * line_height and \
+                    abs(height - line_height) < height_ths * line_height:
+                line.append(box)
+                continue
+        lines.append([box])
+
+    merged = []
+    for line in lines:
+        group: Optional[List[int]] = None
+        for box in sorted(line, key=lambda b: b[0]):
+            if group is not None and box[0] - group[1] < width_ths * (box[3] - box[2]):
+                group = [group[0], max(group[1], box[1]), min(group[2], box[2]), max(group[3], box[3])]
+                continue
+            if group is not None:
+                merged.append(group)
+            group = list(box)
+        merged.append(group)
+
+    results = []
+    for x_min, x_max, y_min, y_max in merged:
+        margin = int(add_margin * min(x_max - x_min, y_max - y_min))
+        results.append([max(0, x_min - margin), x_max + margin, max(0, y_min - margin), y_max + margin])
+    return results
+
+
+def export_easyocr_models(output_dir: str, languages: Sequence[str] = ("en",), quantize: bool = False) -> None:
+    """
+    將 EasyOCR 的偵測器與辨識器匯出為ONNX模型（需要 easyocr 與 torch）
+
+    Args:
+        output_dir: 輸出目錄
+        languages: EasyOCR 語言
+        quantize: 是否另外輸出int8動態量化模型（需要 onnxruntime）
+    """
+    import torch
+    import easyocr
+
+    os.makedirs(output_dir, exist_ok=True)
+    # 不使用 torch 的動態量化，匯出浮點模型
+    reader = easyocr.Reader(list(languages), gpu=False, quantize=False, verbose=False)
+    detector = getattr(reader.detector, "module", reader.detector).eval()
+    recognizer = getattr(reader.recognizer, "module", reader.recognizer).eval()
+
+    class DetectorOutput(torch.nn.Module):
+        """只輸出分數圖（不含特徵圖）"""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, image):
+            return self.model(image)[0]
+
+    class RecognizerOutput(torch.nn.Module):
+        """辨識器的 text 參數在推論時不使用"""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, image):
+            return self.model(image, None)
+
+    with torch.no_grad():
+        torch.onnx.export(
+            DetectorOutput(detector), torch.zeros(1, 3, 320, 320),
+            os.path.join(output_dir, DETECTOR_FILE),
+            input_names=["image"], output_names=["score"], opset_version=13,
+            dynamic_axes={"image": {0: "batch", 2: "height", 3: "width"},
+                          "score": {0: "batch", 1: "map_height", 2: "map_width"}})
+        torch.onnx.export(
+            RecognizerOutput(recognizer), torch.zeros(1, 1, RECOGNIZER_HEIGHT, 256),
+            os.path.join(output_dir, RECOGNIZER_FILE),
+            input_names=["image"], output_names=["logits"], opset_version=13,
+            dynamic_axes={"image": {0: "batch", 3: "width"}, "logits": {0: "batch", 1: "steps"}})
+    with open(os.path.join(output_dir, CHARSET_FILE), "w", encoding="utf-8") as f:
+        f.write(reader.character)
+    logger.info(f"已匯出ONNX模型: {output_dir}")
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        for filename in (DETECTOR_FILE, RECOGNIZER_FILE):
+            quantize_dynamic(model_path(output_dir, filename), model_path(output_dir, filename, True),
+                             weight_type=QuantType.QInt8)
+        logger.info("已輸出int8量化模型")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ONNX OCR後端工具")
+    parser.add_argument("--export", metavar="DIR", help="匯出 EasyOCR 模型為ONNX的目錄")
+    parser.add_argument("--quantize", action="store_true", help="另外輸出int8量化模型")
+    parser.add_argument("--languages", default="en", help="EasyOCR 語言（以逗號分隔）")
+    args = parser.parse_args()
+    if not args.export:
+        parser.print_help()
+        sys.exit(1)
+    export_easyocr_models(args.export, args.languages.split(","), args.quantize)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Projection Profile Module
+投影輪廓工具：二值化文字區域並以水平投影切出文字行
+"""
+
+from typing import Optional, List, Tuple
+import numpy as np
+import cv2
+
+
+def to_gray(image) -> np.ndarray:
+    """轉換為灰階（已是灰階時不複製）"""
+    array = np.asarray(image)
+    if array.ndim == 3:
+        return cv2.cvtColor(np.ascontiguousarray(array[:, :, :3]), cv2.COLOR_RGB2GRAY)
+    return array
+
+
+def binarize_text(image) -> Optional[np.ndarray]:
+    """
+    以Otsu閾值轉換為前景為True的二值影像（假設文字為少數像素）
+
+    Returns:
+        np.ndarray: 布林陣列，影像為空或不是8位元時返回None
+    """
+    gray = to_gray(image)
+    if gray.size == 0 or gray.dtype != np.uint8:
+        return None
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    foreground = binary > 0
+    if np.count_nonzero(foreground) * 2 > foreground.size:
+        foreground = ~foreground  # 深色文字、淺色背景
+    return foreground
+
+
+def find_text_lines(image, min_gap: int = 2, min_height_ratio: float = 0.3,
+                    padding: int = 2) -> List[Tuple[int, int]]:
+    """
+    以水平投影切出文字行
+
+    Args:
+        image: 區域圖像
+        min_gap: 小於此行數的空白視為同一行內的間隙
+        min_height_ratio: 高度低於最高文字行此比例的行視為雜訊
+        padding: 每行上下保留的邊距
+
+    Returns:
+        list: [(y1, y2), ...]，找不到文字時返回空列表
+    """
+    foreground = binarize_text(image)
+    if foreground is None:
+        return []
+    rows = foreground.any(axis=1).astype(np.int8)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], rows, [0]))))
+    runs = [[int(start), int(end)] for start, end in zip(edges[0::2], edges[1::2])]
+    if not runs:
+        return []
+
+    merged = [runs[0]]
+    for start, end in runs[1:]:
+        if start - merged[-1][1] < min_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    tallest = max(end - start for start, end in merged)
+    height = foreground.shape[0]
+    return [(max(0, start - padding), min(height, end + padding))
+            for start, end in merged if end - start >= tallest * min_height_ratio]
+
+
+def find_text_bbox(image, padding: int = 2, max_fill: float = 0.9,
+                   min_count: int = 1) -> Optional[Tuple[int, int, int, int]]:
+    """
+    以水平與垂直投影找出文字的最小外框
+
+    幾乎整行（整列）都是前景的線條視為邊框或血條底色，不列入文字範圍。
+
+    Args:
+        image: 區域圖像
+        padding: 外框四周保留的邊距
+        max_fill: 前景比例高於此值的行（列）視為邊框
+        min_count: 前景像素少於此數的行（列）視為空白
+
+    Returns:
+        tuple: (x1, y1, x2, y2)，找不到文字時返回None
+    """
+    foreground = binarize_text(image)
+    if foreground is None:
+        return None
+    height, width = foreground.shape
+    # 排除邊框行後計算垂直投影，再排除邊框列後計算水平投影
+    text_rows = np.count_nonzero(foreground, axis=1) <= width * max_fill
+    if not text_rows.any():
+        return None
+    cols = np.count_nonzero(foreground[text_rows], axis=0)
+    col_mask = (cols >= min_count) & (cols <= np.count_nonzero(text_rows) * max_fill)
+    if not col_mask.any():
+        return None
+    rows = np.count_nonzero(foreground[:, col_mask], axis=1)
+    row_mask = (rows >= min_count) & text_rows
+    if not row_mask.any():
+        return None
+
+    xs = np.flatnonzero(col_mask)
+    ys = np.flatnonzero(row_mask)
+    return (max(0, int(xs[0]) - padding), max(0, int(ys[0]) - padding),
+            min(width, int(xs[-1]) + 1 + padding), min(height, int(ys[-1]) + 1 + padding))
+
+
+def normalize_height(image, target_height: int) -> np.ndarray:
+    """
+    等比例縮放至指定高度（高度相同時不複製）
+
+    Args:
+        image: 圖像
+        target_height: 目標高度
+
+    Returns:
+        np.ndarray: 縮放後的圖像
+    """
+    array = np.asarray(image)
+    height, width = array.shape[:2]
+    if height == target_height or height == 0 or target_height <= 0:
+        return array
+    scale = target_height / height
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+    return cv2.resize(array, (max(1, int(round(width * scale))), target_height), interpolation=interpolation)
@@ -0,0 +1,137 @@
+"""
+Region Trimmer Module
+區域裁切模組：以投影輪廓裁掉使用者框選區域中的空白背景，並縮小過高的文字
+"""
+
+import threading
+from typing import Optional, Dict, Any, Tuple
+import numpy as np
+
+from .projection import to_gray, binarize_text, find_text_bbox, find_text_lines, normalize_height
+
+# (x1, y1, x2, y2)
+Box = Tuple[int, int, int, int]
+
+
+class RegionTrimmer:
+    """
+    區域自動裁切器
+
+    對每個分頁保留上次的文字外框：區域尺寸不變、文字未碰到外框邊緣時直接沿用，
+    每 refresh_frames 次或文字變長（碰到邊緣）時才重新以投影計算。
+    裁切後每行文字高於 target_height 時等比例縮小，減少後續偵測與辨識的像素數；
+    預設不放大較小的文字（放大會增加像素數），需要一致的文字高度時可啟用 upscale。
+    """
+
+    def __init__(self, target_height: int = 32, padding: int = 2, refresh_frames: int = 30,
+                 upscale: bool = False):
+        """
+        Args:
+            target_height: 每行文字（含邊距）的最大高度，0 表示不縮放
+            padding: 文字外框四周保留的邊距
+            refresh_frames: 沿用外框的最大次數，超過後重新計算
+            upscale: 是否將低於 target_height 的文字放大至該高度
+        """
+        self.target_height = target_height
+        self.upscale = upscale
+        self.padding = padding
+        self.refresh_frames = refresh_frames
+        self.enabled = True
+        self._lock = threading.Lock()
+        # {tab_name: (區域尺寸, 外框, 文字行數, 已沿用次數)}
+        self._boxes: Dict[str, Tuple[Tuple[int, int], Box, int, int]] = {}
+        # 統計
+        self.reused = 0
+        self.computed = 0
+        self.untrimmed = 0
+        self.pixels_in = 0
+        self.pixels_out = 0
+
+    def trim(self, tab_name: str, image) -> np.ndarray:
+        """
+        裁切並縮放區域圖像
+
+        Args:
+            tab_name: 分頁名稱
+            image: 區域圖像
+
+        Returns:
+            np.ndarray: 裁切（及縮小）後的灰階圖像，找不到文字時返回未裁切的灰階圖像
+        """
+        gray = to_gray(image)
+        if not self.enabled or gray.size == 0:
+            return gray
+
+        with self._lock:
+            entry = self._boxes.get(tab_name)
+        crop = None
+        if entry is not None and entry[0] == gray.shape and entry[3] < self.refresh_frames:
+            shape, box, line_count, uses = entry
+            x1, y1, x2, y2 = box
+            candidate = gray[y1:y2, x1:x2]
+            if not self._touches_edge(candidate, box, shape):
+                crop = candidate
+                with self._lock:
+                    self._boxes[tab_name] = (shape, box, line_count, uses + 1)
+                    self.reused += 1
+
+        if crop is None:
+            box = find_text_bbox(gray, padding=self.padding)
+            with self._lock:
+                if box is None:
+                    self._boxes.pop(tab_name, None)
+                    self.untrimmed += 1
+                    return gray
+                x1, y1, x2, y2 = box
+                crop = gray[y1:y2, x1:x2]
+                line_count = max(1, len(find_text_lines(crop)))
+                self._boxes[tab_name] = (gray.shape, box, line_count, 0)
+                self.computed += 1
+        else:
+            line_count = entry[2]
+
+        if self.target_height > 0:
+            target = self.target_height * line_count
+            if crop.shape[0] > target or self.upscale:
+                crop = normalize_height(crop, target)
+        with self._lock:
+            self.pixels_in += gray.size
+            self.pixels_out += crop.size
+        return crop
+
+    def get_box(self, tab_name: str) -> Optional[Box]:
+        """獲取分頁目前的文字外框"""
+        with self._lock:
+            entry = self._boxes.get(tab_name)
+        return entry[1] if entry is not None else None
+
+    def reset(self, tab_name: Optional[str] = None) -> None:
+        """清除外框（下次重新計算）"""
+        with self._lock:
+            if tab_name is None:
+                self._boxes.clear()
+            else:
+                self._boxes.pop(tab_name, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取裁切統計"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'reused': self.reused,
+                'computed': self.computed,
+                'untrimmed': self.untrimmed,
+                'pixel_ratio': self.pixels_out / self.pixels_in if self.pixels_in else 1.0,
+                'boxes': {name: entry[1] for name, entry in self._boxes.items()}
+            }
+
+    @staticmethod
+    def _touches_edge(crop: np.ndarray, box: Box, shape: Tuple[int, int]) -> bool:
+        """文字是否碰到外框邊緣（文字變長或位置移動），與區域邊界重合的邊不檢查"""
+        foreground = binarize_text(crop)
+        if foreground is None:
+            return True
+        x1, y1, x2, y2 = box
+        height, width = shape
+        return bool((x1 > 0 and foreground[:, 0].any()) or (x2 < width and foreground[:, -1].any()) or
+                    (y1 > 0 and foreground[0].any()) or (y2 < height and foreground[-1].any()))
@@ -0,0 +1,97 @@
+"""
+OCR Result Cache Module
+OCR結果快取模組：以量化像素雜湊為鍵，相同畫面不重複執行神經網路推論
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Hashable
+import numpy as np
+
+
+class OCRResultCache:
+    """
+    OCR結果快取（LRU淘汰）
+
+    鍵為影像雜湊加上辨識參數：像素先捨去低位元再雜湊，
+    壓縮雜訊造成的微小差異仍會命中，但不同的數字不會因降採樣而被混為一談。
+    """
+
+    def __init__(self, max_entries: int = 512, quantize_bits: int = 4):
+        """
+        Args:
+            max_entries: 最多保留的結果數
+            quantize_bits: 雜湊前捨去的低位元數 (0-7)
+        """
+        self.max_entries = max_entries
+        self.quantize_bits = quantize_bits
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Any]" = OrderedDict()
+        # 統計
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, image, *params: Hashable) -> bytes:
+        """
+        計算快取鍵
+
+        Args:
+            image: 送去OCR的影像（預處理後）
+            params: 影響辨識結果的參數（方法名稱、allowlist等）
+
+        Returns:
+            bytes: 快取鍵
+        """
+        array = np.asarray(image)
+        if array.dtype != np.uint8:
+            array = array.astype(np.uint8)
+        quantized = np.right_shift(array, self.quantize_bits) if self.quantize_bits else array
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((array.shape, params)).encode())
+        digest.update(np.ascontiguousarray(quantized).data)
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[Any]:
+        """查詢快取，命中時返回儲存的結果並更新為最近使用"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, value: Any) -> None:
+        """儲存結果，超過容量時淘汰最久未使用的項目"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """清除所有結果"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取命中率統計"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_entries': self.max_entries
+            }
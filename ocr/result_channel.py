@@ -0,0 +1,118 @@
+"""
+Result Channel Module
+OCR結果通道：OCR執行緒只把結果放入佇列，由Tk主執行緒定期批次取出並更新介面
+"""
+
+from collections import deque
+from typing import Optional, Dict, Any, Callable, Tuple
+
+from utils.log import get_logger
+from capture.frame_buffer import FrameInfo
+
+logger = get_logger(__name__)
+
+
+class ResultChannel:
+    """
+    OCR結果通道
+
+    push() 只對 deque 進行 append（執行緒安全且不需要鎖），OCR執行緒不會等待介面更新。
+    Tk主執行緒每 interval_ms 毫秒取出所有結果，同一分頁只保留最新的一筆後依序呼叫回調，
+    所有 widget 與管理器的存取都在主執行緒中進行。
+    """
+
+    def __init__(self, root, callback: Callable[[str, str, Optional[FrameInfo]], None], interval_ms: int = 50):
+        """
+        Args:
+            root: Tk 根視窗
+            callback: 在主執行緒中呼叫的回調，參數為 (tab_name, result, frame_info)
+            interval_ms: 取出結果的間隔（毫秒）
+        """
+        self.root = root
+        self.callback = callback
+        self.interval_ms = interval_ms
+        self._queue: "deque[Tuple[str, str, Optional[FrameInfo]]]" = deque()
+        self._after_id = None
+        self.is_running = False
+        # 統計
+        self.pushed = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.batches = 0
+
+    def push(self, tab_name: str, result: str, frame_info: Optional[FrameInfo] = None) -> None:
+        """放入一筆結果（可在任何執行緒呼叫）"""
+        self._queue.append((tab_name, result, frame_info))
+        self.pushed += 1
+
+    def start(self) -> None:
+        """開始在主執行緒定期取出結果（需在主執行緒呼叫）"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._after_id = self.root.after(self.interval_ms, self._poll)
+
+    def stop(self) -> None:
+        """停止定期取出"""
+        self.is_running = False
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def drain(self) -> Dict[str, Tuple[str, Optional[FrameInfo]]]:
+        """
+        取出目前所有結果，同一分頁只保留最新的一筆
+
+        Returns:
+            dict: {tab_name: (result, frame_info)}，依分頁第一次出現的順序
+        """
+        latest: Dict[str, Tuple[str, Optional[FrameInfo]]] = {}
+        count = 0
+        while True:
+            try:
+                tab_name, result, frame_info = self._queue.popleft()
+            except IndexError:
+                break
+            latest[tab_name] = (result, frame_info)
+            count += 1
+        self.coalesced += count - len(latest)
+        return latest
+
+    def deliver(self) -> int:
+        """
+        取出結果並呼叫回調（需在主執行緒呼叫）
+
+        Returns:
+            int: 呼叫回調的次數
+        """
+        batch = self.drain()
+        if not batch:
+            return 0
+        self.batches += 1
+        for tab_name, (result, frame_info) in batch.items():
+            try:
+                self.callback(tab_name, result, frame_info)
+            except Exception as e:
+                logger.error(f"OCR結果回調錯誤 ({tab_name}): {e}")
+        self.delivered += len(batch)
+        return len(batch)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取通道統計"""
+        return {
+            'pushed': self.pushed,
+            'delivered': self.delivered,
+            'coalesced': self.coalesced,
+            'batches': self.batches,
+            'pending': len(self._queue)
+        }
+
+    def _poll(self) -> None:
+        """主執行緒的定期取出"""
+        if not self.is_running:
+            return
+        self.deliver()
+        self._after_id = self.root.after(self.interval_ms, self._poll)
@@ -0,0 +1,492 @@
+"""
+OCR Worker Pool Module
+OCR子程序池模組：在獨立程序中執行OCR後端，避免與GUI競爭GIL，子程序崩潰時自動重啟
+"""
+
+import os
+import threading
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from typing import Optional, Dict, Any, List, Tuple, Sequence
+import numpy as np
+
+from utils.log import get_logger
+from .backend import create_backend, BACKEND_EASYOCR
+
+logger = get_logger(__name__)
+
+# 子程序可呼叫的OCR後端方法
+READER_METHODS = ("readtext", "detect_text", "recognize")
+
+# 子程序訊息類型
+MSG_READY = "ready"
+MSG_INIT_FAILED = "init_failed"
+MSG_RESULT = "result"
+MSG_ERROR = "error"
+MSG_CANCELLED = "cancelled"
+# 主程序送給子程序的取消訊息: (MSG_CANCEL, task_id)
+MSG_CANCEL = "cancel"
+
+
+def _worker_main(worker_id: int, languages: Sequence[str], gpu: bool, backend: str,
+                 backend_options: Dict[str, Any], task_conn, result_conn) -> None:
+    """
+    子程序入口：建立並載入自己的OCR後端，逐一處理主程序送來的任務
+
+    任務格式為 (task_id, 共享記憶體名稱, 影像形狀, 方法名稱, 參數)，None 表示結束；
+    (MSG_CANCEL, task_id) 取消尚未開始的任務。每次處理任務前先讀取管道中所有訊息，
+    已取消的任務不執行，直接回報 MSG_CANCELLED。
+    """
+    try:
+        reader = create_backend(backend, languages, gpu, backend_options)
+        reader.load()
+    except Exception as e:
+        result_conn.send((MSG_INIT_FAILED, None, repr(e)))
+        return
+    result_conn.send((MSG_READY, None, os.getpid()))
+
+    pending = deque()
+    cancelled = set()
+    stopping = False
+    while True:
+        try:
+            # 沒有待處理任務時阻塞等待，否則只讀取已送達的訊息
+            while not stopping and (not pending or task_conn.poll()):
+                message = task_conn.recv()
+                if message is None:
+                    stopping = True
+                elif message[0] == MSG_CANCEL:
+                    cancelled.add(message[1])
+                else:
+                    pending.append(message)
+        except (EOFError, OSError):
+            break  # 主程序已結束
+        if not pending:
+            break
+        task_id, shm_name, shape, method, kwargs = pending.popleft()
+        if task_id in cancelled:
+            cancelled.discard(task_id)
+            result_conn.send((MSG_CANCELLED, task_id, None))
+            continue
+        try:
+            if method not in READER_METHODS:
+                raise ValueError(f"不支援的方法: {method}")
+            # spawn 的子程序與主程序共用 resource tracker，重複登記不影響主程序的釋放
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                image = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+                results = getattr(reader, method)(image, **kwargs)
+                del image  # 釋放對共享記憶體的參考後才能關閉
+            finally:
+                shm.close()
+            result_conn.send((MSG_RESULT, task_id, results))
+        except Exception as e:
+            result_conn.send((MSG_ERROR, task_id, repr(e)))
+
+
+class _WorkerHandle:
+    """單一子程序的狀態"""
+
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.process = None
+        self.task_conn = None
+        self.result_conn = None
+        self.send_lock = threading.Lock()
+        self.ready = False
+        self.init_failed = False
+        self.restarts = 0
+        self.restart_at: Optional[float] = None  # 等待重新啟動的時間
+        self.completed = 0
+        # task_id -> (Future, 共享記憶體, 送出時間)
+        self.in_flight: Dict[int, Tuple[Future, shared_memory.SharedMemory, float]] = {}
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+
+class OCRWorkerPool:
+    """
+    OCR子程序池
+
+    每個子程序各自載入一個OCR後端（EasyOCR 或 ONNX Runtime）。影像透過共享記憶體傳遞，只有任務描述與結果經由管道傳送；
+    submit() 立即返回 Future，由收集執行緒在結果回傳時完成。收集執行緒同時監控子程序：
+    子程序結束或任務逾時時，進行中的任務以例外結束並重新啟動該子程序。
+    提供與 easyocr.Reader 相同的 readtext() 介面，可直接取代 OCREngine 的 reader。
+    """
+
+    def __init__(self, num_workers: int = 1, languages: Sequence[str] = ("en",), gpu: bool = False,
+                 task_timeout: float = 30.0, max_restarts: int = 5, restart_delay: float = 1.0,
+                 backend: str = BACKEND_EASYOCR, backend_options: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            num_workers: 子程序數量
+            languages: OCR 語言
+            gpu: 是否使用GPU
+            task_timeout: 單一任務的最長處理時間（秒），超過時視為子程序無回應並重啟
+            max_restarts: 每個子程序最多重啟次數
+            restart_delay: 重啟前的等待時間（秒），每次重啟加倍
+            backend: OCR後端名稱
+            backend_options: 後端專用設定
+        """
+        self.num_workers = max(1, num_workers)
+        self.languages = tuple(languages)
+        self.gpu = gpu
+        self.task_timeout = task_timeout
+        self.max_restarts = max_restarts
+        self.restart_delay = restart_delay
+        self.backend = backend
+        self.backend_options = dict(backend_options or {})
+        self.is_running = False
+        # 使用 spawn：torch 在 fork 後的子程序中不安全，且與 Windows/macOS 行為一致
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: List[_WorkerHandle] = [_WorkerHandle(i) for i in range(self.num_workers)]
+        self._lock = threading.Lock()
+        self._ready_event = threading.Event()
+        self._collector_thread = None
+        self._next_task_id = 1
+        self._free_blocks: List[shared_memory.SharedMemory] = []
+        self.max_free_blocks = 8
+        # 統計
+        self.tasks_submitted = 0
+        self.tasks_cancelled = 0
+        self.tasks_failed = 0
+
+    def start(self) -> None:
+        """啟動所有子程序與收集執行緒"""
+        if self.is_running:
+            return
+        self.is_running = True
+        for worker in self._workers:
+            self._spawn(worker)
+        self._collector_thread = threading.Thread(target=self._collect_loop, daemon=True)
+        self._collector_thread.start()
+
+    def stop(self) -> None:
+        """停止所有子程序並釋放共享記憶體"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        for worker in self._workers:
+            try:
+                with worker.send_lock:
+                    worker.task_conn.send(None)
+            except Exception:
+                pass
+        for worker in self._workers:
+            if worker.process is not None:
+                worker.process.join(timeout=2.0)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+                    worker.process.join(timeout=1.0)
+            self._fail_in_flight(worker, RuntimeError("OCR子程序池已停止"))
+            self._close_connections(worker)
+        if self._collector_thread and self._collector_thread.is_alive():
+            self._collector_thread.join(timeout=1.0)
+        with self._lock:
+            blocks, self._free_blocks = self._free_blocks, []
+        for block in blocks:
+            self._destroy_block(block)
+        self._ready_event.clear()
+        logger.info("OCR子程序池已停止")
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待至少一個子程序完成初始化
+
+        Returns:
+            bool: 是否有可用的子程序（所有子程序初始化失敗時提前返回False）
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while not self._ready_event.is_set():
+            if all(worker.init_failed for worker in self._workers):
+                return False
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                return False
+            self._ready_event.wait(0.5 if remaining is None else min(0.5, remaining))
+        return True
+
+    @property
+    def is_ready(self) -> bool:
+        """是否有可用的子程序"""
+        return self._ready_event.is_set()
+
+    def submit(self, image, method: str = "readtext", **kwargs) -> Future:
+        """
+        送出OCR任務
+
+        Args:
+            image: 影像（NumPy陣列或PIL圖像）
+            method: 要呼叫的OCR後端方法（readtext、detect_text 或 recognize）
+            kwargs: 傳給該方法的參數
+
+        Returns:
+            Future: 結果為該方法的返回值
+        """
+        future: Future = Future()
+        array = np.ascontiguousarray(np.asarray(image), dtype=np.uint8)
+        worker = self._pick_worker()
+        if worker is None:
+            future.set_exception(RuntimeError("沒有可用的OCR子程序"))
+            return future
+
+        block = self._acquire_block(array.nbytes)
+        view = np.ndarray(array.shape, dtype=np.uint8, buffer=block.buf)
+        view[...] = array
+        del view
+
+        with self._lock:
+            task_id = self._next_task_id
+            self._next_task_id += 1
+            worker.in_flight[task_id] = (future, block, time.time())
+            self.tasks_submitted += 1
+        future.ocr_task = (worker, task_id)  # 供 cancel() 找到任務所在的子程序
+        try:
+            with worker.send_lock:
+                worker.task_conn.send((task_id, block.name, array.shape, method, kwargs))
+        except Exception as e:
+            with self._lock:
+                worker.in_flight.pop(task_id, None)
+            self._release_block(block)
+            future.set_exception(RuntimeError(f"送出OCR任務失敗: {e}"))
+        return future
+
+    def cancel(self, future: Future) -> bool:
+        """
+        取消 submit() 送出的任務：Future 立即標記為已取消；
+        子程序尚未開始處理時略過該任務，已開始時仍會完成（結果被丟棄）
+
+        Returns:
+            bool: Future 是否已被取消（已完成的任務返回False）
+        """
+        task = getattr(future, "ocr_task", None)
+        if task is None or not future.cancel():
+            return False
+        worker, task_id = task
+        with self._lock:
+            still_queued = task_id in worker.in_flight
+            if still_queued:
+                self.tasks_cancelled += 1
+        if still_queued:
+            try:
+                with worker.send_lock:
+                    worker.task_conn.send((MSG_CANCEL, task_id))
+            except Exception:
+                pass  # 子程序已結束，進行中的任務由重啟流程清除
+        return True
+
+    def is_in_flight(self, future: Future) -> bool:
+        """任務是否仍佔用子程序（包含已取消但子程序尚未略過的任務）"""
+        task = getattr(future, "ocr_task", None)
+        if task is None:
+            return False
+        worker, task_id = task
+        with self._lock:
+            return task_id in worker.in_flight
+
+    def readtext(self, image, **kwargs) -> List[Any]:
+        """同步版本的 submit()，與 easyocr.Reader.readtext 相容"""
+        return self.submit(image, "readtext", **kwargs).result(timeout=self.task_timeout + 5.0)
+
+    def detect_text(self, image, **kwargs) -> Tuple[List[Any], List[Any]]:
+        """同步呼叫子程序的OCR後端 detect_text（只偵測文字框）"""
+        return self.submit(image, "detect_text", **kwargs).result(timeout=self.task_timeout + 5.0)
+
+    def recognize(self, image, **kwargs) -> List[Any]:
+        """同步呼叫子程序的OCR後端 recognize（略過文字偵測）"""
+        return self.submit(image, "recognize", **kwargs).result(timeout=self.task_timeout + 5.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取子程序池統計"""
+        with self._lock:
+            workers = [{
+                'worker_id': worker.worker_id,
+                'pid': worker.process.pid if worker.process is not None else None,
+                'alive': worker.is_alive,
+                'ready': worker.ready,
+                'in_flight': len(worker.in_flight),
+                'completed': worker.completed,
+                'restarts': worker.restarts
+            } for worker in self._workers]
+            return {
+                'workers': workers,
+                'tasks_submitted': self.tasks_submitted,
+                'tasks_cancelled': self.tasks_cancelled,
+                'tasks_failed': self.tasks_failed,
+                'shared_blocks': len(self._free_blocks)
+            }
+
+    def _spawn(self, worker: _WorkerHandle) -> None:
+        """啟動（或重新啟動）子程序"""
+        task_recv, task_send = self._context.Pipe(duplex=False)
+        result_recv, result_send = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker.worker_id, self.languages, self.gpu, self.backend, self.backend_options,
+                  task_recv, result_send),
+            name=f"OCRWorker-{worker.worker_id}",
+            daemon=True
+        )
+        process.start()
+        # 子程序持有的一端在主程序中關閉，子程序結束時才能偵測到EOF
+        task_recv.close()
+        result_send.close()
+        worker.process = process
+        worker.task_conn = task_send
+        worker.result_conn = result_recv
+        worker.ready = False
+        logger.info(f"啟動OCR子程序 {worker.worker_id} (pid {process.pid})")
+
+    def _pick_worker(self) -> Optional[_WorkerHandle]:
+        """選擇進行中任務最少的子程序（優先選擇已初始化完成的）"""
+        with self._lock:
+            candidates = [worker for worker in self._workers
+                          if worker.is_alive and not worker.init_failed and worker.restart_at is None]
+            if not candidates:
+                return None
+            return min(candidates, key=lambda worker: (not worker.ready, len(worker.in_flight)))
+
+    def _collect_loop(self) -> None:
+        """收集結果並監控子程序健康狀態"""
+        while self.is_running:
+            connections = {}
+            sentinels = {}
+            for worker in self._workers:
+                if worker.restart_at is not None and time.time() >= worker.restart_at:
+                    worker.restart_at = None
+                    self._spawn(worker)
+                if worker.process is None or worker.init_failed or worker.restart_at is not None:
+                    continue
+                connections[worker.result_conn] = worker
+                sentinels[worker.process.sentinel] = worker
+            if not connections:
+                time.sleep(0.5)
+                continue
+
+            try:
+                ready = wait(list(connections) + list(sentinels), timeout=0.5)
+            except OSError:
+                continue
+            for item in ready:
+                worker = connections.get(item)
+                if worker is not None:
+                    self._receive(worker)
+            for item in ready:
+                worker = sentinels.get(item)
+                if worker is not None and self.is_running and not worker.process.is_alive():
+                    self._restart(worker, f"子程序已結束 (exit code {worker.process.exitcode})")
+            self._check_timeouts()
+
+    def _receive(self, worker: _WorkerHandle) -> None:
+        """讀取子程序送回的所有訊息"""
+        try:
+            while worker.result_conn.poll():
+                kind, task_id, payload = worker.result_conn.recv()
+                if kind == MSG_READY:
+                    worker.ready = True
+                    self._ready_event.set()
+                    logger.info(f"OCR子程序 {worker.worker_id} 初始化完成 (pid {payload})")
+                elif kind == MSG_INIT_FAILED:
+                    worker.init_failed = True
+                    logger.error(f"OCR子程序 {worker.worker_id} 初始化失敗: {payload}")
+                else:
+                    self._complete(worker, task_id, kind, payload)
+        except (EOFError, OSError):
+            pass  # 子程序已結束，由 sentinel 處理重啟
+
+    def _complete(self, worker: _WorkerHandle, task_id: int, kind: str, payload: Any) -> None:
+        """完成單一任務的 Future"""
+        with self._lock:
+            entry = worker.in_flight.pop(task_id, None)
+            worker.completed += 1
+        if entry is None:
+            return  # 已逾時處理過
+        future, block, _ = entry
+        self._release_block(block)
+        if future.cancelled():
+            return  # 已由 cancel() 取消，結果丟棄
+        if kind == MSG_RESULT:
+            future.set_result(payload)
+        elif kind == MSG_CANCELLED:
+            future.cancel()
+        else:
+            self.tasks_failed += 1
+            future.set_exception(RuntimeError(f"OCR子程序錯誤: {payload}"))
+
+    def _check_timeouts(self) -> None:
+        """終止有任務逾時的子程序（之後由 sentinel 觸發重啟）"""
+        now = time.time()
+        for worker in self._workers:
+            if not worker.ready or not worker.is_alive:
+                continue
+            with self._lock:
+                started = [start for _, _, start in worker.in_flight.values()]
+            if started and now - min(started) > self.task_timeout:
+                logger.warning(f"OCR子程序 {worker.worker_id} 無回應，強制終止")
+                worker.process.terminate()
+                worker.process.join(timeout=1.0)
+
+    def _restart(self, worker: _WorkerHandle, reason: str) -> None:
+        """子程序異常結束：進行中的任務以例外結束，並在次數限制內重新啟動"""
+        logger.warning(f"OCR子程序 {worker.worker_id} {reason}")
+        worker.ready = False
+        self._fail_in_flight(worker, RuntimeError(f"OCR子程序異常結束: {reason}"))
+        self._close_connections(worker)
+        if worker.restarts >= self.max_restarts:
+            logger.error(f"OCR子程序 {worker.worker_id} 重啟次數已達上限，不再重啟")
+            worker.init_failed = True
+            worker.process = None
+        else:
+            worker.restart_at = time.time() + self.restart_delay * (2 ** worker.restarts)
+            worker.restarts += 1
+        if not any(w.ready and w.is_alive for w in self._workers):
+            self._ready_event.clear()
+
+    def _fail_in_flight(self, worker: _WorkerHandle, error: Exception) -> None:
+        """以例外結束子程序所有進行中的任務"""
+        with self._lock:
+            entries, worker.in_flight = list(worker.in_flight.values()), {}
+        for future, block, _ in entries:
+            self._release_block(block)
+            self.tasks_failed += 1
+            if not future.done():
+                future.set_exception(error)
+
+    @staticmethod
+    def _close_connections(worker: _WorkerHandle) -> None:
+        for connection in (worker.task_conn, worker.result_conn):
+            try:
+                if connection is not None:
+                    connection.close()
+            except Exception:
+                pass
+
+    def _acquire_block(self, size: int) -> shared_memory.SharedMemory:
+        """取得至少 size 位元組的共享記憶體（優先重複使用）"""
+        with self._lock:
+            for index, block in enumerate(self._free_blocks):
+                if block.size >= size:
+                    return self._free_blocks.pop(index)
+        return shared_memory.SharedMemory(create=True, size=max(size, 64 * 1024))
+
+    def _release_block(self, block: shared_memory.SharedMemory) -> None:
+        """歸還共享記憶體"""
+        with self._lock:
+            if self.is_running and len(self._free_blocks) < self.max_free_blocks:
+                self._free_blocks.append(block)
+                return
+        self._destroy_block(block)
+
+    @staticmethod
+    def _destroy_block(block: shared_memory.SharedMemory) -> None:
+        try:
+            block.close()
+            block.unlink()
+        except Exception:
+            pass
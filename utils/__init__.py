@@ -4,12 +4,14 @@ Utils Package
 """
 
 from .common import (
-    safe_call, create_daemon_thread, PerformanceTimer, 
-    FrequencyController, clamp, format_size, validate_region
+    safe_call, create_daemon_thread, PerformanceTimer, LatencyHistogram, StageTimings,
+    FrequencyController, clamp, format_size, validate_region, region_fingerprint, region_changed
 )
+from .rate_scheduler import AdaptiveRateScheduler
+from .debug_sink import DebugImageSink
 
 __all__ = [
-    'safe_call', 'create_daemon_thread', 'PerformanceTimer',
-    'FrequencyController', 'clamp', 'format_size', 'validate_region',
-    'safe_int', 'safe_float'
+    'safe_call', 'create_daemon_thread', 'PerformanceTimer', 'LatencyHistogram', 'StageTimings',
+    'FrequencyController', 'clamp', 'format_size', 'validate_region', 'region_fingerprint', 'region_changed',
+    'safe_int', 'safe_float', 'AdaptiveRateScheduler', 'DebugImageSink'
 ]
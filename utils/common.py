@@ -6,7 +6,8 @@ Common Utilities Module
 import tkinter as tk
 import threading
 import time
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Dict, Optional
+import numpy as np
 from utils.log import get_logger
 
 logger = get_logger(__name__)
@@ -47,17 +48,124 @@ def create_daemon_thread(target: Callable, *args, **kwargs) -> threading.Thread:
     return thread
 
 
+class LatencyHistogram:
+    """
+    滾動延遲統計：固定容量的環形緩衝區只保留最近的樣本，查詢時才計算百分位數，
+    記錄一次只需寫入一個陣列元素，可常駐在熱路徑上。
+    """
+    
+    def __init__(self, capacity: int = 512):
+        self.capacity = capacity
+        self._samples = np.zeros(capacity, dtype=np.float64)
+        self._index = 0
+        self.count = 0  # 累計樣本數（含已被覆蓋的）
+        self.total = 0.0
+    
+    def add(self, seconds: float) -> None:
+        """記錄一個樣本（秒）"""
+        self._samples[self._index] = seconds
+        self._index = (self._index + 1) % self.capacity
+        self.count += 1
+        self.total += seconds
+    
+    def get_stats(self) -> Dict[str, float]:
+        """
+        獲取最近樣本的統計（毫秒）
+        
+        Returns:
+            dict: {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}
+        """
+        samples = self._samples[:min(self.count, self.capacity)] * 1000.0
+        if samples.size == 0:
+            return {'count': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+        return {
+            'count': self.count,
+            'mean_ms': float(samples.mean()),
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'max_ms': float(samples.max())
+        }
+
+
+class StageTimings:
+    """各階段（及各分頁）的滾動延遲統計，可由工作執行緒記錄、GUI執行緒查詢"""
+    
+    def __init__(self, capacity: int = 512):
+        self.capacity = capacity
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._stages: Dict[str, LatencyHistogram] = {}
+        self._tabs: Dict[str, Dict[str, LatencyHistogram]] = {}
+    
+    def record(self, stage: str, seconds: float, key: Optional[str] = None) -> None:
+        """
+        記錄一個階段的耗時
+        
+        Args:
+            stage: 階段名稱
+            seconds: 耗時（秒）
+            key: 分頁名稱，有指定時同時記錄到該分頁的統計
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = LatencyHistogram(self.capacity)
+            histogram.add(seconds)
+            if key is not None:
+                tab_stages = self._tabs.setdefault(key, {})
+                histogram = tab_stages.get(stage)
+                if histogram is None:
+                    histogram = tab_stages[stage] = LatencyHistogram(self.capacity)
+                histogram.add(seconds)
+    
+    def measure(self, stage: str, key: Optional[str] = None) -> "PerformanceTimer":
+        """返回記錄到此統計的計時器（用於 with 區塊）"""
+        return PerformanceTimer(stage, self, key)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取統計
+        
+        Returns:
+            dict: {'stages': {stage: stats}, 'tabs': {key: {stage: stats}}}
+        """
+        with self._lock:
+            return {
+                'stages': {stage: histogram.get_stats() for stage, histogram in self._stages.items()},
+                'tabs': {key: {stage: histogram.get_stats() for stage, histogram in stages.items()}
+                         for key, stages in self._tabs.items()}
+            }
+    
+    def reset(self) -> None:
+        """清除所有統計"""
+        with self._lock:
+            self._stages.clear()
+            self._tabs.clear()
+
+
 class PerformanceTimer:
-    """性能計時器"""
+    """性能計時器（使用高解析度計時，指定 timings 時將結果記錄到滾動統計而不寫入日誌）"""
     
-    def __init__(self, name: str = "Timer"):
+    def __init__(self, name: str = "Timer", timings: Optional[StageTimings] = None, key: Optional[str] = None):
+        """
+        Args:
+            name: 計時名稱（記錄到 timings 時為階段名稱）
+            timings: 滾動延遲統計
+            key: 分頁名稱
+        """
         self.name = name
+        self.timings = timings
+        self.key = key
         self.start_time = None
         self.end_time = None
     
     def start(self) -> None:
         """開始計時"""
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
     
     def stop(self) -> float:
         """
@@ -66,7 +174,7 @@ class PerformanceTimer:
         Returns:
             float: 經過的時間（秒）
         """
-        self.end_time = time.time()
+        self.end_time = time.perf_counter()
         if self.start_time is None:
             return 0.0
         return self.end_time - self.start_time
@@ -77,7 +185,10 @@ class PerformanceTimer:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         elapsed = self.stop()
-        logger.debug(f"{self.name}: {elapsed:.4f}秒")
+        if self.timings is not None:
+            self.timings.record(self.name, elapsed, self.key)
+        else:
+            logger.debug(f"{self.name}: {elapsed:.4f}秒")
 
 
 class FrequencyController:
@@ -146,6 +257,45 @@ def clamp(value: float, min_val: float, max_val: float) -> float:
     return max(min_val, min(value, max_val))
 
 
+# 區域變化判斷的預設門檻（OCR略過與自適應頻率共用，兩者對「變化」的定義一致）
+CHANGE_PIXEL_THRESHOLD = 24   # 單一像素視為變化的最小差值 (0-255)
+CHANGE_MIN_PIXELS = 2         # 變化像素數達到此值才視為區域已變化
+CHANGE_MAX_SAMPLES = 4096     # 指紋最多取樣的像素數
+
+
+def region_fingerprint(image, max_samples: int = CHANGE_MAX_SAMPLES) -> np.ndarray:
+    """
+    計算區域指紋（以固定步長降採樣的像素，保留所有通道）
+    
+    Args:
+        image: 區域圖像
+        max_samples: 最多取樣的像素數
+    
+    Returns:
+        np.ndarray: int16 指紋（與輸入不共用記憶體）
+    """
+    array = np.asarray(image)
+    h, w = array.shape[:2]
+    step = max(1, int(np.sqrt(h * w / max_samples)))
+    return np.array(array[::step, ::step], dtype=np.int16)
+
+
+def region_changed(old: np.ndarray, new: np.ndarray, pixel_threshold: int = CHANGE_PIXEL_THRESHOLD,
+                   min_changed_pixels: int = CHANGE_MIN_PIXELS) -> bool:
+    """
+    比較兩個區域指紋（尺寸不同時視為已變化）
+    
+    Returns:
+        bool: 差值超過 pixel_threshold 的像素數是否達到 min_changed_pixels
+    """
+    if old.shape != new.shape:
+        return True
+    diff = np.abs(new - old)
+    if diff.ndim == 3:
+        diff = diff.max(axis=2)
+    return int(np.count_nonzero(diff > pixel_threshold)) >= min_changed_pixels
+
+
 def format_size(size: int) -> str:
     """
     格式化檔案大小
@@ -0,0 +1,168 @@
+"""
+Debug Image Sink Module
+除錯圖像輸出模組：以有界佇列與背景執行緒寫出除錯圖像，不阻塞OCR流程
+"""
+
+import os
+import queue
+import threading
+from typing import Optional, Dict, Any, Iterable, Tuple
+import numpy as np
+from PIL import Image
+
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# 圖像階段
+DEBUG_STAGE_RAW = "raw"                    # 擷取的原始區域圖像
+DEBUG_STAGE_PREPROCESSED = "preprocessed"  # 送入OCR前的預處理圖像
+
+
+class DebugImageSink:
+    """
+    除錯圖像輸出
+
+    submit() 只複製圖像並放入有界佇列，佇列已滿時直接丟棄該圖像；
+    PNG編碼與寫檔都在背景執行緒中進行。可依分頁、階段與取樣間隔篩選，
+    檔名為 {分頁}_{階段}_{幀序號}.png。
+    """
+
+    def __init__(self, output_dir: str = "tmp", max_queue: int = 32, sample_every: int = 1,
+                 tabs: Optional[Iterable[str]] = None, stages: Iterable[str] = (DEBUG_STAGE_RAW,),
+                 enabled: bool = False):
+        """
+        Args:
+            output_dir: 輸出目錄
+            max_queue: 佇列中最多等待寫出的圖像數
+            sample_every: 每個分頁與階段每 N 張輸出一張
+            tabs: 要輸出的分頁，None 或空集合表示全部
+            stages: 要輸出的階段
+            enabled: 是否啟用
+        """
+        self.max_queue = max_queue
+        self._queue: "queue.Queue[Optional[Tuple[str, np.ndarray]]]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._counters: Dict[Tuple[str, str], int] = {}
+        self.output_dir = output_dir
+        self.sample_every = 1
+        self.tabs: frozenset = frozenset()
+        self.stages: frozenset = frozenset()
+        self.enabled = False
+        # 統計
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.configure(enabled, output_dir, sample_every, tabs, stages)
+
+    def configure(self, enabled: bool, output_dir: str = "tmp", sample_every: int = 1,
+                  tabs: Optional[Iterable[str]] = None, stages: Iterable[str] = (DEBUG_STAGE_RAW,)) -> None:
+        """更新輸出設定"""
+        with self._lock:
+            self.output_dir = output_dir
+            self.sample_every = max(1, int(sample_every))
+            self.tabs = frozenset(tabs or ())
+            self.stages = frozenset(stages)
+            self.enabled = enabled
+            self._counters.clear()
+        if enabled:
+            logger.info(f"除錯圖像輸出已啟用: {output_dir}（階段: {', '.join(sorted(self.stages))}，"
+                        f"每 {self.sample_every} 張取 1 張）")
+
+    def wants(self, tab_name: str, stage: str) -> bool:
+        """是否需要該分頁與階段的圖像（未啟用時呼叫端可略過準備圖像）"""
+        return self.enabled and stage in self.stages and (not self.tabs or tab_name in self.tabs)
+
+    def submit(self, tab_name: str, stage: str, image, frame_id: Optional[int] = None) -> bool:
+        """
+        送出除錯圖像（可在任何執行緒呼叫，不會阻塞）
+
+        Args:
+            tab_name: 分頁名稱
+            stage: 圖像階段
+            image: 圖像（NumPy陣列或PIL圖像）
+            frame_id: 幀序號，None 時使用該分頁與階段的計數
+
+        Returns:
+            bool: 是否已放入佇列（未選取、未取樣或佇列已滿時為False）
+        """
+        if not self.wants(tab_name, stage):
+            return False
+        key = (tab_name, stage)
+        with self._lock:
+            count = self._counters.get(key, 0)
+            self._counters[key] = count + 1
+            output_dir = self.output_dir
+        if count % self.sample_every:
+            return False
+        if self._queue.full():
+            with self._lock:
+                self.dropped += 1
+            return False
+
+        sequence = frame_id if frame_id is not None else count
+        path = os.path.join(output_dir, f"{tab_name}_{stage}_{sequence:06d}.png")
+        # 複製一份：擷取引擎的區域視圖在下一幀會被覆寫
+        array = np.array(image, dtype=np.uint8, copy=True)
+        try:
+            self._queue.put_nowait((path, array))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.submitted += 1
+        self._ensure_writer()
+        return True
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """寫出佇列中剩餘的圖像後停止背景執行緒"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取輸出統計"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'submitted': self.submitted,
+                'written': self.written,
+                'dropped': self.dropped,
+                'errors': self.errors,
+                'pending': self._queue.qsize()
+            }
+
+    def _ensure_writer(self) -> None:
+        """需要時啟動背景寫出執行緒"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._write_loop, name="DebugImageSink", daemon=True)
+            self._thread.start()
+
+    def _write_loop(self) -> None:
+        """背景寫出迴圈"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            path, array = item
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                Image.fromarray(array).save(path)
+                with self._lock:
+                    self.written += 1
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                logger.debug(f"除錯圖像寫出失敗 {path}: {e}")
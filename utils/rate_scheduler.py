@@ -0,0 +1,172 @@
+"""
+Rate Scheduler Module
+自適應頻率排程模組：依畫面變化速度與OCR負載調整擷取與OCR頻率
+"""
+
+import threading
+import time
+from typing import Dict, Any, Iterable, Optional
+import numpy as np
+
+from utils.common import (
+    clamp, region_fingerprint, region_changed, CHANGE_PIXEL_THRESHOLD, CHANGE_MIN_PIXELS, CHANGE_MAX_SAMPLES
+)
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+class AdaptiveRateScheduler:
+    """
+    自適應頻率排程器
+
+    觀察監測區域（預設為HP/MP）在連續幀之間的變化比例：戰鬥中數值快速變化時
+    提高擷取頻率，畫面靜止時逐漸降到下限；OCR處理時間超過目前的幀間隔時，
+    擷取與OCR頻率都會降到OCR可負荷的速度。停用時兩者都使用固定的基準頻率。
+    """
+
+    def __init__(self, min_fps: float = 0.5, max_fps: float = 5.0, base_fps: float = 2.0,
+                 watched_tabs: Iterable[str] = ("HP", "MP"), enabled: bool = True):
+        """
+        Args:
+            min_fps: 頻率下限
+            max_fps: 頻率上限
+            base_fps: 停用自適應時使用的固定頻率
+            watched_tabs: 用於判斷畫面活動度的區域名稱
+            enabled: 是否啟用自適應
+        """
+        self.enabled = enabled
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.base_fps = base_fps
+        self.watched_tabs = tuple(watched_tabs)
+        # 活動度上升時快速反應，下降時緩慢衰減
+        self.attack = 0.6
+        self.release = 0.08
+        # 與OCR的區域變化追蹤使用相同的門檻
+        self.pixel_threshold = CHANGE_PIXEL_THRESHOLD
+        self.min_changed_pixels = CHANGE_MIN_PIXELS
+        self.max_samples = CHANGE_MAX_SAMPLES
+        self.ocr_headroom = 0.8  # OCR只使用可負荷速度的比例
+
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[str, np.ndarray] = {}
+        self._activity = 0.0
+        self._ocr_duration: Optional[float] = None
+        self._capture_fps = base_fps
+        self._ocr_fps = base_fps
+        self._last_ocr_time = 0.0
+        self._recompute()
+
+    def set_enabled(self, enabled: bool) -> None:
+        """啟用或停用自適應"""
+        with self._lock:
+            self.enabled = enabled
+            self._recompute()
+
+    def set_bounds(self, min_fps: float, max_fps: float) -> None:
+        """設定頻率上下限"""
+        min_fps = max(0.1, min_fps)
+        max_fps = max(min_fps, max_fps)
+        with self._lock:
+            self.min_fps = min_fps
+            self.max_fps = max_fps
+            self._recompute()
+
+    def set_base_fps(self, fps: float) -> None:
+        """設定停用自適應時的固定頻率"""
+        with self._lock:
+            self.base_fps = max(0.1, fps)
+            self._recompute()
+
+    def observe_frames(self, frames: Dict[str, Any]) -> None:
+        """
+        觀察一次分派的區域圖像，更新畫面活動度（可作為幀分派器的監聽函數）
+
+        Args:
+            frames: {tab_name: (區域視圖, 幀資訊)}
+        """
+        changed = 0
+        observed = 0
+        for name in self.watched_tabs:
+            frame = frames.get(name)
+            if frame is None:
+                continue
+            fingerprint = region_fingerprint(frame[0], self.max_samples)
+            old = self._fingerprints.get(name)
+            self._fingerprints[name] = fingerprint
+            if old is None:
+                continue
+            observed += 1
+            if region_changed(old, fingerprint, self.pixel_threshold, self.min_changed_pixels):
+                changed += 1
+        if not observed:
+            return
+
+        sample = changed / observed
+        with self._lock:
+            alpha = self.attack if sample > self._activity else self.release
+            self._activity += (sample - self._activity) * alpha
+            self._recompute()
+
+    def report_ocr_cycle(self, duration: float) -> None:
+        """回報一次OCR處理耗時（秒）"""
+        with self._lock:
+            if self._ocr_duration is None:
+                self._ocr_duration = duration
+            else:
+                self._ocr_duration += (duration - self._ocr_duration) * 0.3
+            self._recompute()
+
+    def should_process_ocr(self) -> bool:
+        """檢查是否應該進行下一次OCR"""
+        current_time = time.time()
+        with self._lock:
+            if current_time - self._last_ocr_time >= 1.0 / self._ocr_fps:
+                self._last_ocr_time = current_time
+                return True
+        return False
+
+    def get_capture_interval(self) -> float:
+        """獲取目前的擷取間隔（秒）"""
+        return 1.0 / self._capture_fps
+
+    @property
+    def capture_fps(self) -> float:
+        """目前的擷取頻率"""
+        return self._capture_fps
+
+    @property
+    def ocr_fps(self) -> float:
+        """目前的OCR頻率"""
+        return self._ocr_fps
+
+    def get_status(self) -> Dict[str, Any]:
+        """獲取排程狀態"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'capture_fps': self._capture_fps,
+                'ocr_fps': self._ocr_fps,
+                'activity': self._activity,
+                'ocr_duration': self._ocr_duration,
+                'min_fps': self.min_fps,
+                'max_fps': self.max_fps
+            }
+
+    def _recompute(self) -> None:
+        """依活動度與OCR負載重新計算頻率（呼叫端需持有鎖）"""
+        if not self.enabled:
+            self._capture_fps = self._ocr_fps = self.base_fps
+            return
+
+        capture_fps = self.min_fps + (self.max_fps - self.min_fps) * self._activity
+        ocr_fps = capture_fps
+        if self._ocr_duration:
+            sustainable = self.ocr_headroom / self._ocr_duration
+            if sustainable < capture_fps:
+                # OCR跟不上，擷取再快也只會被丟棄
+                capture_fps = sustainable
+            ocr_fps = min(ocr_fps, sustainable)
+        self._capture_fps = clamp(capture_fps, self.min_fps, self.max_fps)
+        self._ocr_fps = clamp(ocr_fps, self.min_fps, self._capture_fps)
@@ -0,0 +1,149 @@
+"""
+Tab Scheduler Module
+分頁OCR排程模組：依各分頁的頻率等級與優先度，決定每次OCR要處理哪些分頁
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Any, Iterable, List, Optional
+
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# 預設頻率等級：{名稱: {'interval': 目標更新間隔（秒）, 'priority': 優先度}}
+DEFAULT_RATE_CLASSES = {
+    "vital": {"interval": 0.5, "priority": 3},      # HP/MP：需要即時
+    "progress": {"interval": 5.0, "priority": 2},   # EXP/楓幣：變化緩慢
+    "inventory": {"interval": 10.0, "priority": 1},  # 藥水：使用時才變化
+}
+
+
+def default_rate_class(tab_name: str) -> str:
+    """分頁的預設頻率等級"""
+    if tab_name in ("HP", "MP"):
+        return "vital"
+    if "藥水" in tab_name:
+        return "inventory"
+    return "progress"
+
+
+class TabScheduler:
+    """
+    分頁OCR排程器
+
+    每個分頁屬於一個頻率等級（目標更新間隔與優先度）。每次OCR從已到期的分頁中
+    依「優先度 × 逾期比例」由高到低選取，最多 max_tabs_per_cycle 個；
+    名額未用完時，已經過一半間隔的分頁可以提前加入同一次批次辨識（幾乎不增加成本）。
+    逾期比例隨時間增加，低優先度的分頁不會一直被排擠。
+    """
+
+    def __init__(self, rate_classes: Optional[Dict[str, Dict[str, float]]] = None,
+                 tab_classes: Optional[Dict[str, str]] = None, max_tabs_per_cycle: int = 6,
+                 early_ratio: float = 0.5, enabled: bool = True):
+        """
+        Args:
+            rate_classes: 頻率等級設定，未指定時使用 DEFAULT_RATE_CLASSES
+            tab_classes: 分頁指定的頻率等級 {tab_name: 等級名稱}，未指定的分頁使用預設等級
+            max_tabs_per_cycle: 每次OCR最多處理的分頁數（0 表示不限制）
+            early_ratio: 已經過此比例間隔的分頁可提前加入批次
+            enabled: 停用時每次處理所有分頁
+        """
+        self.enabled = enabled
+        self.max_tabs_per_cycle = max_tabs_per_cycle
+        self.early_ratio = early_ratio
+        self.rate_classes: Dict[str, Dict[str, float]] = {}
+        self.tab_classes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._last_processed: Dict[str, float] = {}
+        # 統計
+        self.cycles = 0
+        self.tabs_selected = 0
+        self.tabs_deferred = 0
+        self.configure(rate_classes, tab_classes)
+
+    def configure(self, rate_classes: Optional[Dict[str, Dict[str, float]]] = None,
+                  tab_classes: Optional[Dict[str, str]] = None) -> None:
+        """更新頻率等級與分頁指定"""
+        classes = {name: dict(config) for name, config in DEFAULT_RATE_CLASSES.items()}
+        for name, config in (rate_classes or {}).items():
+            classes.setdefault(name, {"interval": 1.0, "priority": 1}).update(config)
+        with self._lock:
+            self.rate_classes = classes
+            self.tab_classes = dict(tab_classes or {})
+
+    def get_rate_class(self, tab_name: str) -> Dict[str, float]:
+        """獲取分頁的頻率等級設定（指定的等級不存在時使用預設等級）"""
+        name = self.tab_classes.get(tab_name)
+        if name not in self.rate_classes:
+            name = default_rate_class(tab_name)
+        return self.rate_classes[name]
+
+    def select(self, tab_names: Iterable[str], now: Optional[float] = None) -> List[str]:
+        """
+        選取本次OCR要處理的分頁
+
+        Args:
+            tab_names: 有新圖像的分頁
+            now: 目前時間（預設為 time.time()）
+
+        Returns:
+            list: 要處理的分頁（依急迫程度排序）
+        """
+        tab_names = list(tab_names)
+        if not self.enabled:
+            return tab_names
+        now = time.time() if now is None else now
+
+        due = []
+        early = []
+        with self._lock:
+            for tab_name in tab_names:
+                rate_class = self.get_rate_class(tab_name)
+                last = self._last_processed.get(tab_name)
+                ratio = math.inf if last is None else (now - last) / max(rate_class["interval"], 1e-3)
+                score = rate_class["priority"] * ratio
+                if ratio >= 1.0:
+                    due.append((score, tab_name))
+                elif ratio >= self.early_ratio:
+                    early.append((score, tab_name))
+            if not due:
+                return []  # 沒有到期的分頁時不提前處理，等下一次
+
+            due.sort(key=lambda item: item[0], reverse=True)
+            early.sort(key=lambda item: item[0], reverse=True)
+            ordered = [tab_name for _, tab_name in due + early]
+            limit = self.max_tabs_per_cycle or len(ordered)
+            selected = ordered[:limit]
+            self.cycles += 1
+            self.tabs_selected += len(selected)
+            self.tabs_deferred += max(0, len(due) - limit)
+        return selected
+
+    def mark_processed(self, tab_names: Iterable[str], now: Optional[float] = None) -> None:
+        """記錄分頁已處理（下次到期時間由此計算）"""
+        now = time.time() if now is None else now
+        with self._lock:
+            for tab_name in tab_names:
+                self._last_processed[tab_name] = now
+
+    def reset(self, tab_name: Optional[str] = None) -> None:
+        """清除處理記錄（分頁會在下次立即被處理）"""
+        with self._lock:
+            if tab_name is None:
+                self._last_processed.clear()
+            else:
+                self._last_processed.pop(tab_name, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取排程統計與各分頁距上次處理的時間"""
+        now = time.time()
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'cycles': self.cycles,
+                'tabs_selected': self.tabs_selected,
+                'tabs_deferred': self.tabs_deferred,
+                'staleness': {tab_name: now - last for tab_name, last in self._last_processed.items()}
+            }